@@ -1,15 +1,51 @@
 import logging
 from uuid import uuid4
+from typing import AsyncIterator, Callable, Dict, List
 from fastapi import FastAPI, Request, UploadFile, File, Depends, status, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
 from pydantic import Field
 
-from src.core import get_db_session, async_engine
-from src.models import Base
-from src.services import ResumeService, ResumeParsingError, ResumeNotFoundError, JobService, JobNotFoundError
+from src.core import get_db_session, async_engine, settings
+from src.core.database import AsyncSessionLocal
+from src.core.metrics import registry
+from src.core.tracing import start_trace
+from src.core.migrations import run_migrations
+from src.agent import (
+    OpenAIProvider,
+    OpenAIEmbeddingProvider,
+    make_async_client,
+    make_resilient_provider,
+    make_resilient_embedding_provider,
+    make_fake_provider,
+    make_fake_embedding_provider,
+    all_rate_limiters,
+)
+from src.models import Base, TaskKind
+from src.services import (
+    ResumeService,
+    ResumeParsingError,
+    ResumeNotFoundError,
+    JobService,
+    JobNotFoundError,
+    MatchService,
+    ScoringService,
+    ResumeImprovementService,
+    EmbeddingNotFoundError,
+    sync_embedding_stores,
+    sync_keyword_index,
+    sync_bm25_index,
+    DocumentConverter,
+    TaskService,
+    TaskNotFoundError,
+    IngestionWorker,
+    CachedResponse,
+    dump_json,
+)
 from src.schemas.pydantic.job import JobUploadRequest
+from src.schemas.pydantic.batch_get import ResumeBatchGetRequest, JobBatchGetRequest
+from src.schemas.pydantic.resume_improvement import ResumeImprovementRequest
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +54,108 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+    async with AsyncSessionLocal() as session:
+        await sync_embedding_stores(session)
+        await sync_keyword_index(session)
+        await sync_bm25_index(session)
+        stale_jobs = await ScoringService(session).jobs_needing_rescore()
+        rescoring = await TaskService(session).enqueue_unique(
+            TaskKind.SCORE_JOB, [job_id.encode("utf-8") for job_id in stale_jobs]
+        )
+        if rescoring:
+            logger.info(f"Queued {rescoring} jobs for rescoring")
+
+    # one pooled client per worker, shared by every request
+    app.state.llm_provider = None
+    app.state.embedding_provider = None
+    openai_client = None
+    if settings.LLM_PROVIDER == "fake":
+        logger.warning("LLM_PROVIDER=fake, LLM and embedding calls are simulated")
+        app.state.llm_provider = make_resilient_provider(make_fake_provider())
+        app.state.embedding_provider = make_resilient_embedding_provider(
+            make_fake_embedding_provider()
+        )
+    elif settings.OPENAI_API_KEY:
+        openai_client = make_async_client(settings.OPENAI_API_KEY)
+        app.state.llm_provider = make_resilient_provider(
+            OpenAIProvider(model=settings.OPENAI_MODEL or "gpt-4.1-nano", client=openai_client)
+        )
+        app.state.embedding_provider = make_resilient_embedding_provider(
+            OpenAIEmbeddingProvider(
+                embedding_model=settings.OPENAI_EMBEDDING_MODEL or "text-embedding-3-small",
+                max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+                max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+                max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+                client=openai_client,
+            )
+        )
+    else:
+        logger.warning("OPENAI_API_KEY is not set, LLM and embedding calls will fail")
+
+    app.state.document_converter = DocumentConverter(
+        max_workers=settings.PDF_CONVERTER_WORKERS,
+        timeout=settings.PDF_CONVERT_TIMEOUT,
+        max_pages=settings.PDF_MAX_PAGES,
+    )
+    app.state.document_converter.start()
+
+    app.state.ingestion_worker = IngestionWorker(
+        AsyncSessionLocal,
+        concurrency=settings.INGESTION_WORKERS,
+        poll_interval=settings.INGESTION_POLL_INTERVAL,
+        max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+        stale_after=settings.INGESTION_STALE_AFTER,
+        provider=app.state.llm_provider,
+        embedding_provider=app.state.embedding_provider,
+        converter=app.state.document_converter,
+    )
+    await app.state.ingestion_worker.start()
+
     yield
+
+    await app.state.ingestion_worker.stop()
+    app.state.document_converter.shutdown()
+    if openai_client is not None:
+        await openai_client.close()
     await async_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
 
 
+@app.middleware("http")
+async def trace_request(request: Request, call_next: Callable):
+    """
+    Assigns the request its ID (the client's ``X-Request-ID`` if given) and runs it in a
+    trace of that ID, see ``start_trace``.
+    """
+    request_id = request.headers.get("x-request-id") or str(uuid4())
+    request.state.request_id = request_id
+    with start_trace(request_id, f"{request.method} {request.url.path}") as root:
+        response = await call_next(request)
+        if root is not None:
+            route = request.scope.get("route")
+            if route is not None:
+                root.name = f"{request.method} {route.path}"
+            root.attributes["status_code"] = response.status_code
+            if response.status_code >= 500:
+                root.status = "error"
+    return response
+
+
+def _accepted(request_id: str, task_id: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": message,
+            "request_id": request_id,
+            "task_id": task_id,
+        },
+        headers={"X-Request-ID": request_id, "Location": f"/tasks/{task_id}"},
+    )
+
+
 @app.post(
     "/upload_resume",
     summary="Upload a resume in only PDF format and store it into DB in HTML/Markdown format",
@@ -32,11 +163,16 @@ app = FastAPI(lifespan=lifespan)
 async def upload_resume(
         request: Request,
         file: UploadFile = File(...),
+        asynchronous: bool = Query(
+            False, description="Queue the resume and return 202 with a task ID instead of waiting"
+        ),
         db: AsyncSession = Depends(get_db_session),
 ):
     """
     Accepts only PDF file, converts it to HTML/Markdown, and stores it in the database.
 
+    With ``asynchronous=true`` the PDF is only queued; poll ``GET /tasks/{task_id}`` for the result.
+
     Raises:
         HTTPException: If the file type is not supported or if the file is empty.
     """
@@ -59,11 +195,31 @@ async def upload_resume(
             detail="Empty file. Please upload a valid file.",
         )
 
+    if asynchronous:
+        task_id = await TaskService(db).enqueue(
+            TaskKind.RESUME, file_bytes, filename=file.filename
+        )
+        request.app.state.ingestion_worker.notify()
+        return _accepted(request_id, task_id, f"File {file.filename} queued for processing")
+
     try:
-        resume_service = ResumeService(db)
+        resume_service = ResumeService(
+            db,
+            provider=request.app.state.llm_provider,
+            embedding_provider=request.app.state.embedding_provider,
+            converter=request.app.state.document_converter,
+        )
         resume_id = await resume_service.convert_and_store_resume(
             file_bytes=file_bytes
         )
+        await TaskService(db).enqueue(TaskKind.SCORE_RESUME, resume_id.encode("utf-8"))
+        request.app.state.ingestion_worker.notify()
+    except ResumeParsingError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(
             f"Error processing file: {str(e)}"
@@ -80,6 +236,25 @@ async def upload_resume(
     }
 
 
+def _cached_response(request: Request, request_id: str, cached: CachedResponse) -> Response:
+    """
+    Wraps a cached payload in the usual ``{"request_id", "data"}`` envelope, or answers
+    304 when the client already holds this version (the ETag covers ``data`` only).
+    """
+    headers = {
+        "X-Request-ID": request_id,
+        "ETag": cached.etag,
+        "Cache-Control": "no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or cached.etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    body = b'{"request_id":' + dump_json(request_id) + b',"data":' + cached.body + b"}"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get(
     "/both_resume",
     summary="Get resume data from both resume and processed_resume models",
@@ -102,7 +277,6 @@ async def get_resume(
         HTTPException: If the resume is not found or if there's an error fetching data.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
-    headers = {"X-Request-ID": request_id}
 
     try:
         if not resume_id:
@@ -112,23 +286,8 @@ async def get_resume(
             )
 
         resume_service = ResumeService(db)
-        resume_data = await resume_service.get_resume_with_processed_data(
-            resume_id=resume_id
-        )
-
-        if not resume_data:
-            raise ResumeNotFoundError(
-                message=f"Resume with id {resume_id} not found"
-            )
-        print(resume_data)
-
-        return JSONResponse(
-            content={
-                "request_id": request_id,
-                "data": resume_data,
-            },
-            headers=headers,
-        )
+        cached = await resume_service.get_resume_response(resume_id=resume_id)
+        return _cached_response(request, request_id, cached)
 
     except ResumeNotFoundError as e:
         logger.error(str(e))
@@ -151,13 +310,23 @@ async def get_resume(
 async def upload_job(
         payload: str,
         request: Request,
+        asynchronous: bool = Query(
+            False, description="Queue the job and return 202 with a task ID instead of waiting"
+        ),
         db: AsyncSession = Depends(get_db_session),
 ):
     """
     Accepts a job description as a MarkDown text and stores it in the database.
+
+    With ``asynchronous=true`` the text is only queued; poll ``GET /tasks/{task_id}`` for the result.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
 
+    if asynchronous:
+        task_id = await TaskService(db).enqueue(TaskKind.JOB, payload.encode("utf-8"))
+        request.app.state.ingestion_worker.notify()
+        return _accepted(request_id, task_id, "Job description queued for processing")
+
     # allowed_content_types = [
     #     "application/json",
     # ]
@@ -176,8 +345,14 @@ async def upload_job(
     #     )
 
     try:
-        job_service = JobService(db)
+        job_service = JobService(
+            db,
+            provider=request.app.state.llm_provider,
+            embedding_provider=request.app.state.embedding_provider,
+        )
         job_id = await job_service.convert_and_store_job(payload)
+        await TaskService(db).enqueue(TaskKind.SCORE_JOB, job_id.encode("utf-8"))
+        request.app.state.ingestion_worker.notify()
     except AssertionError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -221,7 +396,6 @@ async def get_job(
         HTTPException: If the job is not found or if there's an error fetching data.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
-    headers = {"X-Request-ID": request_id}
 
     try:
         if not job_id:
@@ -231,23 +405,262 @@ async def get_job(
             )
 
         job_service = JobService(db)
-        job_data = await job_service.get_job_with_processed_data(
-            job_id=job_id
+        cached = await job_service.get_job_response(job_id=job_id)
+        return _cached_response(request, request_id, cached)
+
+    except JobNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error fetching job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching job data",
         )
 
-        if not job_data:
-            raise JobNotFoundError(
-                message=f"Job with id {job_id} not found"
-            )
+
+async def _stream_batch(
+        request_id: str,
+        id_field: str,
+        ids: List[str],
+        fetch: Callable[[AsyncSession], AsyncIterator[Dict]],
+) -> AsyncIterator[bytes]:
+    """
+    Streams ``{"request_id", "data": [...], "not_found": [...]}`` as rows arrive. Runs in
+    its own session, since request-scoped sessions are closed before the body is sent.
+    """
+    yield b'{"request_id":' + dump_json(request_id) + b',"data":['
+    found = set()
+    try:
+        async with AsyncSessionLocal() as db:
+            async for item in fetch(db):
+                yield (b"," if found else b"") + dump_json(item)
+                found.add(item[id_field])
+    except Exception as e:
+        # the status line is already sent, so report the failure in the body
+        logger.error(f"Error streaming batch {request_id}: {str(e)}")
+        yield b'],"error":"Error fetching batch data"}'
+        return
+    yield b'],"not_found":' + dump_json([item_id for item_id in ids if item_id not in found]) + b"}"
+
+
+@app.post(
+    "/resumes:batchGet",
+    summary="Get many resumes with their processed data in one query",
+)
+async def batch_get_resumes(request: Request, payload: ResumeBatchGetRequest):
+    """
+    Streams combined resume data for up to 500 resume IDs, loaded with a single joined query.
+
+    Args:
+        payload: The resume IDs to fetch
+
+    Returns:
+        Combined data for the resumes that exist (in database order) and the IDs that do not
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    resume_ids = list(dict.fromkeys(payload.resume_ids))
+    return StreamingResponse(
+        _stream_batch(
+            request_id,
+            "resume_id",
+            resume_ids,
+            lambda db: ResumeService(db).stream_resumes_with_processed_data(resume_ids),
+        ),
+        media_type="application/json",
+        headers={"X-Request-ID": request_id},
+    )
+
+
+@app.post(
+    "/jobs:batchGet",
+    summary="Get many jobs with their processed data in one query",
+)
+async def batch_get_jobs(request: Request, payload: JobBatchGetRequest):
+    """
+    Streams combined job data for up to 500 job IDs, loaded with a single joined query.
+
+    Args:
+        payload: The job IDs to fetch
+
+    Returns:
+        Combined data for the jobs that exist (in database order) and the IDs that do not
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    job_ids = list(dict.fromkeys(payload.job_ids))
+    return StreamingResponse(
+        _stream_batch(
+            request_id,
+            "job_id",
+            job_ids,
+            lambda db: JobService(db).stream_jobs_with_processed_data(job_ids),
+        ),
+        media_type="application/json",
+        headers={"X-Request-ID": request_id},
+    )
+
+
+@app.get(
+    "/match",
+    summary="Rank processed resumes against a job by cosine similarity of their embeddings",
+)
+async def match_job(
+        request: Request,
+        job_id: str = Query(..., description="Job ID to match resumes against"),
+        top_k: int = Query(10, ge=1, le=100, description="Number of resumes to return"),
+        min_shared_keywords: int = Query(
+            0, ge=0, description="Only score resumes sharing at least this many keywords (0 scores all)"
+        ),
+        lexical_fusion: bool = Query(
+            False, description="Fuse embedding similarity with BM25 over the raw resumes"
+        ),
+        db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the top_k processed resumes for a job, best match first.
+
+    Args:
+        job_id: The ID of the job to match
+        top_k: Number of resumes to return
+        min_shared_keywords: Keyword overlap required before a resume is scored
+        lexical_fusion: Fuse the cosine ranking with BM25 (reciprocal rank fusion)
+
+    Returns:
+        The ranked resumes with their similarity scores and processed data
+
+    Raises:
+        HTTPException: If the job or its embedding is not found or if matching fails.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        match_service = MatchService(db)
+        matches = await match_service.match_resumes_for_job(
+            job_id=job_id,
+            top_k=top_k,
+            min_shared_keywords=min_shared_keywords,
+            lexical_fusion=lexical_fusion,
+        )
 
         return JSONResponse(
             content={
                 "request_id": request_id,
-                "data": job_data,
+                "data": {
+                    "job_id": job_id,
+                    "matches": matches,
+                },
             },
             headers=headers,
         )
 
+    except (JobNotFoundError, EmbeddingNotFoundError) as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error matching job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error matching resumes to job",
+        )
+
+
+@app.post(
+    "/improve_resume",
+    summary="Iteratively rewrite a resume towards a job's keywords",
+)
+async def improve_resume(
+        request: Request,
+        payload: ResumeImprovementRequest,
+        db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Asks the LLM for rewrites of the resume until its similarity to the job's keywords
+    stops improving, the round limit is hit or the time budget runs out.
+
+    Args:
+        payload: The resume and job IDs, optionally the maximum number of rewrites
+
+    Returns:
+        The original and best similarity, the best rewrite and per-round scores
+
+    Raises:
+        HTTPException: If the resume or job is not found or the improvement fails.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        improvement_service = ResumeImprovementService(
+            db,
+            provider=request.app.state.llm_provider,
+            embedding_provider=request.app.state.embedding_provider,
+        )
+        result = await improvement_service.improve(
+            resume_id=str(payload.resume_id),
+            job_id=str(payload.job_id),
+            max_iterations=payload.max_iterations,
+        )
+    except (ResumeNotFoundError, JobNotFoundError) as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error improving resume: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error improving resume",
+        )
+
+    return JSONResponse(
+        content={"request_id": request_id, "data": result},
+        headers=headers,
+    )
+
+
+@app.get(
+    "/jobs/{job_id}/candidates",
+    summary="Best resumes for a job from the persisted match scores",
+)
+async def job_candidates(
+        request: Request,
+        job_id: str,
+        limit: int = Query(10, ge=1, le=1000, description="Number of resumes to return"),
+        offset: int = Query(0, ge=0, description="Number of top resumes to skip"),
+        min_score: float | None = Query(None, description="Only return scores at or above this"),
+        db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Reads the persisted scores of a job, best first. Scores are written in the background
+    when a resume or job is processed, so a new upload appears after a short delay.
+
+    Args:
+        job_id: The ID of the job
+        limit: Number of resumes to return
+        offset: Number of top resumes to skip, for paging
+        min_score: Lower bound on the combined score
+
+    Returns:
+        The resumes with their combined score, score components and scorer version
+
+    Raises:
+        HTTPException: If the job is not found or the read fails.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        candidates = await ScoringService(db).top_resumes_for_job(
+            job_id, limit=limit, offset=offset, min_score=min_score
+        )
     except JobNotFoundError as e:
         logger.error(str(e))
         raise HTTPException(
@@ -255,8 +668,181 @@ async def get_job(
             detail=str(e),
         )
     except Exception as e:
-        logger.error(f"Error fetching job: {str(e)}")
+        logger.error(f"Error reading candidates: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error fetching job data",
+            detail="Error reading candidates for job",
         )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": {"job_id": job_id, "candidates": candidates},
+        },
+        headers=headers,
+    )
+
+
+@app.get(
+    "/resumes:search",
+    summary="Find processed resumes by their extracted keywords",
+)
+async def search_resumes(
+        request: Request,
+        keywords: List[str] = Query(..., description="Keywords to look for (exact match)"),
+        match_all: bool = Query(False, description="Require every keyword instead of any"),
+        limit: int = Query(100, ge=1, le=1000, description="Maximum number of resume IDs"),
+        db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the IDs of processed resumes whose extracted keywords match, newest first.
+
+    Args:
+        keywords: Keywords to look for
+        match_all: Require every keyword instead of any
+        limit: Maximum number of resume IDs
+
+    Returns:
+        The matching resume IDs
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        resume_service = ResumeService(db)
+        resume_ids = await resume_service.find_resume_ids_by_keywords(
+            keywords=keywords, match_all=match_all, limit=limit
+        )
+
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": {"resume_ids": resume_ids},
+            },
+            headers=headers,
+        )
+
+    except Exception as e:
+        logger.error(f"Error searching resumes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error searching resumes",
+        )
+
+
+@app.get(
+    "/resumes:lexicalSearch",
+    summary="Rank raw resumes against a free-text query with BM25",
+)
+async def lexical_search_resumes(
+        request: Request,
+        query: str = Query(..., min_length=1, description="Search text, e.g. skills or a job title"),
+        top_k: int = Query(10, ge=1, le=100, description="Number of resumes to return"),
+        db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the top_k resumes for a query by BM25 over their markdown, best match first.
+
+    Args:
+        query: The search text
+        top_k: Number of resumes to return
+
+    Returns:
+        The ranked resume IDs with their BM25 scores
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        match_service = MatchService(db)
+        matches = await match_service.lexical_search(query=query, top_k=top_k)
+
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": {"matches": matches},
+            },
+            headers=headers,
+        )
+
+    except Exception as e:
+        logger.error(f"Error searching resumes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error searching resumes",
+        )
+
+
+@app.get(
+    "/tasks/{task_id}",
+    summary="Get the state of a queued resume or job ingestion task",
+)
+async def get_task(
+        task_id: str,
+        request: Request,
+        db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Reports whether an ingestion task is queued, running, done or failed.
+
+    Args:
+        task_id: The ID returned by an asynchronous upload
+
+    Returns:
+        The task state, with the resume or job ID once it is done
+
+    Raises:
+        HTTPException: If the task is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        task_data = await TaskService(db).get_task(task_id)
+    except TaskNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": task_data,
+        },
+        headers=headers,
+    )
+
+
+@app.get(
+    "/rate_limits",
+    summary="Get the current state of the LLM and embedding rate limiters of this worker",
+)
+async def get_rate_limits(request: Request):
+    """
+    Reports bucket levels, the adaptive concurrency limit, in-flight calls and 429 counts.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": all_rate_limiters(),
+        },
+        headers={"X-Request-ID": request_id},
+    )
+
+
+@app.get(
+    "/metrics",
+    summary="Get this worker's pipeline, provider, cache and database pool metrics",
+)
+async def get_metrics():
+    """
+    Reports the metrics of this worker in the Prometheus text exposition format.
+    """
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,3 +1,54 @@
 from .agent_manager import AgentManager, EmbeddingManager
+from .base import Provider, EmbeddingProvider
+from .openai_provider import OpenAIProvider, OpenAIEmbeddingProvider, make_async_client
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter, all_rate_limiters
+from .single_flight import SingleFlight, get_single_flight
+from .resilience import (
+    TransientProviderError,
+    RetryPolicy,
+    HedgePolicy,
+    ResilientProvider,
+    ResilientEmbeddingProvider,
+    make_resilient_provider,
+    make_resilient_embedding_provider,
+)
+from .fake_provider import (
+    FakeProvider,
+    FakeEmbeddingProvider,
+    LatencyModel,
+    fake_response,
+    make_fake_provider,
+    make_fake_embedding_provider,
+)
+from .tokens import count_tokens, TokenLedger, get_token_ledger
 
-__all__ = ["AgentManager", "EmbeddingManager"]
\ No newline at end of file
+__all__ = [
+    "AgentManager",
+    "EmbeddingManager",
+    "Provider",
+    "EmbeddingProvider",
+    "OpenAIProvider",
+    "OpenAIEmbeddingProvider",
+    "make_async_client",
+    "AdaptiveRateLimiter",
+    "get_rate_limiter",
+    "all_rate_limiters",
+    "SingleFlight",
+    "get_single_flight",
+    "TransientProviderError",
+    "RetryPolicy",
+    "HedgePolicy",
+    "ResilientProvider",
+    "ResilientEmbeddingProvider",
+    "make_resilient_provider",
+    "make_resilient_embedding_provider",
+    "FakeProvider",
+    "FakeEmbeddingProvider",
+    "LatencyModel",
+    "fake_response",
+    "make_fake_provider",
+    "make_fake_embedding_provider",
+    "count_tokens",
+    "TokenLedger",
+    "get_token_ledger",
+]
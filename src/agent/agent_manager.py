@@ -1,14 +1,37 @@
 import os
-from typing import Dict, Any
+import json
+import hashlib
+from functools import lru_cache
+from typing import Dict, Any, List
 from dotenv import load_dotenv
 load_dotenv()
 
 from .wrapper import MDWrapper, JSONWrapper
+from .base import Provider, EmbeddingProvider
 from .openai_provider import OpenAIProvider, OpenAIEmbeddingProvider
+from .single_flight import SingleFlight, get_single_flight
+from .resilience import make_resilient_provider, make_resilient_embedding_provider
+from .fake_provider import make_fake_provider, make_fake_embedding_provider
+from src.core.config import settings
+from src.core.tracing import span
+
+
+@lru_cache(maxsize=8)
+def _make_provider(api_key: str | None, model: str) -> Provider:
+    """Create (or return) a shared provider for callers that were not given one."""
+    if settings.LLM_PROVIDER == "fake":
+        return make_resilient_provider(make_fake_provider())
+    return make_resilient_provider(OpenAIProvider(api_key=api_key, model=model))
 
 
 class AgentManager:
-    def __init__(self, strategy: str | None = None, model: str = 'gpt-4.1-nano') -> None:
+    def __init__(
+            self,
+            strategy: str | None = None,
+            model: str | None = None,
+            provider: Provider | None = None,
+            single_flight: SingleFlight | None = None,
+    ) -> None:
         match strategy:
             case "md":
                 self.strategy = MDWrapper()
@@ -16,37 +39,84 @@ class AgentManager:
                 self.strategy = JSONWrapper()
             case _:
                 self.strategy = JSONWrapper()
-        self.model = model
+        self._provider = provider
+        self._single_flight = single_flight or get_single_flight()
+        self.model = (
+            model
+            or getattr(provider, "model", None)
+            or os.getenv("OPENAI_MODEL")
+            or "gpt-4.1-nano"
+        )
 
-    async def _get_provider(self, **kwargs: Any) -> OpenAIProvider:
+    async def _get_provider(self, **kwargs: Any) -> Provider:
+        if self._provider is not None and not {"openai_api_key", "model"} & kwargs.keys():
+            return self._provider
         api_key = kwargs.get("openai_api_key", os.getenv("OPENAI_API_KEY"))
-        if api_key:
-            return OpenAIProvider(api_key=api_key)
         model = kwargs.get("model", self.model)
 
-        return OpenAIProvider(model=model)
+        return _make_provider(api_key, model)
+
+    def _flight_key(self, prompt: str, provider: Provider, kwargs: Dict[str, Any]) -> str:
+        options = {k: v for k, v in kwargs.items() if k != "openai_api_key"}
+        identity = json.dumps(
+            [type(self.strategy).__name__, provider.model, options], sort_keys=True, default=str
+        )
+        return hashlib.sha256(f"{identity}\x1f{prompt}".encode("utf-8")).hexdigest()
 
     async def run(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
         """
         Run the agent with the given prompt and generation arguments.
+
+        Identical concurrent runs (same prompt, strategy, model and arguments) share one
+        provider call, see ``SingleFlight``.
         """
         provider = await self._get_provider(**kwargs)
-        return await self.strategy(prompt, provider, **kwargs)
+        with span("agent.run", model=provider.model, strategy=type(self.strategy).__name__):
+            return await self._single_flight.do(
+                self._flight_key(prompt, provider, kwargs),
+                lambda: self.strategy(prompt, provider, **kwargs),
+            )
+
+
+@lru_cache(maxsize=8)
+def _make_embedding_provider(api_key: str | None, model: str) -> EmbeddingProvider:
+    """Create (or return) a shared provider for callers that were not given one."""
+    if settings.LLM_PROVIDER == "fake":
+        return make_resilient_embedding_provider(make_fake_embedding_provider())
+    return make_resilient_embedding_provider(
+        OpenAIEmbeddingProvider(
+            api_key=api_key,
+            embedding_model=model,
+            max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        )
+    )
 
 
 class EmbeddingManager:
-    def __init__(self, model: str = "text-embedding-3-small") -> None:
-        self._model = model
+    def __init__(
+            self, model: str | None = None, provider: EmbeddingProvider | None = None
+    ) -> None:
+        self._provider = provider
+        self._model = model or os.getenv("OPENAI_EMBEDDING_MODEL") or "text-embedding-3-small"
+
+    @property
+    def model(self) -> str:
+        """
+        Name of the embedding model, part of any cache key for its vectors.
+        """
+        return self._model
 
     async def _get_embedding_provider(
             self, **kwargs: Any
-    ) -> OpenAIEmbeddingProvider:
+    ) -> EmbeddingProvider:
+        if self._provider is not None and not {"openai_api_key", "embedding_model"} & kwargs.keys():
+            return self._provider
         api_key = kwargs.get("openai_api_key", os.getenv("OPENAI_API_KEY"))
-        if api_key:
-            return OpenAIEmbeddingProvider(api_key=api_key)
         model = kwargs.get("embedding_model", self._model)
 
-        return OpenAIEmbeddingProvider(embedding_model=model)
+        return _make_embedding_provider(api_key, model)
 
     async def embed(self, text: str, **kwargs: Any) -> list[float]:
         """
@@ -54,3 +124,10 @@ class EmbeddingManager:
         """
         provider = await self._get_embedding_provider(**kwargs)
         return await provider.embed(text)
+
+    async def embed_many(self, texts: List[str], **kwargs: Any) -> List[list[float]]:
+        """
+        Get embeddings for many texts, batched and sent concurrently, in input order.
+        """
+        provider = await self._get_embedding_provider(**kwargs)
+        return await provider.embed_many(texts)
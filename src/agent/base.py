@@ -1,12 +1,16 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 from abc import ABC, abstractmethod
 
+from .batching import run_batched
+
 
 class Provider(ABC):
     """
     Abstract base class for providers.
     """
 
+    model: str | None = None
+
     @abstractmethod
     async def __call__(self, prompt: str, **generation_args: Any) -> str: ...
 
@@ -14,11 +18,38 @@ class Provider(ABC):
 class EmbeddingProvider(ABC):
     """
     Abstract base class for embedding providers.
+
+    Subclasses that accept several inputs per request override ``embed_batch`` and the
+    batch limits; ``embed_many`` then handles packing, concurrency and ordering.
     """
 
+    model: str | None = None
+    max_batch_size: int = 1
+    max_batch_tokens: int = 8191
+    max_concurrency: int = 4
+
     @abstractmethod
     async def embed(self, text: str) -> list[float]: ...
 
+    async def embed_batch(self, texts: List[str]) -> List[list[float]]:
+        """
+        Embeds one provider-sized batch in a single request.
+        """
+        return [await self.embed(text) for text in texts]
+
+    async def embed_many(self, texts: List[str]) -> List[list[float]]:
+        """
+        Embeds any number of texts, returning embeddings in input order.
+        """
+        return await run_batched(
+            texts,
+            self.embed_batch,
+            max_items=self.max_batch_size,
+            max_tokens=self.max_batch_tokens,
+            max_concurrency=self.max_concurrency,
+            model=self.model,
+        )
+
 
 class Strategy(ABC):
     @abstractmethod
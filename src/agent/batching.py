@@ -0,0 +1,63 @@
+import asyncio
+from typing import Awaitable, Callable, List, TypeVar
+
+from .tokens import count_tokens
+
+T = TypeVar("T")
+
+
+def pack_batches(
+        texts: List[str], max_items: int, max_tokens: int, model: str | None = None
+) -> List[List[int]]:
+    """
+    Greedily packs input positions into batches of at most ``max_items`` texts and
+    ``max_tokens`` tokens, counted with ``count_tokens`` for ``model``: a character-based
+    estimate undercounts code and non-Latin text, and an over-limit request fails as a
+    whole. A single text over the token budget gets a batch of its own rather than being
+    dropped.
+
+    Returns:
+        Batches of indices into ``texts``, in input order.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = count_tokens(text, model)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def run_batched(
+        texts: List[str],
+        call: Callable[[List[str]], Awaitable[List[T]]],
+        max_items: int,
+        max_tokens: int,
+        max_concurrency: int,
+        model: str | None = None,
+) -> List[T]:
+    """
+    Splits ``texts`` with ``pack_batches``, runs ``call`` on every batch with at most
+    ``max_concurrency`` batches in flight, and returns the results in input order.
+    """
+    results: List[T | None] = [None] * len(texts)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(batch: List[int]) -> None:
+        async with semaphore:
+            outputs = await call([texts[i] for i in batch])
+        if len(outputs) != len(batch):
+            raise RuntimeError(
+                f"Batch call returned {len(outputs)} results for {len(batch)} inputs"
+            )
+        for index, output in zip(batch, outputs):
+            results[index] = output
+
+    await asyncio.gather(*(run(batch) for batch in pack_batches(texts, max_items, max_tokens, model)))
+    return results
@@ -0,0 +1,294 @@
+import re
+import json
+import random
+import asyncio
+import hashlib
+import logging
+from collections import Counter
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+from src.core.config import settings
+from .base import Provider, EmbeddingProvider
+from .resilience import TransientProviderError
+from .tokens import estimate_tokens
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter, LLM_LIMITER, EMBEDDING_LIMITER
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_BLOCK = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
+_ORIGINAL_RESUME = re.compile(r"Original Resume:\n```md\n(.*?)```", re.DOTALL)
+_JOB_KEYWORDS = re.compile(r"Extracted Job Keywords:\n```md\n(.*?)```", re.DOTALL)
+_WORD = re.compile(r"[A-Za-z][A-Za-z+#.\-]{2,}")
+_STOPWORDS = frozenset(
+    "the and for with you your are our this that from will have has not but all any can "
+    "json schema string output only valid resume text exact please note format markdown "
+    "fields field values make sure dates use raw must into following job posting section "
+    "extract extracted keys key empty list other parts separately compose extra commentary "
+    "engine convert precisely specified below present ongoing user does add prose".split()
+)
+# values the Pydantic models accept for enum-like fields
+_FIXED_VALUES = {"employmentType": "Full-time", "remoteStatus": "Remote"}
+
+
+class LatencyModel:
+    """
+    Samples simulated call latencies in seconds.
+
+    ``kind`` is one of ``constant`` (always ``mean``), ``uniform`` (``low``..``high``),
+    ``lognormal`` (median ``mean``, shape ``sigma``) or ``tail`` (``mean`` with probability
+    ``1 - tail_probability``, otherwise ``tail`` seconds).
+    """
+
+    def __init__(
+            self,
+            kind: str = "constant",
+            mean: float = 0.0,
+            low: float = 0.0,
+            high: float = 0.0,
+            sigma: float = 0.5,
+            tail: float = 0.0,
+            tail_probability: float = 0.0,
+    ) -> None:
+        if kind not in {"constant", "uniform", "lognormal", "tail"}:
+            raise ValueError(f"Unknown latency model '{kind}'")
+        self.kind = kind
+        self.mean = mean
+        self.low = low
+        self.high = high
+        self.sigma = sigma
+        self.tail = tail
+        self.tail_probability = tail_probability
+
+    def sample(self, rng: random.Random) -> float:
+        match self.kind:
+            case "constant":
+                return self.mean
+            case "uniform":
+                return rng.uniform(self.low, self.high)
+            case "lognormal":
+                return self.mean * rng.lognormvariate(0.0, self.sigma)
+            case "tail":
+                return self.tail if rng.random() < self.tail_probability else self.mean
+
+
+def _document_words(text: str, limit: int = 8) -> List[str]:
+    counts = Counter(
+        word for word in (match.group(0).lower().rstrip(".-") for match in _WORD.finditer(text))
+        if word not in _STOPWORDS
+    )
+    return [word for word, _ in counts.most_common(limit)]
+
+
+def _fill(node: Any, key: str, words: List[str]) -> Any:
+    """
+    Value shaped like the JSON schema ``node`` (as written in ``src.schemas.json``).
+    """
+    if isinstance(node, dict):
+        return {child: _fill(value, child, words) for child, value in node.items()}
+    if isinstance(node, list):
+        item = node[0] if node else "string"
+        if isinstance(item, str):
+            return list(words) if "keyword" in key.lower() or "technolog" in key.lower() else [
+                f"{key} {word}" for word in words[:2] or ["item"]
+            ]
+        count = min(3, len(words)) if key == "Skills" else 1
+        return [_fill(item, key, words[i:] + words[:i]) for i in range(max(count, 1))]
+    if key in _FIXED_VALUES:
+        return _FIXED_VALUES[key]
+    if isinstance(node, str) and node.startswith("YYYY-MM-DD"):
+        return "2020-01-01"
+    lowered = key.lower()
+    if "email" in lowered:
+        return "candidate@example.com"
+    if "link" in lowered or lowered in ("website", "portfolio"):
+        return f"https://example.com/{lowered}"
+    return words[0] if words else key
+
+
+def fake_response(prompt: str) -> str:
+    """
+    Deterministic, schema-valid response to the repo's prompts.
+
+    Extraction prompts (a ```json schema block followed by the document) get the schema
+    filled in, with the document's most frequent words as keywords, skills and names;
+    resume improvement prompts get the original resume back with the job keywords added.
+    Anything else is echoed as JSON.
+    """
+    original = _ORIGINAL_RESUME.search(prompt)
+    if original:
+        keywords = _JOB_KEYWORDS.search(prompt)
+        added = keywords.group(1).strip() if keywords else ""
+        return original.group(1).rstrip() + (f"\n\nSkills: {added}\n" if added else "\n")
+    schema = _SCHEMA_BLOCK.search(prompt)
+    if schema:
+        try:
+            node = json.loads(schema.group(1))
+        except json.JSONDecodeError:
+            node = None
+        if isinstance(node, dict):
+            return json.dumps(_fill(node, "", _document_words(prompt[schema.end():])))
+    return json.dumps({"echo": prompt[:64]})
+
+
+class _Simulated:
+    """
+    Latency and fault injection shared by the fake providers.
+
+    Calls are admitted by ``limiter`` like real provider calls, and an injected 429 is
+    reported to it, so limiter state and backoff can be exercised offline.
+    """
+
+    def __init__(
+            self,
+            latency: Optional[LatencyModel],
+            error_rate: float,
+            rate_limit_rate: float,
+            retry_after: Optional[float],
+            seed: Optional[int],
+            limiter: AdaptiveRateLimiter,
+    ) -> None:
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._limiter = limiter
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    async def _simulate(self, tokens: int) -> None:
+        self.calls += 1
+        async with self._limiter.acquire(tokens=tokens) as slot:
+            await asyncio.sleep(self.latency.sample(self._rng))
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.failures += 1
+                slot.record_rate_limited(self.retry_after)
+                raise TransientProviderError("Fake provider - rate limited", retry_after=self.retry_after)
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.failures += 1
+                raise TransientProviderError("Fake provider - server error")
+            slot.record_usage(tokens)
+
+
+class FakeProvider(_Simulated, Provider):
+    """
+    Offline stand-in for an LLM provider, for exercising retries, hedging and limits.
+
+    Each call sleeps for a latency drawn from ``latency``, then fails with probability
+    ``error_rate`` (a retryable 5xx-like error) or ``rate_limit_rate`` (a 429-like error
+    carrying ``retry_after``), and otherwise returns ``respond(prompt)``, by default
+    ``fake_response``.
+    """
+
+    def __init__(
+            self,
+            latency: Optional[LatencyModel] = None,
+            error_rate: float = 0.0,
+            rate_limit_rate: float = 0.0,
+            retry_after: Optional[float] = None,
+            respond: Optional[Callable[[str], str]] = None,
+            seed: Optional[int] = None,
+            model: str = "fake",
+            limiter: Optional[AdaptiveRateLimiter] = None,
+    ) -> None:
+        super().__init__(
+            latency, error_rate, rate_limit_rate, retry_after, seed,
+            limiter or get_rate_limiter(LLM_LIMITER),
+        )
+        self.respond = respond or fake_response
+        self.model = model
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        await self._simulate(estimate_tokens(prompt) + settings.LLM_RESERVED_OUTPUT_TOKENS)
+        return self.respond(prompt)
+
+
+class FakeEmbeddingProvider(_Simulated, EmbeddingProvider):
+    """
+    Offline stand-in for an embedding provider with the same latency and fault injection
+    as ``FakeProvider`` (one draw per request, i.e. per batch).
+
+    Embeddings are deterministic hashed bags of words: texts sharing words point in
+    similar directions, so matching and ranking behave plausibly.
+    """
+
+    def __init__(
+            self,
+            dim: int = 256,
+            latency: Optional[LatencyModel] = None,
+            error_rate: float = 0.0,
+            rate_limit_rate: float = 0.0,
+            retry_after: Optional[float] = None,
+            seed: Optional[int] = None,
+            max_batch_size: int = 256,
+            limiter: Optional[AdaptiveRateLimiter] = None,
+    ) -> None:
+        super().__init__(
+            latency, error_rate, rate_limit_rate, retry_after, seed,
+            limiter or get_rate_limiter(EMBEDDING_LIMITER),
+        )
+        self.dim = dim
+        self.max_batch_size = max_batch_size
+
+    def vector(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in _WORD.findall(text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if (digest >> 32) & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            vector[0], norm = 1.0, 1.0
+        return (vector / norm).tolist()
+
+    async def embed(self, text: str) -> list[float]:
+        await self._simulate(estimate_tokens(text))
+        return self.vector(text)
+
+    async def embed_batch(self, texts: List[str]) -> List[list[float]]:
+        await self._simulate(sum(estimate_tokens(text) for text in texts))
+        return [self.vector(text) for text in texts]
+
+
+def _latency_from_settings(mean: float) -> LatencyModel:
+    # "uniform" spreads +-50% around the mean
+    return LatencyModel(
+        kind=settings.FAKE_LATENCY_KIND,
+        mean=mean,
+        low=mean / 2,
+        high=mean * 3 / 2,
+        sigma=settings.FAKE_LATENCY_SIGMA,
+        tail=settings.FAKE_LATENCY_TAIL,
+        tail_probability=settings.FAKE_LATENCY_TAIL_PROBABILITY,
+    )
+
+
+def make_fake_provider() -> FakeProvider:
+    """
+    ``FakeProvider`` with the latency and fault rates configured in settings.
+    """
+    return FakeProvider(
+        latency=_latency_from_settings(settings.FAKE_LATENCY_MEAN),
+        error_rate=settings.FAKE_ERROR_RATE,
+        rate_limit_rate=settings.FAKE_RATE_LIMIT_RATE,
+        retry_after=settings.FAKE_RETRY_AFTER,
+        seed=settings.FAKE_SEED,
+    )
+
+
+def make_fake_embedding_provider() -> FakeEmbeddingProvider:
+    """
+    ``FakeEmbeddingProvider`` with the dimension, latency and fault rates configured in
+    settings.
+    """
+    return FakeEmbeddingProvider(
+        dim=settings.FAKE_EMBEDDING_DIM,
+        latency=_latency_from_settings(settings.FAKE_EMBEDDING_LATENCY_MEAN),
+        error_rate=settings.FAKE_ERROR_RATE,
+        rate_limit_rate=settings.FAKE_RATE_LIMIT_RATE,
+        retry_after=settings.FAKE_RETRY_AFTER,
+        seed=settings.FAKE_SEED,
+        max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+    )
@@ -1,42 +1,104 @@
 import os
 import logging
 
-from openai import OpenAI
-from typing import Any, Dict
-from fastapi.concurrency import run_in_threadpool
+import httpx
+from openai import AsyncOpenAI, RateLimitError
+from typing import Any, List
 
+from src.core.config import settings
 from .base import Provider, EmbeddingProvider
+from .tokens import estimate_tokens, count_tokens, get_token_ledger
+from .rate_limiter import (
+    AdaptiveRateLimiter,
+    RateLimitSlot,
+    get_rate_limiter,
+    LLM_LIMITER,
+    EMBEDDING_LIMITER,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def make_async_client(api_key: str | None = None) -> AsyncOpenAI:
+    """
+    Builds an ``AsyncOpenAI`` client on a keep-alive HTTP connection pool sized by settings.
+
+    Create one per process and share it between providers; close it with ``await client.close()``.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OpenAI API key is missing")
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT
+        ),
+    )
+    # retries are handled by ResilientProvider, so every 429 is seen by the rate limiter
+    return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def _record_rate_limit(slot: RateLimitSlot, error: RateLimitError) -> None:
+    retry_after = (
+        error.response.headers.get("retry-after") if error.response is not None else None
+    )
+    try:
+        slot.record_rate_limited(float(retry_after) if retry_after else None)
+    except ValueError:
+        slot.record_rate_limited()
+
+
+def _total_tokens(response: Any) -> int | None:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
 class OpenAIProvider(Provider):
-    def __init__(self, api_key: str | None = None, model: str = os.getenv('OPENAI_MODEL')):
-        api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+    def __init__(
+            self,
+            api_key: str | None = None,
+            model: str = os.getenv('OPENAI_MODEL'),
+            client: AsyncOpenAI | None = None,
+            limiter: AdaptiveRateLimiter | None = None,
+    ):
+        self._client = client or make_async_client(api_key)
+        self._limiter = limiter or get_rate_limiter(LLM_LIMITER)
         self.model = model
         self.instructions = ""
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
-        try:
-            response = self._client.responses.create(
-                model=self.model,
-                instructions=self.instructions,
-                input=prompt,
-                **options,
-            )
-            return response.output_text
-        except Exception as e:
-            raise RuntimeError(f"OpenAI - error generating response: {e}") from e
-
     async def __call__(self, prompt: str, **generation_args: Any) -> str:
         opts = {
             "temperature": generation_args.get("temperature", 0),
             "top_p": generation_args.get("top_p", 0.9),
         }
-        return await run_in_threadpool(self._generate_sync, prompt, opts)
+        prompt_tokens = count_tokens(prompt, self.model)
+        reserved = prompt_tokens + settings.LLM_RESERVED_OUTPUT_TOKENS
+        async with self._limiter.acquire(tokens=reserved) as slot:
+            try:
+                response = await self._client.responses.create(
+                    model=self.model,
+                    instructions=self.instructions,
+                    input=prompt,
+                    **opts,
+                )
+            except RateLimitError as e:
+                _record_rate_limit(slot, e)
+                raise RuntimeError(f"OpenAI - rate limited generating response: {e}") from e
+            except Exception as e:
+                raise RuntimeError(f"OpenAI - error generating response: {e}") from e
+            slot.record_usage(_total_tokens(response))
+        usage = getattr(response, "usage", None)
+        get_token_ledger().record(
+            f"llm.{self.model}",
+            estimated_input_tokens=prompt_tokens,
+            input_tokens=getattr(usage, "input_tokens", None),
+            output_tokens=getattr(usage, "output_tokens", None),
+        )
+        return response.output_text
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
@@ -44,18 +106,38 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
             self,
             api_key: str | None = None,
             embedding_model: str = os.getenv("OPENAI_EMBEDDING_MODEL"),
+            max_batch_size: int = 256,
+            max_batch_tokens: int = 250_000,
+            max_concurrency: int = 4,
+            client: AsyncOpenAI | None = None,
+            limiter: AdaptiveRateLimiter | None = None,
     ):
-        api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
-        self._model = embedding_model
+        self._client = client or make_async_client(api_key)
+        self._limiter = limiter or get_rate_limiter(EMBEDDING_LIMITER)
+        self.model = embedding_model
+        # OpenAI accepts up to 2048 inputs and 300k tokens per embeddings request
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+
+    async def _create_embeddings(self, texts: str | List[str]) -> Any:
+        inputs = [texts] if isinstance(texts, str) else texts
+        reserved = sum(estimate_tokens(text) for text in inputs)
+        async with self._limiter.acquire(tokens=reserved) as slot:
+            try:
+                response = await self._client.embeddings.create(input=texts, model=self.model)
+            except RateLimitError as e:
+                _record_rate_limit(slot, e)
+                raise RuntimeError(f"OpenAI - rate limited generating embeddings: {e}") from e
+            except Exception as e:
+                raise RuntimeError(f"OpenAI - error generating embeddings: {e}") from e
+            slot.record_usage(_total_tokens(response))
+        return response
 
     async def embed(self, text: str) -> list[float]:
-        try:
-            response = await run_in_threadpool(
-                self._client.embeddings.create, input=text, model=self._model
-            )
-            return response["data"][0]["embedding"]
-        except Exception as e:
-            raise RuntimeError(f"OpenAI - error generating embedding: {e}") from e
+        response = await self._create_embeddings(text)
+        return response.data[0].embedding
+
+    async def embed_batch(self, texts: List[str]) -> List[list[float]]:
+        response = await self._create_embeddings(texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
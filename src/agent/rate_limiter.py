@@ -0,0 +1,254 @@
+import time
+import asyncio
+import logging
+import contextlib
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at ``rate_per_minute``.
+
+    Capacity defaults to one minute of budget, so a cold start may burst up to the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until ``amount`` can be consumed (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+    def consume(self, amount: float) -> None:
+        """Takes ``amount`` out of the bucket; may go negative to settle under-estimates."""
+        self._refill()
+        self.level -= amount
+
+
+class RateLimitSlot:
+    """
+    Handle for one admitted call. Report the outcome before leaving the ``acquire`` block:
+    ``record_usage`` once the call succeeded, ``record_rate_limited`` on a 429. A call
+    that reports neither (an error, timeout or cancelled hedge) is treated as failed.
+    """
+
+    def __init__(self, reserved_tokens: int) -> None:
+        self.reserved_tokens = reserved_tokens
+        self.tokens_used: Optional[int] = None
+        self.succeeded = False
+        self.rate_limited = False
+        self.retry_after: Optional[float] = None
+
+    def record_usage(self, tokens_used: Optional[int]) -> None:
+        self.succeeded = True
+        self.tokens_used = tokens_used
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        self.rate_limited = True
+        self.retry_after = retry_after
+
+
+class AdaptiveRateLimiter:
+    """
+    Admission control for calls to one provider endpoint.
+
+    * Token buckets on requests/min and tokens/min keep the average rate under the quota.
+    * An AIMD concurrency limit adapts to what the provider actually sustains: it grows by
+      roughly one slot per window of successful calls under ``latency_target`` (failed or
+      cancelled calls do not count) and is cut by ``backoff`` on a 429 (at most once per
+      ``cooldown`` seconds) or a slow response.
+    * A ``Retry-After`` from a 429 pauses all admissions until it expires.
+
+    Limits are per process; with several workers, configure each with its share of the quota.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            requests_per_minute: float,
+            tokens_per_minute: float,
+            max_concurrency: int,
+            min_concurrency: int = 1,
+            latency_target: float = 20.0,
+            backoff: float = 0.5,
+            latency_backoff: float = 0.9,
+            cooldown: float = 2.0,
+    ) -> None:
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.cooldown = cooldown
+
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._bucket_lock = asyncio.Lock()
+        self._slot_freed = asyncio.Condition()
+
+        self.total_requests = 0
+        self.total_rate_limited = 0
+        self.total_tokens = 0
+        self.total_wait_seconds = 0.0
+        self.latency_ewma: Optional[float] = None
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, tokens: int = 0) -> AsyncIterator[RateLimitSlot]:
+        """
+        Waits for a concurrency slot and bucket budget for a call of ~``tokens`` tokens.
+        """
+        started = time.monotonic()
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(
+                lambda: self.in_flight < max(self.min_concurrency, int(self.concurrency_limit))
+            )
+            self.in_flight += 1
+
+        slot = RateLimitSlot(reserved_tokens=tokens)
+        call_started = None
+        try:
+            async with self._bucket_lock:
+                while True:
+                    delay = max(
+                        self._blocked_until - time.monotonic(),
+                        self.requests.time_until(1),
+                        self.tokens.time_until(tokens),
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+            call_started = time.monotonic()
+            self.total_wait_seconds += call_started - started
+            yield slot
+        finally:
+            if call_started is not None:
+                self._record(slot, time.monotonic() - call_started)
+            async with self._slot_freed:
+                self.in_flight -= 1
+                self._slot_freed.notify_all()
+
+    def _record(self, slot: RateLimitSlot, latency: float) -> None:
+        self.total_requests += 1
+        if slot.tokens_used is not None:
+            # settle the estimate against what the provider reported
+            self.tokens.consume(slot.tokens_used - slot.reserved_tokens)
+            self.total_tokens += slot.tokens_used
+        else:
+            self.total_tokens += slot.reserved_tokens
+
+        now = time.monotonic()
+        if slot.rate_limited:
+            self.total_rate_limited += 1
+            if slot.retry_after:
+                self._blocked_until = max(self._blocked_until, now + slot.retry_after)
+            self._decrease(now, self.backoff)
+            return
+        if not slot.succeeded:
+            # errors, timeouts and cancelled hedges say nothing about spare capacity, but
+            # one that took too long still signals overload
+            if latency > self.latency_target:
+                self._decrease(now, self.latency_backoff)
+            return
+
+        self.latency_ewma = (
+            latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        )
+        if latency > self.latency_target:
+            self._decrease(now, self.latency_backoff)
+        else:
+            self.concurrency_limit = min(
+                float(self.max_concurrency),
+                self.concurrency_limit + 1.0 / max(self.concurrency_limit, 1.0),
+            )
+
+    def _decrease(self, now: float, factor: float) -> None:
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.concurrency_limit
+        self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit * factor)
+        logger.warning(
+            f"Rate limiter '{self.name}' concurrency {previous:.1f} -> {self.concurrency_limit:.1f}"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current limiter state, for the rate limit API.
+        """
+        return {
+            "name": self.name,
+            "concurrency_limit": round(self.concurrency_limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests_available": round(self.requests.available(), 2),
+            "requests_per_minute": round(self.requests.rate * 60, 2),
+            "tokens_available": round(self.tokens.available(), 2),
+            "tokens_per_minute": round(self.tokens.rate * 60, 2),
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            "latency_ewma_seconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "latency_target_seconds": self.latency_target,
+            "total_requests": self.total_requests,
+            "total_rate_limited": self.total_rate_limited,
+            "total_tokens": self.total_tokens,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
+
+
+LLM_LIMITER = "llm"
+EMBEDDING_LIMITER = "embedding"
+
+
+@lru_cache(maxsize=None)
+def get_rate_limiter(name: str) -> AdaptiveRateLimiter:
+    """Create (or return) the process-wide limiter for ``name`` (``llm`` or ``embedding``)."""
+    match name:
+        case "llm":
+            return AdaptiveRateLimiter(
+                name=name,
+                requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                latency_target=settings.LLM_LATENCY_TARGET,
+            )
+        case "embedding":
+            return AdaptiveRateLimiter(
+                name=name,
+                requests_per_minute=settings.EMBEDDING_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.EMBEDDING_TOKENS_PER_MINUTE,
+                max_concurrency=settings.EMBEDDING_REQUEST_CONCURRENCY,
+                latency_target=settings.EMBEDDING_LATENCY_TARGET,
+            )
+        case _:
+            raise KeyError(f"Rate limiter '{name}' not found. Available: llm, embedding")
+
+
+def all_rate_limiters() -> Dict[str, Dict[str, Any]]:
+    return {name: get_rate_limiter(name).snapshot() for name in (LLM_LIMITER, EMBEDDING_LIMITER)}
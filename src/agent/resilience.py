@@ -0,0 +1,308 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+from openai import APIConnectionError, APIStatusError
+
+from src.core.config import settings
+from src.core.metrics import PROVIDER_CALLS, PROVIDER_CALL_SECONDS
+from src.core.tracing import span
+from .base import Provider, EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TransientProviderError(RuntimeError):
+    """
+    Raised by providers for failures that are worth retrying (timeouts, 429s, 5xx).
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Walks the exception chain; providers wrap SDK errors in RuntimeError.
+    """
+    while error is not None:
+        if isinstance(error, (TransientProviderError, APIConnectionError, asyncio.TimeoutError)):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in _RETRYABLE_STATUS
+        error = error.__cause__
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    while error is not None:
+        if isinstance(error, TransientProviderError):
+            return error.retry_after
+        if isinstance(error, APIStatusError):
+            try:
+                return float(error.response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                return None
+        error = error.__cause__
+    return None
+
+
+class RetryPolicy:
+    """
+    Retries retryable failures with full-jitter exponential backoff.
+
+    Attempt ``n`` (0-based) sleeps ``uniform(0, min(max_delay, base_delay * 2**n))``, or the
+    provider's ``Retry-After`` when that is longer. ``attempt_timeout`` bounds each attempt.
+    """
+
+    def __init__(
+            self,
+            max_retries: int = 3,
+            base_delay: float = 0.5,
+            max_delay: float = 20.0,
+            attempt_timeout: Optional[float] = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.retries = 0
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            try:
+                if self.attempt_timeout is None:
+                    return await call()
+                return await asyncio.wait_for(call(), self.attempt_timeout)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt, e)
+                logger.warning(
+                    f"Retrying provider call in {delay:.2f}s (attempt {attempt + 1}): {e!r}"
+                )
+                self.retries += 1
+                attempt += 1
+                with span("retry.backoff", attempt=attempt, delay=round(delay, 3)):
+                    await asyncio.sleep(delay)
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent successful call latencies.
+    """
+
+    def __init__(self, window: int = 500) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgePolicy:
+    """
+    Fires a second identical request when the first is slower than the observed
+    ``percentile`` latency, and keeps whichever finishes first.
+
+    Hedging stays off until ``min_samples`` latencies are observed, and extra requests are
+    capped at ``max_ratio`` of all requests, so the default of 0.1 adds at most ~10% spend.
+    """
+
+    def __init__(
+            self, percentile: float = 95.0, max_ratio: float = 0.1, min_samples: int = 20
+    ) -> None:
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if no hedge is allowed now."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        if self.hedges + 1 > self.max_ratio * max(self.requests, 1):
+            return None
+        return self.latencies.percentile(self.percentile)
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        started = loop.time()
+        primary = asyncio.ensure_future(call())
+        try:
+            delay = self.delay()
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done:
+                    return await self._race(primary, call, started)
+            result = await primary
+        finally:
+            if not primary.done():
+                primary.cancel()
+        self.latencies.record(loop.time() - started)
+        return result
+
+    async def _race(self, primary: asyncio.Future, call: Callable[[], Awaitable[T]], started: float) -> T:
+        loop = asyncio.get_running_loop()
+        self.hedges += 1
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        self.latencies.record(loop.time() - started)
+                        return task.result()
+                    if error is None or task is primary:
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def _observed(kind: str, model: Optional[str], call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Awaits one provider attempt in a ``{kind}.attempt`` span, counting it by outcome and
+    recording its latency.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    attempt_span = None
+    try:
+        with span(f"{kind}.attempt", model=model) as attempt_span:
+            result = await call()
+        outcome = "ok"
+        return result
+    except asyncio.CancelledError:
+        # a lost hedge race or an attempt timeout
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        outcome = "retryable" if is_retryable(e) else "error"
+        raise
+    finally:
+        model = model or "unknown"
+        if attempt_span is not None:
+            attempt_span.attributes["outcome"] = outcome
+        PROVIDER_CALLS.inc(kind=kind, model=model, outcome=outcome)
+        PROVIDER_CALL_SECONDS.observe(time.perf_counter() - started, kind=kind, model=model)
+
+
+class ResilientProvider(Provider):
+    """
+    Wraps a provider with a retry policy and optional request hedging.
+
+    Each retry attempt is hedged independently.
+    """
+
+    def __init__(
+            self,
+            inner: Provider,
+            retry: Optional[RetryPolicy] = None,
+            hedge: Optional[HedgePolicy] = None,
+    ) -> None:
+        self.inner = inner
+        self.retry = retry or RetryPolicy()
+        self.hedge = hedge
+        self.model = inner.model
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        def call() -> Awaitable[str]:
+            return _observed("llm", self.model, lambda: self.inner(prompt, **generation_args))
+
+        def attempt() -> Awaitable[str]:
+            if self.hedge is None:
+                return call()
+            return self.hedge.run(call)
+
+        return await self.retry.run(attempt)
+
+
+class ResilientEmbeddingProvider(EmbeddingProvider):
+    """
+    Wraps an embedding provider with a retry policy, keeping its batch limits.
+    """
+
+    def __init__(self, inner: EmbeddingProvider, retry: Optional[RetryPolicy] = None) -> None:
+        self.inner = inner
+        self.retry = retry or RetryPolicy()
+        self.max_batch_size = inner.max_batch_size
+        self.max_batch_tokens = inner.max_batch_tokens
+        self.max_concurrency = inner.max_concurrency
+        self.model = getattr(inner, "model", None) or type(inner).__name__
+
+    async def embed(self, text: str) -> list[float]:
+        return await self.retry.run(
+            lambda: _observed("embedding", self.model, lambda: self.inner.embed(text))
+        )
+
+    async def embed_batch(self, texts: List[str]) -> List[list[float]]:
+        return await self.retry.run(
+            lambda: _observed("embedding", self.model, lambda: self.inner.embed_batch(texts))
+        )
+
+
+def make_resilient_provider(inner: Provider) -> ResilientProvider:
+    """
+    Wraps ``inner`` with the retry and hedging policies configured in settings.
+    """
+    hedge = None
+    if settings.LLM_HEDGE_ENABLED:
+        hedge = HedgePolicy(
+            percentile=settings.LLM_HEDGE_PERCENTILE,
+            max_ratio=settings.LLM_HEDGE_MAX_RATIO,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        )
+    retry = RetryPolicy(
+        max_retries=settings.LLM_MAX_RETRIES,
+        base_delay=settings.LLM_RETRY_BASE_DELAY,
+        max_delay=settings.LLM_RETRY_MAX_DELAY,
+        attempt_timeout=settings.LLM_ATTEMPT_TIMEOUT,
+    )
+    return ResilientProvider(inner, retry=retry, hedge=hedge)
+
+
+def make_resilient_embedding_provider(inner: EmbeddingProvider) -> ResilientEmbeddingProvider:
+    """
+    Wraps ``inner`` with the embedding retry policy configured in settings.
+    """
+    retry = RetryPolicy(
+        max_retries=settings.EMBEDDING_MAX_RETRIES,
+        base_delay=settings.LLM_RETRY_BASE_DELAY,
+        max_delay=settings.LLM_RETRY_MAX_DELAY,
+    )
+    return ResilientEmbeddingProvider(inner, retry=retry)
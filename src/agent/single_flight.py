@@ -0,0 +1,186 @@
+import os
+import copy
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, insert_or_ignore
+from src.core.tracing import set_attributes
+from src.models import InflightRequest
+
+logger = logging.getLogger(__name__)
+
+_RUNNING = "running"
+_DONE = "done"
+_FAILED = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back as naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls so only one of them does the work.
+
+    Within a process, callers with the same key await the leader's future. With a
+    ``session_factory``, the leader also takes a row lock in ``inflight_requests`` so
+    leaders in other workers on the same database wait for it and reuse its published
+    result instead of repeating the call. If a leader dies, its lock expires after
+    ``lock_ttl`` seconds and a waiter takes over.
+
+    The database lock costs two extra write transactions per call (taking and releasing
+    the lock), so it is opt-in (``SINGLE_FLIGHT_DB_LOCK``) and never used on SQLite, where
+    those writes serialize with every other writer. A published result is also reused by
+    identical calls in any worker for ``result_ttl`` seconds after the leader finished, so
+    the lock doubles as a short-lived response cache; set it to 0 for coalescing only.
+    """
+
+    def __init__(
+            self,
+            session_factory: Optional[async_sessionmaker[AsyncSession]] = None,
+            lock_ttl: float = 180.0,
+            result_ttl: float = 30.0,
+            poll_interval: float = 0.25,
+    ) -> None:
+        self.session_factory = session_factory
+        self.lock_ttl = timedelta(seconds=lock_ttl)
+        self.result_ttl = timedelta(seconds=result_ttl)
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs ``call`` unless an identical call (same ``key``) is already in flight, in which
+        case its result (or exception) is shared.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            set_attributes(single_flight="coalesced")
+            return copy.deepcopy(await asyncio.shield(future))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self.session_factory is None:
+                result = await call()
+            else:
+                result = await self._do_locked(key, call)
+        except BaseException as e:
+            future.set_exception(e)
+            # mark retrieved so a leader without followers does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _do_locked(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            state = await self._try_acquire(key)
+            if state is True:
+                break
+            if isinstance(state, dict):
+                self.coalesced += 1
+                set_attributes(single_flight="shared")
+                return state["result"]
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            result = await call()
+        except BaseException:
+            await self._release(key, _FAILED, None, _now())
+            raise
+        await self._release(key, _DONE, result, _now() + self.result_ttl)
+        return result
+
+    async def _try_acquire(self, key: str) -> bool | Dict[str, Any] | None:
+        """
+        Returns True if this process now leads, ``{"result": ...}`` if another worker
+        already published a result, or None if another worker is still running.
+        """
+        now = _now()
+        async with self.session_factory() as db:
+            acquired = await insert_or_ignore(
+                db,
+                InflightRequest,
+                dict(
+                    key=key,
+                    owner=self.owner,
+                    status=_RUNNING,
+                    expires_at=now + self.lock_ttl,
+                    created_at=now,
+                ),
+            )
+            if acquired:
+                await db.commit()
+                return True
+
+            row = await db.get(InflightRequest, key)
+            if row is not None and row.status == _DONE and _as_utc(row.expires_at) > now:
+                return {"result": row.result}
+            if row is not None and row.status == _RUNNING and _as_utc(row.expires_at) > now:
+                return None
+
+            # failed, expired or deleted meanwhile: try to take the lock over
+            taken = await db.execute(
+                update(InflightRequest)
+                .where(
+                    InflightRequest.key == key,
+                    or_(
+                        InflightRequest.status == _FAILED,
+                        InflightRequest.expires_at < now,
+                    ),
+                )
+                .values(owner=self.owner, status=_RUNNING, result=None, expires_at=now + self.lock_ttl)
+            )
+            await db.commit()
+            return True if taken.rowcount == 1 else None
+
+    async def _release(
+            self, key: str, status: str, result: Any, expires_at: datetime
+    ) -> None:
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(InflightRequest)
+                    .where(InflightRequest.key == key, InflightRequest.owner == self.owner)
+                    .values(status=status, result=result, expires_at=expires_at)
+                )
+                await db.execute(
+                    delete(InflightRequest).where(
+                        InflightRequest.expires_at < _now() - self.lock_ttl
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Could not release single-flight lock {key}: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_single_flight() -> SingleFlight:
+    """Create (or return) the process-wide single-flight group used by AgentManager."""
+    db_lock = settings.SINGLE_FLIGHT_DB_LOCK and not settings.ASYNC_DATABASE_URL.startswith("sqlite")
+    return SingleFlight(
+        session_factory=AsyncSessionLocal if db_lock else None,
+        lock_ttl=settings.SINGLE_FLIGHT_LOCK_TTL,
+        result_ttl=settings.SINGLE_FLIGHT_RESULT_TTL,
+        poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL,
+    )
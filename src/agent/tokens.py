@@ -0,0 +1,100 @@
+import re
+import math
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from src.core.metrics import PREFIX, MetricFamily, Sample, registry
+
+# word pieces, digit groups, single punctuation marks and whitespace runs, roughly how the
+# OpenAI BPE vocabularies split text when no tokenizer is installed
+_PIECE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]|\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local estimate of the number of BPE tokens in ``text``, from the average of
+    about four characters per token for English prose.
+
+    Not an upper bound: code and non-Latin text take 2-4x more tokens. Use
+    ``count_tokens`` where exceeding a limit fails the request.
+    """
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / 4))
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str | None) -> Any:
+    """Create (or return) the tiktoken encoding for ``model``; None without tiktoken."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """
+    Number of tokens ``text`` costs as model input.
+
+    Uses the model's tiktoken encoding when tiktoken is installed. Otherwise each letter
+    run counts one token per six characters, digits one per group of three, punctuation one
+    per mark and whitespace one per run unless it is a single space joining two words.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    tokens = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isalpha():
+            tokens += math.ceil(len(piece) / 6)
+        elif piece != " ":
+            tokens += 1
+    return tokens
+
+
+class TokenLedger:
+    """
+    Process-wide running totals of token counts, keyed by a name such as
+    ``prompt.structured_resume`` or ``llm.gpt-4.1-nano``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, **counts: int) -> None:
+        with self._lock:
+            totals = self._totals[name]
+            totals["calls"] += 1
+            for key, value in counts.items():
+                totals[key] += int(value or 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(totals) for name, totals in self._totals.items()}
+
+
+@lru_cache(maxsize=1)
+def get_token_ledger() -> TokenLedger:
+    """Create (or return) the process-wide token ledger."""
+    return TokenLedger()
+
+
+def _collect_token_totals() -> List[MetricFamily]:
+    samples = [
+        Sample("_total", {"name": name, "kind": kind}, value)
+        for name, totals in get_token_ledger().snapshot().items()
+        for kind, value in totals.items()
+    ]
+    return [MetricFamily(f"{PREFIX}_tokens", "counter", "Token ledger totals, by ledger name and count.", samples)]
+
+
+registry.add_collector(_collect_token_totals)
@@ -1,12 +1,31 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import json
 import logging
 
+from src.core.metrics import stage
+from src.core.tracing import Span, text_attribute
 from .base import Strategy, Provider
 
 logger = logging.getLogger(__name__)
 
 
+def _record(call_span: Optional[Span], prompt: str, response: str) -> None:
+    """
+    Keeps (the start of) the prompt and response on the traced LLM call, and logs them in
+    full at debug level; neither is formatted unless it is kept.
+    """
+    if call_span is not None:
+        call_span.attributes.update(
+            prompt=text_attribute(prompt),
+            response=text_attribute(response),
+            prompt_chars=len(prompt),
+            response_chars=len(response),
+        )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"prompt given to provider: \n{prompt}")
+        logger.debug(f"provider response: {response}")
+
+
 class JSONWrapper(Strategy):
     async def __call__(
         self, prompt: str, provider: Provider, **generation_args: Any
@@ -14,11 +33,13 @@ class JSONWrapper(Strategy):
         """
         Wrapper strategy to format the prompt as JSON with the help of LLM.
         """
-        response = await provider(prompt, **generation_args)
+        with stage("llm_call") as call_span:
+            response = await provider(prompt, **generation_args)
         response = response.replace("```", "").replace("json", "").strip()
-        logger.info(f"provider response: {response}")
+        _record(call_span, prompt, response)
         try:
-            return json.loads(response)
+            with stage("json_parse"):
+                return json.loads(response)
         except json.JSONDecodeError as e:
             logger.error(
                 f"provider returned non-JSON. parsing error: {e} - response: {response}"
@@ -33,9 +54,9 @@ class MDWrapper(Strategy):
         """
         Wrapper strategy to format the prompt as Markdown with the help of LLM.
         """
-        logger.info(f"prompt given to provider: \n{prompt}")
-        response = await provider(prompt, **generation_args)
-        logger.info(f"provider response: {response}")
+        with stage("llm_call") as call_span:
+            response = await provider(prompt, **generation_args)
+        _record(call_span, prompt, response)
         try:
             response = (
                 "```md\n" + response + "```" if "```md" not in response else response
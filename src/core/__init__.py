@@ -1,5 +1,6 @@
 from .database import init_models, async_engine, get_db_session, get_sync_db_session
 from .config import settings, setup_logging
+from .cache import LRUCache
 
 __all__ = [
     "settings",
@@ -8,4 +9,5 @@ __all__ = [
     "setup_logging",
     "get_db_session",
     "get_sync_db_session",
+    "LRUCache",
 ]
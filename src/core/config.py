@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 
 class Settings(BaseSettings):
@@ -15,6 +15,95 @@ class Settings(BaseSettings):
     OPENAI_MODEL: Optional[str]
     OPENAI_EMBEDDING_MODEL: Optional[str]
     DB_ECHO: bool = False
+    LLM_PROVIDER: Literal["openai", "fake"] = "openai"
+    FAKE_LATENCY_KIND: Literal["constant", "uniform", "lognormal", "tail"] = "lognormal"
+    FAKE_LATENCY_MEAN: float = 1.0
+    FAKE_LATENCY_SIGMA: float = 0.5
+    FAKE_LATENCY_TAIL: float = 10.0
+    FAKE_LATENCY_TAIL_PROBABILITY: float = 0.0
+    FAKE_EMBEDDING_LATENCY_MEAN: float = 0.1
+    FAKE_ERROR_RATE: float = 0.0
+    FAKE_RATE_LIMIT_RATE: float = 0.0
+    FAKE_RETRY_AFTER: Optional[float] = None
+    FAKE_SEED: Optional[int] = None
+    FAKE_EMBEDDING_DIM: int = 1536
+    EMBEDDING_STORE_DIR: str = os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, "data", "embeddings"
+    )
+    EMBEDDING_STORE_COMPACT_RATIO: float = 0.25
+    EXTRACTION_CACHE_SIZE: int = 1024
+    EMBEDDING_BATCH_SIZE: int = 256
+    EMBEDDING_BATCH_MAX_TOKENS: int = 250_000
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 60.0
+    OPENAI_TIMEOUT: float = 120.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    PDF_CONVERTER_WORKERS: int = 2
+    PDF_CONVERT_TIMEOUT: float = 30.0
+    PDF_MAX_PAGES: int = 20
+    INGESTION_WORKERS: int = 2
+    INGESTION_POLL_INTERVAL: float = 1.0
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_STALE_AFTER: float = 900.0
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200_000
+    LLM_MAX_CONCURRENCY: int = 32
+    LLM_LATENCY_TARGET: float = 30.0
+    LLM_RESERVED_OUTPUT_TOKENS: int = 1500
+    PROMPT_DEFAULT_TOKEN_BUDGET: int = 8000
+    PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+        "structured_resume": 8000,
+        "structured_resume_section": 4000,
+        "structured_job": 6000,
+    }
+    RESUME_EXTRACTION_MODE: Literal["single", "sections"] = "single"
+    RESUME_SECTION_MAX_ATTEMPTS: int = 2
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 3000
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1_000_000
+    EMBEDDING_REQUEST_CONCURRENCY: int = 16
+    EMBEDDING_LATENCY_TARGET: float = 10.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 20.0
+    LLM_ATTEMPT_TIMEOUT: Optional[float] = 90.0
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MAX_RATIO: float = 0.1
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    EMBEDDING_MAX_RETRIES: int = 3
+    # coalesce identical LLM calls across workers through the database (ignored on SQLite)
+    SINGLE_FLIGHT_DB_LOCK: bool = False
+    SINGLE_FLIGHT_LOCK_TTL: float = 180.0
+    # how long a finished call's result is reused by identical calls in any worker
+    SINGLE_FLIGHT_RESULT_TTL: float = 30.0
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.25
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    IMPROVEMENT_MAX_ITERATIONS: int = 3
+    IMPROVEMENT_MIN_GAIN: float = 0.005
+    IMPROVEMENT_TIME_BUDGET: float = 120.0
+    IMPROVEMENT_EMBEDDING_CACHE_SIZE: int = 4096
+    MATCH_SCORE_COSINE_WEIGHT: float = 0.8
+    MATCH_SCORE_KEYWORD_WEIGHT: float = 0.2
+    VECTOR_INDEX: str = "ivf"
+    VECTOR_INDEX_MIN_ROWS: int = 20000
+    VECTOR_INDEX_SAVE_EVERY: int = 10000
+    VECTOR_INDEX_CODEC: str = "sq8"
+    VECTOR_INDEX_PQ_SUBSPACES: int = 0
+    VECTOR_INDEX_REDUCE: Optional[str] = None
+    VECTOR_INDEX_REDUCED_DIM: int = 256
+    VECTOR_INDEX_RERANK: int = 100
+    IVF_N_LISTS: int = 0
+    IVF_NPROBE: int = 16
+    TRACE_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_SECONDS: Optional[float] = 10.0
+    TRACE_MAX_SPANS: int = 1000
+    TRACE_TEXT_LIMIT: int = 2000
+    TRACE_EXPORT_PATH: str = os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, "data", "traces.jsonl"
+    )
     PYTHONDONTWRITEBYTECODE: int = 1
 
     model_config = SettingsConfigDict(
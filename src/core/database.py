@@ -1,14 +1,32 @@
+import time
 from functools import lru_cache
-from typing import AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, Dict, Generator, List, Type
 
 from pydantic_core.core_schema import InvalidSchema
-from sqlalchemy import create_engine, event
+from sqlalchemy import (
+    ColumnElement,
+    Table,
+    create_engine,
+    delete,
+    distinct,
+    event,
+    exists,
+    func,
+    insert,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession, create_async_engine
 
 from src.models import Base
 from .config import settings
+from .metrics import DB_POOL_WAIT_SECONDS, gauge_family, registry
+from .tracing import instrument_engine
 
 
 class _DatabaseSettings:
@@ -56,23 +74,60 @@ def _make_sync_engine() -> Engine:
     return engine
 
 
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default async pool, recording how long each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
 @lru_cache(maxsize=1)
 def _make_async_engine() -> AsyncEngine:
     """Create (or return) the global asynchronous Engine."""
-    engine = create_async_engine(
-        settings.ASYNC_DATABASE_URL,
+    options = dict(
         echo=settings.DB_ECHO,
         pool_pre_ping=True,
         connect_args=settings.DB_CONNECT_ARGS,
         future=True,
     )
+    engine = create_async_engine(settings.ASYNC_DATABASE_URL, **options)
+    if type(engine.pool) is AsyncAdaptedQueuePool:
+        # other pools (e.g. in-memory SQLite's StaticPool) never wait
+        engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL, poolclass=_TimedQueuePool, **options
+        )
     _configure_database(engine.sync_engine)
+    instrument_engine(engine.sync_engine)
     return engine
 
 
 sync_engine: Engine = _make_sync_engine()
 async_engine: AsyncEngine = _make_async_engine()
 
+
+def _collect_pool_status():
+    pool = async_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return []
+    return [
+        gauge_family(
+            "db_pool_connections",
+            "Connections of the async database pool, by state.",
+            {"checked_out": pool.checkedout(), "idle": pool.checkedin(), "size": pool.size()},
+            label="state",
+        )
+    ]
+
+
+registry.add_collector(_collect_pool_status)
+
+
 SessionLocal: sessionmaker[Session] = sessionmaker(
     bind=sync_engine,
     autoflush=False,
@@ -117,3 +172,91 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
 async def init_models(Base: Base) -> None:
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+async def insert_or_ignore(db: AsyncSession, model: Type[Base], values: Dict[str, Any]) -> bool:
+    """
+    Inserts one row unless its primary key already exists.
+
+    Uses ``INSERT ... ON CONFLICT DO NOTHING`` where the dialect supports it, so concurrent
+    writers of the same key never fail. Returns True if this call inserted the row.
+    """
+    primary_key = [column.name for column in model.__table__.primary_key.columns]
+    match db.bind.dialect.name:
+        case "postgresql":
+            statement = postgresql.insert(model).values(**values).on_conflict_do_nothing(
+                index_elements=primary_key
+            )
+        case "sqlite":
+            statement = sqlite.insert(model).values(**values).on_conflict_do_nothing(
+                index_elements=primary_key
+            )
+        case _:
+            identity = tuple(values[name] for name in primary_key)
+            if await db.get(model, identity if len(identity) > 1 else identity[0]) is not None:
+                return False
+            statement = insert(model).values(**values)
+    result = await db.execute(statement)
+    return result.rowcount == 1
+
+
+async def upsert_many(
+        db: AsyncSession, table: Table, rows: List[Dict[str, Any]], update_columns: List[str]
+) -> None:
+    """
+    Inserts ``rows`` into ``table``, overwriting ``update_columns`` of rows whose primary key
+    already exists.
+
+    Uses ``INSERT ... ON CONFLICT DO UPDATE`` on PostgreSQL and SQLite; elsewhere the
+    existing keys are deleted first.
+    """
+    if not rows:
+        return
+    primary_key = [column.name for column in table.primary_key.columns]
+    match db.bind.dialect.name:
+        case "postgresql" | "sqlite" as dialect:
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = dialect_insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=primary_key,
+                set_={name: statement.excluded[name] for name in update_columns},
+            )
+            await db.execute(statement, rows)
+        case _:
+            keys = tuple_(*(table.c[name] for name in primary_key))
+            await db.execute(
+                delete(table).where(
+                    keys.in_([tuple(row[name] for name in primary_key) for row in rows])
+                )
+            )
+            await db.execute(insert(table), rows)
+
+
+def json_array_filter(
+        dialect: str, column: Any, values: List[str], match_all: bool = False
+) -> ColumnElement[bool]:
+    """
+    SQL condition for a JSON array column containing any (or all) of ``values``.
+
+    Uses the JSONB ``?|`` / ``@>`` operators on PostgreSQL, which a GIN index serves, and
+    ``json_each`` on SQLite. Values are compared exactly.
+    """
+    values = list(dict.fromkeys(values))
+    match dialect:
+        case "postgresql":
+            document = type_coerce(column, postgresql.JSONB)
+            if match_all:
+                return document.contains(values)
+            return document.has_any(postgresql.array(values))
+        case "sqlite":
+            elements = func.json_each(column).table_valued("value")
+            if match_all:
+                matched = (
+                    select(func.count(distinct(elements.c.value)))
+                    .where(elements.c.value.in_(values))
+                    .scalar_subquery()
+                )
+                return matched == len(values)
+            return exists().where(elements.c.value.in_(values))
+        case _:
+            raise NotImplementedError(f"JSON array filters are not supported on {dialect}")
@@ -0,0 +1,270 @@
+import time
+import bisect
+import threading
+import contextlib
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .tracing import Span, span
+
+# seconds; spans sub-millisecond cache lookups to multi-minute LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+PREFIX = "resume_matcher"
+
+# which upload pipeline ("resume", "job") the current task is working for
+_pipeline: ContextVar[str] = ContextVar("metrics_pipeline", default="other")
+
+
+class Sample(NamedTuple):
+    suffix: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    kind: str
+    help: str
+    samples: List[Sample]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = f"{PREFIX}_{name}"
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count per label combination.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = list(self._values.items())
+        return MetricFamily(
+            self.name,
+            self.kind,
+            self.help,
+            [Sample("_total", dict(zip(self.labels, key)), value) for key, value in items],
+        )
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets, per label combination.
+
+    An observation is a bisect and two additions under a lock, a few microseconds.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            help: str,
+            labels: Tuple[str, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label key: [count per bucket (+Inf last)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                samples.append(Sample("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(Sample("_sum", labels, total))
+            samples.append(Sample("_count", labels, cumulative))
+        return MetricFamily(self.name, self.kind, self.help, samples)
+
+
+class Registry:
+    """
+    Metrics and scrape-time collectors rendered in the Prometheus text exposition format.
+
+    Collectors are called on every scrape and read counters the code already keeps (cache
+    hits, token totals, pool status), so those cost nothing between scrapes.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for sample in family.samples:
+                lines.append(
+                    f"{family.name}{sample.suffix}{_format_labels(sample.labels)} "
+                    f"{_format_value(sample.value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS: Histogram = registry.register(Histogram(
+    "stage_seconds",
+    "Time spent in each stage of the resume and job upload pipelines.",
+    ("pipeline", "stage"),
+))
+PROVIDER_CALLS: Counter = registry.register(Counter(
+    "provider_calls",
+    "LLM and embedding provider calls (every attempt, including retries and hedges).",
+    ("kind", "model", "outcome"),
+))
+PROVIDER_CALL_SECONDS: Histogram = registry.register(Histogram(
+    "provider_call_seconds",
+    "Latency of single LLM and embedding provider attempts.",
+    ("kind", "model"),
+))
+EXTRACTION_CACHE_LOOKUPS: Counter = registry.register(Counter(
+    "extraction_cache_lookups",
+    "Extraction cache lookups, by the tier that answered (memory_hit, db_hit) or miss.",
+    ("prompt", "result"),
+))
+DB_POOL_WAIT_SECONDS: Histogram = registry.register(Histogram(
+    "db_pool_wait_seconds",
+    "Time a request waited to check a connection out of the database pool.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+))
+
+# in-process caches keeping their own ``hits``/``misses`` counters, read at scrape time
+_caches: Dict[str, object] = {}
+
+
+@contextlib.contextmanager
+def pipeline(name: str) -> Iterator[None]:
+    """
+    Attributes the stages timed inside the block (and in tasks it starts) to ``name``.
+    """
+    token = _pipeline.set(name)
+    try:
+        yield
+    finally:
+        _pipeline.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[Optional[Span]]:
+    """
+    Times the block as stage ``name`` of the current pipeline, and as a span of the current
+    trace (yielded, None outside a trace).
+    """
+    with span(name) as current, STAGE_SECONDS.time(pipeline=_pipeline.get(), stage=name):
+        yield current
+
+
+def register_cache(name: str, cache: object) -> None:
+    """
+    Exposes the ``hits``/``misses`` counters of ``cache`` as ``cache_requests_total``.
+    """
+    _caches[name] = cache
+
+
+def _collect_caches() -> List[MetricFamily]:
+    samples = []
+    for name, cache in list(_caches.items()):
+        samples.append(Sample("_total", {"cache": name, "result": "hit"}, getattr(cache, "hits", 0)))
+        samples.append(Sample("_total", {"cache": name, "result": "miss"}, getattr(cache, "misses", 0)))
+    return [MetricFamily(f"{PREFIX}_cache_requests", "counter", "In-process cache lookups, by result.", samples)]
+
+
+registry.add_collector(_collect_caches)
+
+
+def gauge_family(name: str, help: str, values: Dict[str, float], label: str = "") -> MetricFamily:
+    """
+    A gauge with one sample per ``values`` entry, labelled ``label`` if given.
+    """
+    return MetricFamily(
+        f"{PREFIX}_{name}",
+        "gauge",
+        help,
+        [Sample("", {label: key} if label else {}, value) for key, value in values.items()],
+    )
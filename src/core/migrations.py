@@ -0,0 +1,181 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import Connection, Table, inspect, select, text, update
+
+from src.models import ProcessedJob, ProcessedResume, SchemaMigration, job_resume_association
+
+logger = logging.getLogger(__name__)
+
+# processed columns that used to hold json.dumps(...) strings, several of them wrapped as
+# {"<column>": [...]}
+_PROCESSED_JSON_COLUMNS: Dict[Any, List[str]] = {
+    ProcessedResume: [
+        "personal_data",
+        "experiences",
+        "projects",
+        "skills",
+        "research_work",
+        "achievements",
+        "education",
+        "extracted_keywords",
+    ],
+    ProcessedJob: [
+        "company_profile",
+        "location",
+        "key_responsibilities",
+        "qualifications",
+        "compensation_and_benfits",
+        "application_info",
+        "extracted_keywords",
+    ],
+}
+
+_GIN_INDEXES = [
+    ("ix_processed_resumes_extracted_keywords", "processed_resumes", "extracted_keywords"),
+    ("ix_processed_resumes_skills", "processed_resumes", "skills"),
+    ("ix_processed_jobs_extracted_keywords", "processed_jobs", "extracted_keywords"),
+]
+
+
+def decode_legacy_json(column: str, value: Any) -> Any:
+    """
+    Turns a legacy double-encoded value into the native document stored today.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    if isinstance(value, dict) and list(value) == [column]:
+        value = value[column]
+    return value if value not in ("", [], {}) else None
+
+
+def _native_json_postgresql(conn: Connection) -> None:
+    columns = {
+        (row.table_name, row.column_name): row.data_type
+        for row in conn.execute(
+            text(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns "
+                "WHERE table_name IN ('processed_resumes', 'processed_jobs')"
+            )
+        )
+    }
+    for model, names in _PROCESSED_JSON_COLUMNS.items():
+        table = model.__tablename__
+        for name in names:
+            if columns.get((table, name)) != "jsonb":
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table} ALTER COLUMN {name} TYPE JSONB "
+                        f"USING CASE WHEN json_typeof({name}::json) = 'string' "
+                        f"THEN ({name}::json #>> '{{}}')::jsonb ELSE {name}::jsonb END"
+                    )
+                )
+            conn.execute(
+                text(
+                    f"UPDATE {table} SET {name} = ({name} #>> '{{}}')::jsonb "
+                    f"WHERE jsonb_typeof({name}) = 'string'"
+                )
+            )
+            conn.execute(
+                text(
+                    f"UPDATE {table} SET {name} = {name} -> '{name}' "
+                    f"WHERE jsonb_typeof({name}) = 'object' AND {name} ? '{name}' "
+                    f"AND (SELECT count(*) FROM jsonb_object_keys({name})) = 1"
+                )
+            )
+    for index, table, column in _GIN_INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin ({column})"))
+
+
+def _native_json_generic(conn: Connection, batch_size: int = 500) -> None:
+    for model, names in _PROCESSED_JSON_COLUMNS.items():
+        key = inspect(model).primary_key[0]
+        columns = [getattr(model, name) for name in names]
+        last = None
+        while True:
+            query = select(key, *columns).order_by(key).limit(batch_size)
+            if last is not None:
+                query = query.where(key > last)
+            rows = conn.execute(query).all()
+            if not rows:
+                break
+            for row in rows:
+                values = {}
+                for name in names:
+                    current = getattr(row, name)
+                    decoded = decode_legacy_json(name, current)
+                    if decoded != current:
+                        values[name] = decoded
+                if values:
+                    conn.execute(update(model).where(key == row[0]).values(**values))
+            last = rows[-1][0]
+
+
+def native_json_processed_fields(conn: Connection) -> None:
+    """
+    Rewrites double-encoded processed fields as native JSON (JSONB + GIN on PostgreSQL).
+    """
+    if conn.dialect.name == "postgresql":
+        _native_json_postgresql(conn)
+    else:
+        _native_json_generic(conn)
+
+
+def _add_missing_columns(conn: Connection, table: Table) -> None:
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+        if column.server_default is not None:
+            ddl += f" DEFAULT {column.server_default.arg.text}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+        conn.execute(text(ddl))
+
+
+def job_resume_scores(conn: Connection) -> None:
+    """
+    Adds the score, components, scorer_version and scored_at columns (and their indexes) to
+    ``job_resume`` tables created before they existed.
+    """
+    table = job_resume_association
+    _add_missing_columns(conn, table)
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def processed_embeddings(conn: Connection) -> None:
+    """
+    Adds the ``embedding`` column to ``processed_resumes`` and ``processed_jobs`` tables
+    created before it existed.
+    """
+    for model in (ProcessedResume, ProcessedJob):
+        _add_missing_columns(conn, model.__table__)
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_native_json_processed_fields", native_json_processed_fields),
+    ("0002_job_resume_scores", job_resume_scores),
+    ("0003_processed_embeddings", processed_embeddings),
+]
+
+
+def run_migrations(conn: Connection) -> None:
+    """
+    Applies pending migrations in order, each recorded in ``schema_migrations``.
+
+    Run after ``create_all`` within one transaction, e.g.
+    ``async with engine.begin() as conn: await conn.run_sync(run_migrations)``.
+    """
+    applied = set(conn.execute(select(SchemaMigration.name)).scalars())
+    for name, migrate in MIGRATIONS:
+        if name in applied:
+            continue
+        logger.info(f"Applying migration {name}")
+        migrate(conn)
+        conn.execute(SchemaMigration.__table__.insert().values(name=name))
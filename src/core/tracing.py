@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+import itertools
+import threading
+import contextlib
+from functools import lru_cache, wraps
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation of a trace. Times are milliseconds from the start of the trace.
+    """
+
+    __slots__ = ("span_id", "parent_id", "name", "start", "duration", "status", "error", "attributes")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, start: float,
+                 attributes: Dict[str, Any]) -> None:
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.attributes = attributes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round(self.start, 3),
+            "duration_ms": round(self.duration, 3) if self.duration is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """
+    The spans of one request (or ingestion task), identified by its request ID.
+
+    Spans are kept in memory while the request runs; whether the trace is exported is
+    decided when it ends, so slow and failed requests are kept even if not sampled.
+    """
+
+    def __init__(self, trace_id: str, sampled: bool, max_spans: int) -> None:
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.max_spans = max_spans
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._ids = itertools.count(1)
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def open(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return None
+        span = Span(next(self._ids), parent.span_id if parent else None, name, self.elapsed_ms(), attributes)
+        self.spans.append(span)
+        return span
+
+    def close(self, span: Optional[Span], error: Optional[BaseException] = None) -> None:
+        if span is None:
+            return
+        span.duration = self.elapsed_ms() - span.start
+        if error is not None:
+            span.status = "error"
+            span.error = f"{type(error).__name__}: {error}"[:500]
+
+    def to_dict(self, reason: str) -> Dict[str, Any]:
+        root = self.spans[0] if self.spans else None
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name if root else None,
+            "started_at": self.started_at,
+            "duration_ms": round(root.duration, 3) if root and root.duration is not None else None,
+            "status": root.status if root else "ok",
+            "reason": reason,
+            "dropped_spans": self.dropped,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class JSONLExporter:
+    """
+    Appends finished traces, one JSON object per line, to ``path`` from a background thread
+    so request handlers never wait on the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._queue: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict[str, Any]) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(record)
+
+    def _run(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        while True:
+            record = self._queue.get()
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    # write whatever else finished meanwhile while the file is open
+                    while not self._queue.empty():
+                        f.write(json.dumps(self._queue.get(), ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                logger.warning(f"Could not export trace to {self.path}: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_exporter() -> JSONLExporter:
+    """Create (or return) the process-wide trace exporter."""
+    return JSONLExporter(settings.TRACE_EXPORT_PATH)
+
+
+def _export_reason(trace: Trace) -> Optional[str]:
+    root = trace.spans[0] if trace.spans else None
+    if root is not None and root.status == "error":
+        return "error"
+    slow = settings.TRACE_SLOW_SECONDS
+    if slow is not None and root is not None and root.duration is not None and root.duration >= slow * 1000:
+        return "slow"
+    if trace.sampled:
+        return "sampled"
+    return None
+
+
+@contextlib.contextmanager
+def start_trace(trace_id: str, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Starts a trace whose root span is ``name``; everything traced in the block (and in the
+    tasks it starts) becomes part of it.
+
+    The trace is exported if it was sampled (``TRACE_SAMPLE_RATE``), failed, or took at least
+    ``TRACE_SLOW_SECONDS``. Inside an existing trace this only opens a span.
+    """
+    if _current_trace.get() is not None:
+        with span(name, **attributes) as root:
+            yield root
+        return
+    if not settings.TRACE_ENABLED:
+        yield None
+        return
+
+    trace = Trace(trace_id, random.random() < settings.TRACE_SAMPLE_RATE, settings.TRACE_MAX_SPANS)
+    trace_token = _current_trace.set(trace)
+    root = trace.open(name, None, attributes)
+    span_token = _current_span.set(root)
+    error = None
+    try:
+        yield root
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace.close(root, error)
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        reason = _export_reason(trace)
+        if reason is not None:
+            get_exporter().export(trace.to_dict(reason))
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Times the block as a child of the current span. Outside a trace this does nothing and
+    yields None.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.open(name, _current_span.get(), attributes)
+    token = _current_span.set(current) if current is not None else None
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        if token is not None:
+            _current_span.reset(token)
+        trace.close(current, error)
+
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Decorates a coroutine function to run in a span called ``name``.
+    """
+
+    def decorator(function: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_attributes(**attributes: Any) -> None:
+    """
+    Adds attributes to the current span, if any.
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def record_error(error: BaseException) -> None:
+    """
+    Marks the current span as failed with ``error`` when the error is handled, not raised.
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.status = "error"
+        current.error = f"{type(error).__name__}: {error}"[:500]
+
+
+def text_attribute(text: str) -> str:
+    """
+    ``text`` cut to ``TRACE_TEXT_LIMIT`` characters, for prompts and responses on spans.
+    """
+    limit = settings.TRACE_TEXT_LIMIT
+    return text if len(text) <= limit else text[:limit] + f"... [{len(text) - limit} more]"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Records every statement run on ``engine`` as a ``db.execute`` span of the current trace.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = _current_trace.get()
+        if trace is None or context is None:
+            return
+        context._trace_span = (trace, trace.open(
+            "db.execute",
+            _current_span.get(),
+            {"statement": statement[:300], "executemany": executemany},
+        ))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        traced_span = getattr(context, "_trace_span", None)
+        if traced_span is not None:
+            trace, db_span = traced_span
+            if db_span is not None:
+                db_span.attributes["rowcount"] = getattr(cursor, "rowcount", None)
+            trace.close(db_span)
+            context._trace_span = None
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        context = exception_context.execution_context
+        traced_span = getattr(context, "_trace_span", None) if context is not None else None
+        if traced_span is not None:
+            trace, db_span = traced_span
+            trace.close(db_span, exception_context.original_exception)
+            context._trace_span = None
@@ -0,0 +1,316 @@
+"""
+Load generator for the API: concurrent resume/job uploads and reads, reporting throughput,
+latency percentiles and an error breakdown per operation.
+
+Run against a deployment with ``python -m src.loadtest --url http://localhost:8000``, or
+in-process with ``LLM_PROVIDER=fake python -m src.loadtest``: the app (and its lifespan)
+then runs inside the generator, so neither a server nor an OpenAI key is needed.
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import contextlib
+from collections import Counter, defaultdict
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+
+OPERATIONS = ("upload_resume", "upload_job", "get_resume", "get_job", "match", "candidates")
+DEFAULT_MIX = "upload_resume=1,upload_job=1,get_resume=4,get_job=4,match=2,candidates=2"
+
+_FIRST_NAMES = ["Ana", "Binh", "Chen", "Dara", "Emil", "Fatima", "Goran", "Hana", "Ivan", "Jae"]
+_LAST_NAMES = ["Nguyen", "Smith", "Garcia", "Kowalski", "Tanaka", "Okafor", "Silva", "Novak"]
+_TITLES = ["Backend Engineer", "Data Engineer", "ML Engineer", "DevOps Engineer", "Frontend Developer"]
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+_SKILLS = [
+    "python", "golang", "java", "typescript", "react", "postgresql", "redis", "kafka", "docker",
+    "kubernetes", "terraform", "aws", "gcp", "spark", "airflow", "pytorch", "fastapi", "grpc",
+]
+
+
+class Result(NamedTuple):
+    operation: str
+    latency: float
+    # "ok", "http_<status>" or the exception class name
+    outcome: str
+
+
+def synthetic_resume(rng: random.Random) -> str:
+    name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+    skills = rng.sample(_SKILLS, 6)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1 415 555 {rng.randint(1000, 9999)}",
+        "",
+        "EXPERIENCE",
+    ]
+    for year in (2018, 2021):
+        lines += [
+            f"{rng.choice(_TITLES)}, {rng.choice(_COMPANIES)}, {year} - {year + 3}",
+            f"- Built services in {skills[0]} and {skills[1]} serving {rng.randint(2, 90)}k users",
+            f"- Ran {skills[2]} on {skills[3]}, cutting costs by {rng.randint(5, 40)}%",
+        ]
+    lines += [
+        "",
+        "EDUCATION",
+        f"BSc Computer Science, University of {rng.choice(_LAST_NAMES)}, 2014 - 2018",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+    ]
+    return "\n".join(lines)
+
+
+def synthetic_job(rng: random.Random) -> str:
+    skills = rng.sample(_SKILLS, 5)
+    return "\n".join([
+        f"{rng.choice(_TITLES)} at {rng.choice(_COMPANIES)}",
+        "Full-time, remote.",
+        "Responsibilities:",
+        f"- Design and operate {skills[0]} services",
+        f"- Own the {skills[1]} data pipeline",
+        "Requirements:",
+        f"- {rng.randint(2, 8)}+ years with {skills[2]} and {skills[3]}",
+        f"- Experience with {skills[4]}",
+        "Apply at https://jobs.example.com/apply",
+    ])
+
+
+def make_pdf(text: str) -> bytes:
+    """
+    Single-page PDF showing ``text`` line by line in Helvetica.
+    """
+    def escape(line: str) -> str:
+        line = line.encode("latin-1", "replace").decode("latin-1")
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    stream = "BT /F1 10 Tf 12 TL 50 812 Td " + " ".join(
+        f"({escape(line)}) '" for line in text.splitlines()
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        "/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode("latin-1")
+    return pdf
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parses ``operation=weight,...`` into operation weights.
+
+    Raises:
+        ValueError: If an operation is unknown or a weight is not a number
+    """
+    weights = {}
+    for part in filter(None, (part.strip() for part in mix.split(","))):
+        operation, _, weight = part.partition("=")
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', expected one of {OPERATIONS}")
+        weights[operation] = float(weight or 1)
+    return weights
+
+
+class LoadGenerator:
+    """
+    Runs ``concurrency`` workers that each pick an operation by ``mix`` weight and send it,
+    until ``duration`` seconds pass or ``requests`` requests were sent (0: no limit).
+
+    Reads target IDs returned by earlier synchronous uploads; until an ID exists, a read
+    is replaced by the matching upload.
+    """
+
+    def __init__(
+            self,
+            client: httpx.AsyncClient,
+            mix: Dict[str, float],
+            concurrency: int = 16,
+            duration: float = 30.0,
+            requests: int = 0,
+            asynchronous: bool = False,
+            seed: int = 0,
+    ) -> None:
+        self.client = client
+        self.operations = list(mix)
+        self.weights = [mix[operation] for operation in self.operations]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.asynchronous = asynchronous
+        self.rng = random.Random(seed)
+        self.resume_ids: List[str] = []
+        self.job_ids: List[str] = []
+        self._sent = 0
+
+    async def _send(self, operation: str) -> httpx.Response:
+        params = {"asynchronous": "true"} if self.asynchronous else {}
+        match operation:
+            case "upload_resume":
+                files = {"file": ("resume.pdf", make_pdf(synthetic_resume(self.rng)), "application/pdf")}
+                response = await self.client.post("/upload_resume", files=files, params=params)
+                if response.status_code == 200:
+                    self.resume_ids.append(response.json()["resume_id"])
+            case "upload_job":
+                params["payload"] = synthetic_job(self.rng)
+                response = await self.client.post("/upload_job", params=params)
+                if response.status_code == 200 and response.json().get("job_id"):
+                    self.job_ids.append(response.json()["job_id"])
+            case "get_resume":
+                response = await self.client.get(
+                    "/both_resume", params={"resume_id": self.rng.choice(self.resume_ids)}
+                )
+            case "get_job":
+                response = await self.client.get("/both_job", params={"job_id": self.rng.choice(self.job_ids)})
+            case "match":
+                response = await self.client.get("/match", params={"job_id": self.rng.choice(self.job_ids)})
+            case "candidates":
+                response = await self.client.get(f"/jobs/{self.rng.choice(self.job_ids)}/candidates")
+        return response
+
+    def _pick(self) -> str:
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        if operation == "get_resume" and not self.resume_ids:
+            return "upload_resume"
+        if operation in ("get_job", "match", "candidates") and not self.job_ids:
+            return "upload_job"
+        return operation
+
+    async def request(self, operation: str) -> Result:
+        started = time.perf_counter()
+        try:
+            response = await self._send(operation)
+            outcome = "ok" if response.is_success else f"http_{response.status_code}"
+        except Exception as e:
+            outcome = type(e).__name__
+        return Result(operation, time.perf_counter() - started, outcome)
+
+    async def warm_up(self, uploads: int) -> None:
+        """
+        Synchronously uploads ``uploads`` resumes and jobs (not measured) so reads have
+        targets from the start.
+        """
+        asynchronous, self.asynchronous = self.asynchronous, False
+        for _ in range(uploads):
+            await self.request("upload_resume")
+            await self.request("upload_job")
+        self.asynchronous = asynchronous
+
+    async def _worker(self, deadline: float, results: List[Result]) -> None:
+        while time.monotonic() < deadline and (not self.requests or self._sent < self.requests):
+            self._sent += 1
+            results.append(await self.request(self._pick()))
+
+    async def run(self) -> List[Result]:
+        results: List[Result] = []
+        deadline = time.monotonic() + self.duration
+        await asyncio.gather(*(self._worker(deadline, results) for _ in range(self.concurrency)))
+        return results
+
+
+def summarize(results: List[Result], elapsed: float) -> Dict[str, Dict]:
+    """
+    Per-operation (and ``total``) request count, throughput, latency percentiles over all
+    requests, and counts per outcome.
+    """
+    grouped: Dict[str, List[Result]] = defaultdict(list)
+    for result in results:
+        grouped[result.operation].append(result)
+        grouped["total"].append(result)
+    summary = {}
+    for operation, group in sorted(grouped.items(), key=lambda item: item[0] == "total"):
+        latencies_ms = np.asarray([result.latency for result in group]) * 1000
+        outcomes = Counter(result.outcome for result in group)
+        summary[operation] = {
+            "requests": len(group),
+            "throughput": len(group) / elapsed if elapsed else 0.0,
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p95_ms": float(np.percentile(latencies_ms, 95)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "error_rate": 1 - outcomes.get("ok", 0) / len(group),
+            "outcomes": dict(outcomes.most_common()),
+        }
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    lines = [
+        f"{'operation':<14} {'requests':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7}  outcomes"
+    ]
+    for operation, row in summary.items():
+        outcomes = ", ".join(f"{outcome}={count}" for outcome, count in row["outcomes"].items())
+        lines.append(
+            f"{operation:<14} {row['requests']:>8} {row['throughput']:>8.1f} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate']:>7.1%}  {outcomes}"
+        )
+    return "\n".join(lines)
+
+
+@contextlib.asynccontextmanager
+async def _client(url: Optional[str], timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            yield client
+        return
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            yield client
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    async with _client(args.url, args.timeout) as client:
+        generator = LoadGenerator(
+            client,
+            parse_mix(args.mix),
+            concurrency=args.concurrency,
+            duration=args.duration,
+            requests=args.requests,
+            asynchronous=args.asynchronous,
+            seed=args.seed,
+        )
+        await generator.warm_up(args.warm_up)
+        started = time.perf_counter()
+        results = await generator.run()
+        return summarize(results, time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running deployment (default: in-process app)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0: no limit)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight pairs")
+    parser.add_argument("--warm-up", type=int, default=2, help="unmeasured resume and job uploads first")
+    parser.add_argument("--asynchronous", action="store_true", help="queue uploads (202) instead of waiting")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
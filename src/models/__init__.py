@@ -1,13 +1,24 @@
-from .base import Base
+from .base import Base, JSONType
 from .job import Job, ProcessedJob
 from .resume import Resume, ProcessedResume
 from .association import job_resume_association
+from .extraction_cache import ExtractionCacheEntry
+from .task import IngestionTask, TaskStatus, TaskKind
+from .inflight import InflightRequest
+from .migration import SchemaMigration
 
 __all__ = [
     'Base',
+    'JSONType',
     'Job',
     'ProcessedJob',
     'Resume',
     'ProcessedResume',
-    'job_resume_association'
+    'job_resume_association',
+    'ExtractionCacheEntry',
+    'IngestionTask',
+    'TaskStatus',
+    'TaskKind',
+    'InflightRequest',
+    'SchemaMigration',
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
-from .base import Base
-from sqlalchemy import Column, String, Table, ForeignKey
+from .base import Base, JSONType
+from sqlalchemy import Column, String, Table, ForeignKey, Float, DateTime, Index, text
 
 
 job_resume_association = Table(
@@ -17,4 +17,13 @@ job_resume_association = Table(
         ForeignKey("processed_resumes.resume_id"),
         primary_key=True,
     ),
-)
\ No newline at end of file
+    Column("score", Float, nullable=False, server_default=text("0")),
+    # per-signal scores the total was combined from, e.g. {"cosine": ..., "keyword_overlap": ...}
+    Column("components", JSONType, nullable=True),
+    Column("scorer_version", String, nullable=False, server_default=text("''")),
+    Column("scored_at", DateTime(timezone=True), nullable=True),
+    # "top candidates for a job" and "top jobs for a resume" are index range scans
+    Index("ix_job_resume_job_score", "processed_job_id", "score"),
+    Index("ix_job_resume_resume_score", "processed_resume_id", "score"),
+    Index("ix_job_resume_scorer_version", "scorer_version"),
+)
@@ -1,4 +1,9 @@
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.types import JSON
+
+# Native JSON everywhere, stored as indexable JSONB on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 
 class Base(DeclarativeBase):
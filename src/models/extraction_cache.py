@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, text
+from sqlalchemy.types import JSON
+
+from .base import Base
+
+
+class ExtractionCacheEntry(Base):
+    __tablename__ = "extraction_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    prompt_name = Column(String, nullable=False)
+    schema_version = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    input_sha256 = Column(String(64), nullable=False)
+    output = Column(JSON, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
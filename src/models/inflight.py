@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, text
+from sqlalchemy.types import JSON
+
+from .base import Base
+
+
+class InflightRequest(Base):
+    """
+    Cross-process single-flight lock for an LLM request, keyed by prompt hash.
+
+    The leader holds the row while ``status`` is ``running`` and publishes ``result``
+    when ``done``; rows past ``expires_at`` may be taken over or purged.
+    """
+
+    __tablename__ = "inflight_requests"
+
+    key = Column(String(64), primary_key=True)
+    owner = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    result = Column(JSON, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Index, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.types import JSON
+from sqlalchemy.types import LargeBinary
 
-from .base import Base
+from .base import Base, JSONType
 from .association import job_resume_association
 
 class Job(Base):
@@ -25,6 +25,11 @@ class Job(Base):
 
 class ProcessedJob(Base):
     __tablename__ = "processed_jobs"
+    __table_args__ = (
+        Index(
+            "ix_processed_jobs_extracted_keywords", "extracted_keywords", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     job_id = Column(
         String,
@@ -33,16 +38,18 @@ class ProcessedJob(Base):
         index=True,
     )
     job_title = Column(String, nullable=False)
-    company_profile = Column(Text, nullable=True)
-    location = Column(String, nullable=True)
+    company_profile = Column(JSONType, nullable=True)
+    location = Column(JSONType, nullable=True)
     date_posted = Column(String, nullable=True)
     employment_type = Column(String, nullable=True)
     job_summary = Column(Text, nullable=False)
-    key_responsibilities = Column(JSON, nullable=True)
-    qualifications = Column(JSON, nullable=True)
-    compensation_and_benfits = Column(JSON, nullable=True)
-    application_info = Column(JSON, nullable=True)
-    extracted_keywords = Column(JSON, nullable=True)
+    key_responsibilities = Column(JSONType, nullable=True)
+    qualifications = Column(JSONType, nullable=True)
+    compensation_and_benfits = Column(JSONType, nullable=True)
+    application_info = Column(JSONType, nullable=True)
+    extracted_keywords = Column(JSONType, nullable=True)
+    # L2-normalized float32 vector, see src.retrieval.to_embedding_bytes
+    embedding = Column(LargeBinary, nullable=True)
     processed_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
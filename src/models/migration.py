@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, text
+
+from .base import Base
+
+
+class SchemaMigration(Base):
+    """
+    One row per data/schema migration applied by ``src.core.migrations``.
+    """
+
+    __tablename__ = "schema_migrations"
+
+    name = Column(String, primary_key=True)
+    applied_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, text, NVARCHAR
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Index, text, NVARCHAR
 from sqlalchemy.orm import relationship
-from sqlalchemy.types import JSON
+from sqlalchemy.types import LargeBinary
 
-from .base import Base
+from .base import Base, JSONType
 from .association import job_resume_association
 
 
@@ -27,6 +27,14 @@ class Resume(Base):
 
 class ProcessedResume(Base):
     __tablename__ = "processed_resumes"
+    __table_args__ = (
+        Index(
+            "ix_processed_resumes_extracted_keywords", "extracted_keywords", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_processed_resumes_skills", "skills", postgresql_using="gin").ddl_if(
+            dialect="postgresql"
+        ),
+    )
 
     resume_id = Column(
         String,
@@ -34,14 +42,16 @@ class ProcessedResume(Base):
         primary_key=True,
         index=True,
     )
-    personal_data = Column(JSON, nullable=False)
-    experiences = Column(JSON, nullable=True)
-    projects = Column(JSON, nullable=True)
-    skills = Column(JSON, nullable=True)
-    research_work = Column(JSON, nullable=True)
-    achievements = Column(JSON, nullable=True)
-    education = Column(JSON, nullable=True)
-    extracted_keywords = Column(JSON, nullable=True)
+    personal_data = Column(JSONType, nullable=False)
+    experiences = Column(JSONType, nullable=True)
+    projects = Column(JSONType, nullable=True)
+    skills = Column(JSONType, nullable=True)
+    research_work = Column(JSONType, nullable=True)
+    achievements = Column(JSONType, nullable=True)
+    education = Column(JSONType, nullable=True)
+    extracted_keywords = Column(JSONType, nullable=True)
+    # L2-normalized float32 vector, see src.retrieval.to_embedding_bytes
+    embedding = Column(LargeBinary, nullable=True)
     processed_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
@@ -0,0 +1,45 @@
+import enum
+
+from sqlalchemy import Column, String, Integer, Text, DateTime, text, LargeBinary, Index
+
+from .base import Base
+
+
+class TaskStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class TaskKind(str, enum.Enum):
+    RESUME = "resume"
+    JOB = "job"
+    # payload is the UTF-8 id of the processed resume / job to (re)score
+    SCORE_RESUME = "score_resume"
+    SCORE_JOB = "score_job"
+
+
+class IngestionTask(Base):
+    __tablename__ = "ingestion_tasks"
+
+    task_id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=TaskStatus.QUEUED.value)
+    # raw upload (PDF bytes or UTF-8 job text), cleared once the task is done
+    payload = Column(LargeBinary, nullable=True)
+    filename = Column(String, nullable=True)
+    result_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_ingestion_tasks_status_created_at", "status", "created_at"),
+    )
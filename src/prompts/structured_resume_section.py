@@ -0,0 +1,22 @@
+PROMPT = """
+You are a JSON extraction engine. Convert the following part of a resume into precisely the JSON schema specified below.
+- Fill only the keys in the schema; other parts of the resume are extracted separately.
+- Use an empty list for a key the text has nothing for.
+- Do not compose any extra fields or commentary.
+- Do not make up values for any fields.
+- User "Present" if an end date is ongoing.
+- Make sure dates are in YYYY-MM-DD.
+- Do not format the response in Markdown or any other format. Just output raw JSON.
+
+Schema:
+```json
+{0}
+```
+
+Resume section:
+```text
+{1}
+```
+
+NOTE: Please output only a valid JSON matching the EXACT schema.
+"""
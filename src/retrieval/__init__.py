@@ -0,0 +1,39 @@
+from .similarity import normalize, top_k_cosine, rescore, to_embedding_bytes, from_embedding_bytes
+from .embedding_store import EmbeddingStore, get_embedding_store, RESUME_EMBEDDINGS, JOB_EMBEDDINGS
+from .keyword_index import KeywordIndex, get_keyword_index, normalize_keyword
+from .bm25 import BM25Index, get_bm25_index, tokenize, reciprocal_rank_fusion
+from .vector_index import VectorIndex, ExactIndex
+from .quantization import Codec, FlatCodec, ScalarQuantizer, ProductQuantizer, DimensionReducer, make_codec
+from .ivf import IVFIndex, spherical_kmeans
+from .vector_search import VectorSearch, get_vector_search
+
+__all__ = [
+    "normalize",
+    "top_k_cosine",
+    "rescore",
+    "to_embedding_bytes",
+    "from_embedding_bytes",
+    "EmbeddingStore",
+    "get_embedding_store",
+    "RESUME_EMBEDDINGS",
+    "JOB_EMBEDDINGS",
+    "KeywordIndex",
+    "get_keyword_index",
+    "normalize_keyword",
+    "BM25Index",
+    "get_bm25_index",
+    "tokenize",
+    "reciprocal_rank_fusion",
+    "VectorIndex",
+    "ExactIndex",
+    "Codec",
+    "FlatCodec",
+    "ScalarQuantizer",
+    "ProductQuantizer",
+    "DimensionReducer",
+    "make_codec",
+    "IVFIndex",
+    "spherical_kmeans",
+    "VectorSearch",
+    "get_vector_search",
+]
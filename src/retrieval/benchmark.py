@@ -0,0 +1,173 @@
+"""
+Recall, latency and memory of the approximate (and compressed) vector indexes against
+exact search.
+
+Run with ``python -m src.retrieval.benchmark`` (synthetic clustered embeddings) or
+``python -m src.retrieval.benchmark --store resumes`` (an embedding store on disk).
+"""
+import time
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .ivf import IVFIndex
+from .similarity import normalize, rescore
+from .vector_index import ExactIndex
+
+SearchFn = Callable[[np.ndarray, int], Tuple[np.ndarray, np.ndarray]]
+
+
+def synthetic_embeddings(
+        n: int, dim: int, n_clusters: int = 200, spread: float = 3.0, seed: int = 0
+) -> np.ndarray:
+    """
+    Unit vectors scattered around random centres, loosely resembling text embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.standard_normal((n_clusters, dim)))
+    labels = rng.integers(0, n_clusters, n)
+    noise = rng.standard_normal((n, dim)).astype(np.float32) * spread / np.sqrt(dim)
+    return normalize(centres[labels] + noise)
+
+
+def recall_at_k(truth: List[np.ndarray], found: List[np.ndarray], k: int) -> float:
+    """
+    Mean fraction of the exact top ``k`` rows that the approximate search also returned.
+    """
+    hits = [len(np.intersect1d(t[:k], f[:k])) / max(min(k, len(t)), 1) for t, f in zip(truth, found)]
+    return float(np.mean(hits))
+
+
+def measure(search: SearchFn, queries: np.ndarray, k: int) -> Tuple[List[np.ndarray], Dict[str, float]]:
+    """
+    Runs every query through ``search`` and returns the rows found with latency percentiles.
+    """
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        rows, _ = search(query, k)
+        latencies.append(time.perf_counter() - started)
+        results.append(rows)
+    latencies_ms = np.asarray(latencies) * 1000
+    return results, {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "qps": len(queries) / float(np.sum(latencies)),
+    }
+
+
+# (label, IVFIndex.train keyword arguments)
+CONFIGURATIONS: List[Tuple[str, Dict]] = [
+    ("flat", {"codec": "flat"}),
+    ("sq8", {"codec": "sq8"}),
+    ("pq", {"codec": "pq"}),
+    ("pca256+sq8", {"codec": "sq8", "reduce": "pca", "reduced_dim": 256}),
+    ("trunc256+pq", {"codec": "pq", "reduce": "truncate", "reduced_dim": 256}),
+]
+
+
+def run(
+        vectors: np.ndarray,
+        queries: np.ndarray,
+        k: int = 10,
+        n_lists: Optional[int] = None,
+        nprobes: Tuple[int, ...] = (4, 16, 64),
+        rerank: int = 100,
+        configurations: Optional[List[Tuple[str, Dict]]] = None,
+) -> List[Dict[str, float]]:
+    """
+    Benchmarks IVF indexes over ``vectors`` for every configuration and ``nprobe`` setting.
+
+    Compressed configurations are measured twice: on their approximate scores alone and
+    with the best ``rerank`` candidates re-scored against the float32 vectors.
+
+    Returns one row per run with recall@k, latency, index memory and its compression over
+    the float32 matrix.
+    """
+    rows = np.arange(len(vectors))
+    exact = ExactIndex(vectors.shape[1])
+    exact.add(rows, vectors)
+    truth, exact_stats = measure(exact.search, queries, k)
+    float_mb = vectors.nbytes / 2**20
+    report = [{"index": "exact", "recall": 1.0, "memory_mb": float_mb, "ratio": 1.0, **exact_stats}]
+
+    for label, options in configurations or CONFIGURATIONS:
+        started = time.perf_counter()
+        ivf = IVFIndex.train(vectors, n_lists=n_lists, **options)
+        ivf.add(rows, vectors)
+        ivf.consolidate()
+        build_s = time.perf_counter() - started
+        memory_mb = ivf.nbytes / 2**20
+
+        reranks = (0, rerank) if options.get("codec") != "flat" or options.get("reduce") else (0,)
+        for nprobe in nprobes:
+            if nprobe > ivf.n_lists:
+                break
+            for depth in reranks:
+                def search(query: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+                    if not depth:
+                        return ivf.search(query, n, nprobe=nprobe)
+                    candidates, _ = ivf.search(query, max(n, depth), nprobe=nprobe)
+                    return rescore(query, vectors, candidates, n)
+
+                found, stats = measure(search, queries, k)
+                report.append({
+                    "index": f"ivf{ivf.n_lists},{label},nprobe={nprobe}"
+                             + (f",rerank={depth}" if depth else ""),
+                    "recall": recall_at_k(truth, found, k),
+                    "memory_mb": memory_mb,
+                    "ratio": float_mb / memory_mb,
+                    "build_s": build_s,
+                    **stats,
+                })
+    return report
+
+
+def _print_report(report: List[Dict[str, float]], k: int) -> None:
+    print(
+        f"{'index':<44}{'recall@' + str(k):>10}{'p50 ms':>9}{'p99 ms':>9}{'qps':>8}"
+        f"{'MiB':>9}{'x smaller':>11}{'build s':>9}"
+    )
+    for row in report:
+        print(
+            f"{row['index']:<44}{row['recall']:>10.3f}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+            f"{row['qps']:>8.0f}{row['memory_mb']:>9.1f}{row['ratio']:>11.1f}"
+            f"{row.get('build_s', 0.0):>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vector indexes against exact search")
+    parser.add_argument("--store", help="benchmark an embedding store instead of synthetic data")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-lists", type=int, default=0)
+    parser.add_argument("--rerank", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    if args.store:
+        from .embedding_store import get_embedding_store
+
+        store = get_embedding_store(args.store)
+        store.refresh()
+        vectors = np.asarray(store.matrix)
+        mask = store.live_mask
+        if mask is not None:
+            vectors = vectors[mask]
+    else:
+        vectors = synthetic_embeddings(args.rows + args.queries, args.dim)
+    # held-out queries: perturbed copies of random rows
+    picks = rng.choice(len(vectors), args.queries, replace=False)
+    queries = normalize(vectors[picks] + rng.standard_normal((args.queries, vectors.shape[1])) * 0.01)
+    if not args.store:
+        vectors = np.delete(vectors, picks, axis=0)
+
+    _print_report(run(vectors, queries, k=args.k, n_lists=args.n_lists or None, rerank=args.rerank), args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# A token starts with a letter/digit (or a "." for names like ".net") and may continue with
+# "+" and "#" ("c++", "c#") and inner ".", "/" or "-" joins ("node.js", "ci/cd", "front-end").
+_TOKEN_RE = re.compile(r"(?<![\w.])\.?[a-z0-9][a-z0-9+#]*(?:[./\-][a-z0-9+#]+)*")
+
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has have in into is it its of on or our over that the
+    their this to was were will with within we you your i my me
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased resume tokens that keep technology names intact ("c++", "node.js", "k8s").
+
+    Slash-joined terms are kept whole and also split, so "python/django" matches a query for
+    "django" and "ci/cd" still matches "ci/cd".
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if "/" in token:
+            tokens.extend(part for part in token.split("/") if part)
+    return [token for token in tokens if token not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over documents added incrementally.
+
+    Term statistics live in flat arrays: document frequencies per term id, document lengths,
+    and a CSR posting matrix (``indptr`` per term into parallel doc-index / term-frequency
+    arrays). New documents go to a small delta segment that is scanned directly and merged
+    into the CSR arrays once it holds ``merge_threshold`` documents.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, merge_threshold: int = 1024) -> None:
+        self.k1 = k1
+        self.b = b
+        self.merge_threshold = merge_threshold
+        self._lock = threading.Lock()
+
+        self._vocabulary: Dict[str, int] = {}
+        self._df: List[int] = []
+        self._keys: List[str] = []
+        self._key_to_doc: Dict[str, int] = {}
+        # document lengths in a buffer grown by doubling; ``_norm`` caches the BM25 length
+        # normalisation derived from them until the next add
+        self._doc_len = np.empty(64, dtype=np.float32)
+        self._total_len = 0
+        self._norm: Optional[np.ndarray] = None
+
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._postings_doc = np.empty(0, dtype=np.int32)
+        self._postings_tf = np.empty(0, dtype=np.float32)
+        self._merged_docs = 0
+        self._delta: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._delta_flat: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+        # newest created_at indexed so far, for incremental syncs from the database
+        self.watermark: Optional[datetime] = None
+
+    def add(self, key: str, text: str) -> bool:
+        """
+        Indexes ``text`` under ``key``. Documents are immutable: a known key is skipped.
+        """
+        counts = Counter(tokenize(text))
+        with self._lock:
+            if key in self._key_to_doc:
+                return False
+            term_ids = np.empty(len(counts), dtype=np.int32)
+            for i, term in enumerate(counts):
+                term_id = self._vocabulary.get(term)
+                if term_id is None:
+                    term_id = self._vocabulary[term] = len(self._df)
+                    self._df.append(0)
+                self._df[term_id] += 1
+                term_ids[i] = term_id
+            tfs = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            order = np.argsort(term_ids)
+
+            doc = len(self._keys)
+            if doc == len(self._doc_len):
+                self._doc_len = np.concatenate([self._doc_len, np.empty_like(self._doc_len)])
+            self._key_to_doc[key] = doc
+            self._keys.append(key)
+            length = sum(counts.values())
+            self._doc_len[doc] = length
+            self._total_len += length
+            self._norm = None
+            self._delta.append((term_ids[order], tfs[order]))
+            self._delta_flat = None
+            if len(self._delta) >= self.merge_threshold:
+                self._merge_locked()
+            return True
+
+    def _delta_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The delta segment as flat (term, doc, tf) arrays, cached until the next add.
+        """
+        if self._delta_flat is None:
+            if self._delta:
+                self._delta_flat = (
+                    np.concatenate([term_ids for term_ids, _ in self._delta]),
+                    np.repeat(
+                        np.arange(self._merged_docs, len(self._keys), dtype=np.int32),
+                        [len(term_ids) for term_ids, _ in self._delta],
+                    ),
+                    np.concatenate([tfs for _, tfs in self._delta]),
+                )
+            else:
+                empty = np.empty(0, dtype=np.int32)
+                self._delta_flat = (empty, empty, np.empty(0, dtype=np.float32))
+        return self._delta_flat
+
+    def _norm_locked(self) -> np.ndarray:
+        """
+        ``k1 * (1 - b + b * doc_len / avg_doc_len)`` per document, cached until the next add.
+        """
+        if self._norm is None:
+            n_docs = len(self._keys)
+            doc_len = self._doc_len[:n_docs]
+            self._norm = self.k1 * (1 - self.b + self.b * doc_len / (self._total_len / n_docs))
+        return self._norm
+
+    def _merge_locked(self) -> None:
+        if not self._delta:
+            return
+        n_terms = len(self._df)
+        delta_terms, delta_docs, delta_tfs = self._delta_arrays()
+        old_terms = np.repeat(
+            np.arange(len(self._indptr) - 1, dtype=np.int32), np.diff(self._indptr)
+        )
+        terms = np.concatenate([old_terms, delta_terms])
+        # merged postings are already in (term, doc) order and every delta doc comes after
+        # them, so a stable sort on the term alone yields (term, doc) order
+        order = np.argsort(terms, kind="stable")
+        self._postings_doc = np.concatenate([self._postings_doc, delta_docs])[order]
+        self._postings_tf = np.concatenate([self._postings_tf, delta_tfs])[order]
+        self._indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=n_terms), out=self._indptr[1:])
+        self._merged_docs = len(self._keys)
+        self._delta = []
+        self._delta_flat = None
+
+    def search(
+            self, query: str, top_k: int = 10, candidates: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Top ``top_k`` (key, score) pairs for ``query``, best first; zero scores are dropped.
+
+        ``candidates`` restricts scoring to those keys.
+        """
+        with self._lock:
+            term_ids = sorted(
+                {self._vocabulary[t] for t in tokenize(query) if t in self._vocabulary}
+            )
+            n_docs = len(self._keys)
+            if not term_ids or not n_docs:
+                return []
+
+            norm = self._norm_locked()
+            df = np.asarray([self._df[t] for t in term_ids], dtype=np.float32)
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            scores = np.zeros(n_docs, dtype=np.float32)
+
+            for term_id, weight in zip(term_ids, idf):
+                if term_id + 1 < len(self._indptr):
+                    start, end = self._indptr[term_id], self._indptr[term_id + 1]
+                    docs = self._postings_doc[start:end]
+                    tf = self._postings_tf[start:end]
+                    scores[docs] += weight * tf * (self.k1 + 1) / (tf + norm[docs])
+
+            delta_terms, delta_docs, delta_tfs = self._delta_arrays()
+            if len(delta_terms):
+                hit = np.isin(delta_terms, term_ids)
+                docs, tf = delta_docs[hit], delta_tfs[hit]
+                weight = idf[np.searchsorted(term_ids, delta_terms[hit])]
+                np.add.at(scores, docs, weight * tf * (self.k1 + 1) / (tf + norm[docs]))
+
+            if candidates is not None:
+                allowed = np.zeros(n_docs, dtype=bool)
+                allowed[[self._key_to_doc[k] for k in candidates if k in self._key_to_doc]] = True
+                scores[~allowed] = 0.0
+
+            hits = np.flatnonzero(scores > 0)
+            if len(hits) > top_k:
+                hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            return [(self._keys[doc], float(scores[doc])) for doc in hits]
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._vocabulary)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_to_doc
+
+
+def reciprocal_rank_fusion(
+        rankings: Sequence[Sequence[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuses ranked key lists by summing ``1 / (k + rank)`` (rank starting at 1), best first.
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+@lru_cache(maxsize=1)
+def get_bm25_index() -> BM25Index:
+    """Create (or return) the process-wide BM25 index over raw resume markdown."""
+    return BM25Index()
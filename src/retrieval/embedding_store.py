@@ -0,0 +1,307 @@
+import os
+import json
+import logging
+import contextlib
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from src.core.config import settings
+from .similarity import normalize
+
+try:
+    import fcntl
+except ImportError:  # Windows, single-worker only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """
+    Append-only on-disk store of L2-normalized float32 embeddings keyed by string id.
+
+    Layout inside ``directory`` for a store called ``name``:
+
+    * ``{name}.meta.json`` - dimension and current generation, replaced atomically
+    * ``{name}.{gen}.f32`` - raw (rows, dim) float32 matrix, opened with ``numpy.memmap``
+    * ``{name}.{gen}.ids`` - one id per line, line i names row i
+    * ``{name}.{gen}.tombstones`` - one deleted row number per line
+
+    Every process maps the same files read-only, so uvicorn workers share one copy in the
+    page cache. Writers append under an exclusive ``flock`` (vectors first, ids last, so a
+    row exists only once complete; the next writer truncates whatever a crashed one left)
+    and readers pick up new rows incrementally. ``compact`` rewrites live rows into the next generation once tombstones
+    exceed ``compact_ratio`` of the rows.
+    """
+
+    def __init__(self, directory: str, name: str, compact_ratio: float = 0.25) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self.compact_ratio = compact_ratio
+
+        self.dim: Optional[int] = None
+        self._generation: Optional[int] = None
+        self._row_ids: List[str] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._tombstones: set[int] = set()
+        self._ids_offset = 0
+        self._tombstones_offset = 0
+        self._matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+
+    def _path(self, suffix: str, generation: Optional[int] = None) -> str:
+        if generation is None:
+            return os.path.join(self.directory, f"{self.name}.{suffix}")
+        return os.path.join(self.directory, f"{self.name}.{generation}.{suffix}")
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self._path("lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                self._discard_partial_writes()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _discard_partial_writes(self) -> None:
+        """
+        Truncates what a writer that died mid-append left behind: vectors whose ids were
+        never written, and an incomplete last id or tombstone line. Runs under the lock,
+        before anything is appended after it.
+        """
+        if self._generation is None:
+            return
+        for path, size in (
+                (self._path("f32", self._generation), len(self._row_ids) * self.dim * 4),
+                (self._path("ids", self._generation), self._ids_offset),
+                (self._path("tombstones", self._generation), self._tombstones_offset),
+        ):
+            with contextlib.suppress(FileNotFoundError):
+                if os.path.getsize(path) > size:
+                    logger.warning(f"Discarding an incomplete write at the end of {path}")
+                    os.truncate(path, size)
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._path("meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, dim: int, generation: int) -> None:
+        tmp_path = self._path("meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": dim, "generation": generation}, f)
+        os.replace(tmp_path, self._path("meta.json"))
+
+    @staticmethod
+    def _read_lines(path: str, offset: int) -> tuple[list[str], int]:
+        """
+        Reads complete lines appended to ``path`` after byte ``offset``.
+        """
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return [], offset
+        return data[:end].decode("utf-8").splitlines(), offset + end
+
+    def refresh(self) -> None:
+        """
+        Picks up rows, tombstones or a compaction written by any process since the last call.
+        """
+        meta = self._read_meta()
+        if meta is None:
+            return
+        if meta["generation"] != self._generation:
+            self.dim = meta["dim"]
+            self._generation = meta["generation"]
+            self._row_ids, self._id_to_row, self._tombstones = [], {}, set()
+            self._ids_offset = self._tombstones_offset = 0
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+
+        new_ids, self._ids_offset = self._read_lines(
+            self._path("ids", self._generation), self._ids_offset
+        )
+        for item_id in new_ids:
+            previous = self._id_to_row.get(item_id)
+            if previous is not None:
+                self._tombstones.add(previous)
+            self._id_to_row[item_id] = len(self._row_ids)
+            self._row_ids.append(item_id)
+
+        new_tombstones, self._tombstones_offset = self._read_lines(
+            self._path("tombstones", self._generation), self._tombstones_offset
+        )
+        for line in new_tombstones:
+            row = int(line)
+            self._tombstones.add(row)
+            item_id = self._row_ids[row]
+            if self._id_to_row.get(item_id) == row:
+                del self._id_to_row[item_id]
+
+        rows = len(self._row_ids)
+        if rows and rows != self._matrix.shape[0]:
+            self._matrix = np.memmap(
+                self._path("f32", self._generation),
+                dtype=np.float32,
+                mode="r",
+                shape=(rows, self.dim),
+            )
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        (rows, dim) matrix including tombstoned rows, mask those out with ``live_mask``.
+        """
+        return self._matrix
+
+    @property
+    def row_ids(self) -> List[str]:
+        return self._row_ids
+
+    @property
+    def generation(self) -> Optional[int]:
+        """
+        Current generation; row numbers are only stable within one generation.
+        """
+        return self._generation
+
+    @property
+    def live_mask(self) -> Optional[np.ndarray]:
+        """
+        Boolean mask of live rows, or None when no row is tombstoned.
+        """
+        if not self._tombstones:
+            return None
+        mask = np.ones(len(self._row_ids), dtype=bool)
+        mask[list(self._tombstones)] = False
+        return mask
+
+    def mask_for(self, item_ids: Iterable[str]) -> np.ndarray:
+        """
+        Boolean mask selecting the live rows of ``item_ids``; ids not in the store are ignored.
+        """
+        mask = np.zeros(len(self._row_ids), dtype=bool)
+        rows = [self._id_to_row[item_id] for item_id in item_ids if item_id in self._id_to_row]
+        mask[rows] = True
+        return mask
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._id_to_row
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        row = self._id_to_row.get(item_id)
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def add(self, item_id: str, vector: list[float] | np.ndarray) -> None:
+        """
+        Appends (or replaces) the embedding for ``item_id``.
+        """
+        self.add_many([item_id], np.asarray(vector, dtype=np.float32)[None, :])
+
+    def add_many(self, item_ids: List[str], vectors: np.ndarray) -> None:
+        """
+        Appends (or replaces) embeddings for several ids in one locked write.
+        """
+        if not item_ids:
+            return
+        vectors = normalize(vectors)
+        if "\n" in "".join(item_ids):
+            raise ValueError("Embedding ids must not contain newlines")
+
+        with self._locked():
+            if self._generation is None:
+                self._write_meta(dim=vectors.shape[1], generation=0)
+                self.refresh()
+            if vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}"
+                )
+
+            # a re-added id tombstones its previous row implicitly when the ids are read back;
+            # the ids go last, so a row only exists once its vector is fully written
+            with open(self._path("f32", self._generation), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path("ids", self._generation), "a", encoding="utf-8") as f:
+                f.write("".join(f"{i}\n" for i in item_ids))
+            self.refresh()
+            self._maybe_compact()
+
+    def remove(self, item_id: str) -> bool:
+        """
+        Tombstones the embedding for ``item_id``. Returns False if it was not stored.
+        """
+        with self._locked():
+            row = self._id_to_row.get(item_id)
+            if row is None:
+                return False
+            with open(self._path("tombstones", self._generation), "a") as f:
+                f.write(f"{row}\n")
+            self.refresh()
+            self._maybe_compact()
+            return True
+
+    def _maybe_compact(self) -> None:
+        rows = len(self._row_ids)
+        if rows and len(self._tombstones) / rows > self.compact_ratio:
+            self._compact_locked()
+
+    def compact(self) -> None:
+        """
+        Rewrites live rows into a new generation and drops tombstoned ones.
+        """
+        with self._locked():
+            if self._generation is not None:
+                self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        old_generation = self._generation
+        generation = old_generation + 1
+        live = sorted(self._id_to_row.items(), key=lambda item: item[1])
+
+        with open(self._path("f32", generation), "wb") as f:
+            for start in range(0, len(live), 4096):
+                rows = [row for _, row in live[start:start + 4096]]
+                f.write(np.ascontiguousarray(self._matrix[rows]).tobytes())
+        with open(self._path("ids", generation), "w", encoding="utf-8") as f:
+            f.write("".join(f"{item_id}\n" for item_id, _ in live))
+        open(self._path("tombstones", generation), "w").close()
+        self._write_meta(dim=self.dim, generation=generation)
+
+        logger.info(
+            f"Compacted embedding store '{self.name}' from {len(self._row_ids)} to {len(live)} rows"
+        )
+        self.refresh()
+        for suffix in ("f32", "ids", "tombstones"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._path(suffix, old_generation))
+
+
+RESUME_EMBEDDINGS = "resumes"
+JOB_EMBEDDINGS = "jobs"
+
+
+@lru_cache(maxsize=None)
+def get_embedding_store(name: str) -> EmbeddingStore:
+    """Create (or return) the process-wide store called ``name``."""
+    return EmbeddingStore(
+        directory=settings.EMBEDDING_STORE_DIR,
+        name=name,
+        compact_ratio=settings.EMBEDDING_STORE_COMPACT_RATIO,
+    )
@@ -0,0 +1,304 @@
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .quantization import Codec, DimensionReducer, FlatCodec, make_codec
+from .similarity import normalize
+from .vector_index import VectorIndex
+
+_ASSIGN_CHUNK = 16384
+
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Index of the most similar centroid for every row, computed in chunks to bound memory.
+    """
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = np.asarray(vectors[start:start + _ASSIGN_CHUNK], dtype=np.float32)
+        assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(
+        vectors: np.ndarray,
+        n_clusters: int,
+        iterations: int = 20,
+        sample_size: Optional[int] = None,
+        seed: int = 0,
+) -> np.ndarray:
+    """
+    k-means on the unit sphere (cosine similarity); returns (n_clusters, dim) unit centroids.
+
+    Trains on at most ``sample_size`` random rows (default 64 per cluster). Clusters that end
+    up empty are re-seeded from random training rows.
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = sample_size or 64 * n_clusters
+    if len(vectors) > sample_size:
+        data = normalize(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    else:
+        data = normalize(vectors)
+    n_clusters = min(n_clusters, len(data))
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = assign_to_centroids(data, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_clusters)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        sums = np.zeros_like(centroids)
+        sums[present] = np.add.reduceat(data[order], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid, and a query
+    scans only the ``nprobe`` buckets whose centroids are most similar to it.
+
+    Raising ``nprobe`` trades latency for recall (``nprobe == n_lists`` scans everything).
+    Buckets are stored contiguously (CSR layout); vectors added after the last consolidation
+    are kept in a pending segment that is scanned too and folded in when it grows.
+
+    Vectors can be projected onto fewer dimensions (``reducer``) and are stored as the
+    ``codec`` encoding of their residual from the bucket centroid, so a score is
+    ``q . centroid + codec.score(q, residual code)``. Quantized scores are approximate;
+    re-rank the best candidates with the full-precision vectors where exact order matters.
+    """
+
+    def __init__(
+            self,
+            centroids: np.ndarray,
+            nprobe: int = 8,
+            codec: Optional[Codec] = None,
+            reducer: Optional[DimensionReducer] = None,
+            consolidate_ratio: float = 0.05,
+    ) -> None:
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        self.dim = self.centroids.shape[1]
+        self.codec = codec or FlatCodec(self.dim)
+        self.reducer = reducer
+        self.consolidate_ratio = consolidate_ratio
+
+        self._offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        self._codes = self.codec.encode(np.empty((0, self.dim), dtype=np.float32))
+        self._rows = np.empty(0, dtype=np.int32)
+        self._pending_codes: List[np.ndarray] = []
+        self._pending_rows: List[np.ndarray] = []
+        self._pending_lists: List[np.ndarray] = []
+        self._pending_count = 0
+        self._rows_indexed = 0
+
+    @classmethod
+    def train(
+            cls,
+            vectors: np.ndarray,
+            n_lists: Optional[int] = None,
+            nprobe: int = 8,
+            codec: str = "flat",
+            pq_subspaces: int = 0,
+            reduce: Optional[str] = None,
+            reduced_dim: int = 256,
+            iterations: int = 20,
+            seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Learns ``n_lists`` centroids (default ``sqrt(len(vectors))``) from ``vectors``, plus the
+        dimension reduction (``"truncate"`` or ``"pca"`` to ``reduced_dim``) and the residual
+        codec (``"flat"``, ``"sq8"`` or ``"pq"``) if requested.
+        """
+        reducer = None
+        if reduce and reduced_dim < vectors.shape[1]:
+            reducer = DimensionReducer(reduce, reduced_dim)
+            reducer.train(vectors)
+        sample = _sample(vectors, 64 * 1024, seed)
+        sample = reducer.transform(sample) if reducer else normalize(sample)
+
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        centroids = spherical_kmeans(sample, n_lists, iterations=iterations, seed=seed)
+        index_codec = make_codec(codec, sample.shape[1], pq_subspaces)
+        index_codec.train(sample - centroids[assign_to_centroids(sample, centroids)])
+        return cls(centroids, nprobe=nprobe, codec=index_codec, reducer=reducer)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def rows_indexed(self) -> int:
+        return self._rows_indexed
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the index: codes, row numbers, centroids and trained codec parameters.
+        """
+        stored = self._codes.nbytes + self._rows.nbytes + self.centroids.nbytes + self._offsets.nbytes
+        pending = sum(c.nbytes + r.nbytes + l.nbytes for c, r, l in zip(
+            self._pending_codes, self._pending_rows, self._pending_lists
+        ))
+        return stored + pending + self.codec.nbytes + (self.reducer.nbytes if self.reducer else 0)
+
+    def __len__(self) -> int:
+        return len(self._rows) + self._pending_count
+
+    def _transform(self, vectors: np.ndarray) -> np.ndarray:
+        return self.reducer.transform(vectors) if self.reducer else normalize(vectors)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if not len(rows):
+            return
+        for start in range(0, len(rows), _ASSIGN_CHUNK):
+            chunk = self._transform(vectors[start:start + _ASSIGN_CHUNK])
+            lists = assign_to_centroids(chunk, self.centroids)
+            self._pending_codes.append(self.codec.encode(chunk - self.centroids[lists]))
+            self._pending_rows.append(np.asarray(rows[start:start + _ASSIGN_CHUNK], dtype=np.int32))
+            self._pending_lists.append(lists)
+        self._pending_count += len(rows)
+        self._rows_indexed = max(self._rows_indexed, int(np.max(rows)) + 1)
+        if self._pending_count > max(1024, self.consolidate_ratio * len(self._rows)):
+            self.consolidate()
+
+    def consolidate(self) -> None:
+        """
+        Folds the pending segment into the contiguous buckets.
+        """
+        if not self._pending_count:
+            return
+        old_lists = np.repeat(
+            np.arange(self.n_lists, dtype=np.int32), np.diff(self._offsets)
+        )
+        lists = np.concatenate([old_lists, *self._pending_lists])
+        order = np.argsort(lists, kind="stable")
+        self._codes = np.concatenate([self._codes, *self._pending_codes])[order]
+        self._rows = np.concatenate([self._rows, *self._pending_rows])[order]
+        self._offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=self.n_lists), out=self._offsets[1:])
+        self._pending_codes, self._pending_rows, self._pending_lists = [], [], []
+        self._pending_count = 0
+
+    def search(
+            self,
+            query: np.ndarray,
+            k: int,
+            mask: Optional[np.ndarray] = None,
+            nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        query = self._transform(query)
+        prepared = self.codec.prepare(query)
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(self.n_lists)
+
+        candidate_rows, candidate_scores = [], []
+        for probe in probes:
+            start, end = self._offsets[probe], self._offsets[probe + 1]
+            if start < end:
+                candidate_rows.append(self._rows[start:end])
+                candidate_scores.append(
+                    centroid_scores[probe] + self.codec.score(prepared, self._codes[start:end])
+                )
+        for codes, rows, lists in zip(
+                self._pending_codes, self._pending_rows, self._pending_lists
+        ):
+            probed = np.isin(lists, probes)
+            if probed.any():
+                candidate_rows.append(rows[probed])
+                candidate_scores.append(
+                    centroid_scores[lists[probed]] + self.codec.score(prepared, codes[probed])
+                )
+        return _top_k(candidate_rows, candidate_scores, k, mask)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to ``path`` (an ``.npz`` file) atomically.
+        """
+        self.consolidate()
+        extra = {f"codec_{key}": value for key, value in self.codec.state().items()}
+        if self.reducer:
+            extra.update({f"reducer_{key}": value for key, value in self.reducer.state().items()})
+            extra["reducer_kind"] = np.array(self.reducer.kind)
+            extra["reducer_dim"] = np.array(self.reducer.dim)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                offsets=self._offsets,
+                codes=self._codes,
+                rows=self._rows,
+                nprobe=np.array(self.nprobe),
+                rows_indexed=np.array(self._rows_indexed),
+                codec_kind=np.array(self.codec.kind),
+                **extra,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as data:
+            codec_state = {
+                key[len("codec_"):]: data[key]
+                for key in data.files if key.startswith("codec_") and key != "codec_kind"
+            }
+            centroids = data["centroids"]
+            n_subspaces = len(codec_state["codebooks"]) if "codebooks" in codec_state else 0
+            codec = make_codec(str(data["codec_kind"]), centroids.shape[1], n_subspaces)
+            codec.load_state(codec_state)
+            reducer = None
+            if "reducer_kind" in data.files:
+                reducer = DimensionReducer(str(data["reducer_kind"]), int(data["reducer_dim"]))
+                reducer.load_state({
+                    key[len("reducer_"):]: data[key]
+                    for key in data.files if key in ("reducer_mean", "reducer_components")
+                })
+            index = cls(centroids, nprobe=int(data["nprobe"]), codec=codec, reducer=reducer)
+            index._offsets = data["offsets"]
+            index._codes = data["codes"]
+            index._rows = data["rows"]
+            index._rows_indexed = int(data["rows_indexed"])
+        return index
+
+
+def _sample(vectors: np.ndarray, size: int, seed: int) -> np.ndarray:
+    if len(vectors) <= size:
+        return np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    return np.asarray(vectors[np.sort(rng.choice(len(vectors), size, replace=False))], dtype=np.float32)
+
+
+def _top_k(
+        candidate_rows: List[np.ndarray],
+        candidate_scores: List[np.ndarray],
+        k: int,
+        mask: Optional[np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    if not candidate_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    rows = np.concatenate(candidate_rows).astype(np.int64)
+    scores = np.concatenate(candidate_scores)
+    if mask is not None:
+        # rows past the end of the mask were appended after it was taken and are not live yet
+        keep = np.zeros(len(rows), dtype=bool)
+        in_range = rows < len(mask)
+        keep[in_range] = mask[rows[in_range]]
+        rows, scores = rows[keep], scores[keep]
+    k = min(k, len(rows))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < len(rows):
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[top], scores[top]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
@@ -0,0 +1,142 @@
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    Case-folds and collapses whitespace; punctuation is kept so "C++" and "C#" stay apart.
+    """
+    return " ".join(keyword.casefold().split())
+
+
+class KeywordIndex:
+    """
+    In-memory inverted index from normalized keyword to the sorted ``int32`` row ids of the
+    documents carrying it, with each row id mapped back to its external key.
+
+    Additions are buffered per keyword and merged into the sorted array on the next read,
+    so indexing one document costs O(keywords) rather than O(posting length).
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, np.ndarray] = {}
+        self._pending: Dict[str, List[int]] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._doc_keys: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        # newest processed_at indexed so far, for incremental syncs from the database
+        self.watermark: Optional[datetime] = None
+
+    def add(self, row_id: int, key: str, keywords: Iterable[str]) -> None:
+        """
+        Indexes (or re-indexes) document ``row_id`` under ``keywords``.
+        """
+        terms = tuple(sorted({normalize_keyword(k) for k in keywords if k and k.strip()}))
+        with self._lock:
+            if row_id in self._doc_terms:
+                self._remove_locked(row_id)
+            self._doc_terms[row_id] = terms
+            self._doc_keys[row_id] = key
+            for term in terms:
+                self._pending.setdefault(term, []).append(row_id)
+
+    def remove(self, row_id: int) -> None:
+        with self._lock:
+            if row_id in self._doc_terms:
+                self._remove_locked(row_id)
+
+    def _remove_locked(self, row_id: int) -> None:
+        for term in self._doc_terms.pop(row_id):
+            self._merge_locked(term)
+            remaining = self._postings[term]
+            remaining = remaining[remaining != row_id]
+            if len(remaining):
+                self._postings[term] = remaining
+            else:
+                del self._postings[term]
+        del self._doc_keys[row_id]
+
+    def _merge_locked(self, term: str) -> np.ndarray:
+        pending = self._pending.pop(term, None)
+        postings = self._postings.get(term, _EMPTY)
+        if pending:
+            postings = np.union1d(postings, np.asarray(pending, dtype=np.int32)).astype(np.int32)
+            self._postings[term] = postings
+        return postings
+
+    def postings(self, keyword: str) -> np.ndarray:
+        """
+        Sorted row ids of documents carrying ``keyword``.
+        """
+        with self._lock:
+            return self._merge_locked(normalize_keyword(keyword))
+
+    def _posting_lists(self, keywords: Iterable[str]) -> List[np.ndarray]:
+        terms = {normalize_keyword(k) for k in keywords if k and k.strip()}
+        with self._lock:
+            return [self._merge_locked(term) for term in terms]
+
+    def any_of(self, keywords: Iterable[str]) -> np.ndarray:
+        """
+        Sorted row ids of documents carrying at least one of ``keywords``.
+        """
+        lists = [postings for postings in self._posting_lists(keywords) if len(postings)]
+        if not lists:
+            return _EMPTY
+        return np.unique(np.concatenate(lists))
+
+    def all_of(self, keywords: Iterable[str]) -> np.ndarray:
+        """
+        Sorted row ids of documents carrying every one of ``keywords``.
+        """
+        lists = sorted(self._posting_lists(keywords), key=len)
+        if not lists:
+            return _EMPTY
+        result = lists[0]
+        for postings in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, postings, assume_unique=True)
+        return result
+
+    def at_least(self, keywords: Iterable[str], min_match: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row ids of documents carrying at least ``min_match`` of ``keywords`` and how many
+        each carries, most shared keywords first.
+        """
+        lists = [postings for postings in self._posting_lists(keywords) if len(postings)]
+        if not lists:
+            return _EMPTY, _EMPTY
+        row_ids, counts = np.unique(np.concatenate(lists), return_counts=True)
+        keep = counts >= max(min_match, 1)
+        row_ids, counts = row_ids[keep], counts[keep]
+        order = np.argsort(-counts, kind="stable")
+        return row_ids[order], counts[order]
+
+    def keys(self, row_ids: Iterable[int]) -> List[str]:
+        """
+        Maps row ids back to the external keys they were indexed under.
+        """
+        return [self._doc_keys[int(row_id)] for row_id in row_ids]
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings.keys() | self._pending.keys())
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, row_id: int) -> bool:
+        return row_id in self._doc_terms
+
+
+@lru_cache(maxsize=1)
+def get_keyword_index() -> KeywordIndex:
+    """Create (or return) the process-wide keyword index over processed resumes."""
+    return KeywordIndex()
@@ -0,0 +1,300 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import numpy as np
+
+from .similarity import normalize
+
+
+class Codec(ABC):
+    """
+    Compressed representation of vectors that scores queries against the codes directly
+    (asymmetric distance computation: the query stays full precision, only the stored side
+    is quantized).
+    """
+
+    kind: str
+
+    @abstractmethod
+    def train(self, vectors: np.ndarray) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        (n, code_size) codes for ``vectors``.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def prepare(self, query: np.ndarray) -> np.ndarray:
+        """
+        Per-query lookup data reused for every ``score`` call of that query.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def score(self, prepared: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Approximate inner products of the prepared query with the encoded vectors.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def state(self) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def code_size(self) -> int:
+        """
+        Bytes per encoded vector.
+        """
+        raise NotImplementedError
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the trained parameters (codebooks, scales).
+        """
+        return sum(array.nbytes for array in self.state().values())
+
+
+class FlatCodec(Codec):
+    """
+    Uncompressed float32 vectors; exact scores.
+    """
+
+    kind = "flat"
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def train(self, vectors: np.ndarray) -> None:
+        pass
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def prepare(self, query: np.ndarray) -> np.ndarray:
+        return query
+
+    def score(self, prepared: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return codes @ prepared
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        pass
+
+    @property
+    def code_size(self) -> int:
+        return 4 * self.dim
+
+
+class ScalarQuantizer(Codec):
+    """
+    8-bit scalar quantization: each dimension is mapped linearly from its trained
+    [low, high] range onto 0..255, a 4x reduction over float32.
+
+    ``x ~ low + scale * code``, so ``q . x ~ q . low + (q * scale) . code``.
+    """
+
+    kind = "sq8"
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.low = np.zeros(dim, dtype=np.float32)
+        self.scale = np.ones(dim, dtype=np.float32)
+
+    def train(self, vectors: np.ndarray) -> None:
+        # clip the extreme 0.1% so a few outliers do not stretch the range of every vector
+        self.low = np.percentile(vectors, 0.1, axis=0).astype(np.float32)
+        high = np.percentile(vectors, 99.9, axis=0).astype(np.float32)
+        self.scale = np.maximum(high - self.low, 1e-12) / 255
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.low) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def prepare(self, query: np.ndarray) -> np.ndarray:
+        return np.concatenate([query * self.scale, [query @ self.low]]).astype(np.float32)
+
+    def score(self, prepared: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return codes @ prepared[:-1] + prepared[-1]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"low": self.low, "scale": self.scale}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.low, self.scale = state["low"], state["scale"]
+
+    @property
+    def code_size(self) -> int:
+        return self.dim
+
+
+class ProductQuantizer(Codec):
+    """
+    Product quantization: the vector is split into ``n_subspaces`` slices and each slice is
+    replaced by the index of its nearest centroid in a 256-entry codebook, so a vector costs
+    ``n_subspaces`` bytes.
+
+    A query is scored by first filling an (n_subspaces, 256) table of slice inner products;
+    each encoded vector then costs ``n_subspaces`` table lookups.
+    """
+
+    kind = "pq"
+
+    def __init__(self, dim: int, n_subspaces: int, iterations: int = 15, sample_size: int = 20000) -> None:
+        if dim % n_subspaces:
+            raise ValueError(f"Dimension {dim} is not divisible into {n_subspaces} subspaces")
+        self.dim = dim
+        self.n_subspaces = n_subspaces
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.codebooks = np.zeros((n_subspaces, 256, dim // n_subspaces), dtype=np.float32)
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        (n, dim) -> (n_subspaces, n, sub_dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        sub_dim = self.dim // self.n_subspaces
+        return vectors.reshape(len(vectors), self.n_subspaces, sub_dim).transpose(1, 0, 2)
+
+    def _assign(self, slices: np.ndarray) -> np.ndarray:
+        """
+        Nearest codebook entry per slice, (n_subspaces, n, sub_dim) -> (n, n_subspaces).
+        """
+        # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c), batched over subspaces in row
+        # chunks that keep the (n_subspaces, rows, 256) distance block near 16 MB
+        sq_norms = np.einsum("msd,msd->ms", self.codebooks, self.codebooks)[:, None, :]
+        codebooks_t = self.codebooks.transpose(0, 2, 1)
+        n = slices.shape[1]
+        step = max(1, (1 << 22) // (self.n_subspaces * 256))
+        assignments = np.empty((n, self.n_subspaces), dtype=np.uint8)
+        for start in range(0, n, step):
+            distances = sq_norms - 2 * np.matmul(slices[:, start:start + step], codebooks_t)
+            assignments[start:start + step] = np.argmin(distances, axis=2).T
+        return assignments
+
+    def train(self, vectors: np.ndarray) -> None:
+        rng = np.random.default_rng(0)
+        if len(vectors) > self.sample_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), self.sample_size, replace=False))]
+        slices = self._split(vectors)
+        n = slices.shape[1]
+        self.codebooks = slices[:, rng.choice(n, min(256, n), replace=False)].copy()
+        if self.codebooks.shape[1] < 256:
+            pad = np.zeros((self.n_subspaces, 256 - self.codebooks.shape[1], slices.shape[2]), np.float32)
+            self.codebooks = np.concatenate([self.codebooks, pad], axis=1)
+
+        for _ in range(self.iterations):
+            assignments = self._assign(slices)
+            for m in range(self.n_subspaces):
+                counts = np.bincount(assignments[:, m], minlength=256)
+                sums = np.stack(
+                    [
+                        np.bincount(assignments[:, m], weights=slices[m, :, d], minlength=256)
+                        for d in range(slices.shape[2])
+                    ],
+                    axis=1,
+                )
+                filled = counts > 0
+                self.codebooks[m, filled] = sums[filled] / counts[filled, None]
+                # re-seed empty centroids from random training slices
+                empty = np.flatnonzero(~filled)
+                if len(empty):
+                    self.codebooks[m, empty] = slices[m, rng.choice(n, len(empty))]
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return self._assign(self._split(vectors))
+
+    def prepare(self, query: np.ndarray) -> np.ndarray:
+        return np.matmul(self.codebooks, self._split(query[None, :])[:, 0, :, None])[..., 0]
+
+    def score(self, prepared: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # index the flattened table with code + 256 * subspace
+        offsets = np.arange(self.n_subspaces, dtype=np.intp) * 256
+        return prepared.ravel()[codes + offsets].sum(axis=1)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self.codebooks}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.codebooks = state["codebooks"]
+        self.n_subspaces = self.codebooks.shape[0]
+
+    @property
+    def code_size(self) -> int:
+        return self.n_subspaces
+
+
+def make_codec(kind: str, dim: int, n_subspaces: int = 0) -> Codec:
+    """
+    Codec called ``kind`` ("flat", "sq8" or "pq") for ``dim``-dimensional vectors.
+
+    ``n_subspaces`` defaults to one PQ subspace per 8 dimensions.
+    """
+    if kind == "flat":
+        return FlatCodec(dim)
+    if kind == "sq8":
+        return ScalarQuantizer(dim)
+    if kind == "pq":
+        return ProductQuantizer(dim, n_subspaces or max(1, dim // 8))
+    raise ValueError(f"Unknown codec '{kind}'")
+
+
+class DimensionReducer:
+    """
+    Projects embeddings onto fewer dimensions before indexing; outputs are re-normalized.
+
+    ``truncate`` keeps the leading dimensions, which suits embeddings trained to be
+    shortened (OpenAI ``text-embedding-3``); ``pca`` projects onto the top principal
+    components of the training sample.
+    """
+
+    def __init__(self, kind: str, dim: int, sample_size: int = 20000) -> None:
+        if kind not in ("truncate", "pca"):
+            raise ValueError(f"Unknown dimension reduction '{kind}'")
+        self.kind = kind
+        self.dim = dim
+        self.sample_size = sample_size
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    def train(self, vectors: np.ndarray) -> None:
+        if self.kind != "pca":
+            return
+        rng = np.random.default_rng(0)
+        if len(vectors) > self.sample_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), self.sample_size, replace=False))]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[: self.dim])
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.kind == "truncate":
+            return normalize(vectors[..., : self.dim])
+        return normalize((vectors - self.mean) @ self.components.T)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        if self.kind == "truncate":
+            return {}
+        return {"mean": self.mean, "components": self.components}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        if self.kind == "pca":
+            self.mean, self.components = state["mean"], state["components"]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.state().values())
@@ -0,0 +1,81 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize a vector or every row of a matrix as float32.
+
+    Zero vectors are left as zeros instead of producing NaNs.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def to_embedding_bytes(vector: list[float] | np.ndarray) -> bytes:
+    """
+    Serialize an embedding as normalized float32 bytes for storage.
+    """
+    return normalize(vector).astype(np.float32, copy=False).tobytes()
+
+
+def from_embedding_bytes(data: bytes) -> np.ndarray:
+    """
+    Deserialize float32 bytes written by ``to_embedding_bytes``.
+    """
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def top_k_cosine(
+        query: np.ndarray,
+        matrix: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank the rows of a pre-normalized ``matrix`` against ``query`` by cosine similarity.
+
+    Scoring is a single matrix-vector product; only the top ``k`` rows are sorted.
+
+    Args:
+        query: The query embedding, normalized here.
+        matrix: (n, d) float32 matrix whose rows are already L2-normalized.
+        k: Number of results to return.
+        mask: Optional boolean array, rows where it is False are never returned.
+
+    Returns:
+        Tuple of (row indices, scores), both ordered by descending score.
+    """
+    n = matrix.shape[0]
+    k = min(k, n if mask is None else int(mask.sum()))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    scores = matrix @ normalize(query)
+    if mask is not None:
+        scores[~mask] = -np.inf
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.argsort(scores[candidates])[::-1]]
+    return order, scores[order]
+
+
+def rescore(
+        query: np.ndarray, matrix: np.ndarray, rows: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Re-rank candidate ``rows`` of a pre-normalized ``matrix`` by exact cosine similarity.
+
+    Used after an approximate search so that only the candidates are read at full precision.
+
+    Returns:
+        Tuple of (row indices, scores) of the best ``k`` candidates, by descending score.
+    """
+    rows = np.sort(rows)  # ascending reads are kinder to a memory-mapped matrix
+    order, scores = top_k_cosine(query, np.asarray(matrix[rows]), k)
+    return rows[order], scores
@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .similarity import top_k_cosine
+
+
+class VectorIndex(ABC):
+    """
+    Nearest-neighbour index over the rows of an embedding matrix.
+
+    Vectors are L2-normalized, so inner product equals cosine similarity. Rows are identified
+    by their row number in the source matrix (``EmbeddingStore`` rows) and ``mask`` is indexed
+    by that row number.
+    """
+
+    @abstractmethod
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Indexes ``vectors[i]`` as row ``rows[i]``.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(
+            self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (rows, scores) of the best ``k`` rows, ordered by descending score.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, path: str) -> None:
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def rows_indexed(self) -> int:
+        """
+        One past the highest row number indexed so far.
+        """
+        raise NotImplementedError
+
+
+class ExactIndex(VectorIndex):
+    """
+    Brute-force search over an in-memory copy of the vectors; the ground truth for benchmarks.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        end = int(rows.max()) + 1 if len(rows) else 0
+        if end > len(self._matrix):
+            grown = np.zeros((end, self.dim), dtype=np.float32)
+            grown[: len(self._matrix)] = self._matrix
+            self._matrix = grown
+        self._matrix[rows] = vectors
+
+    def search(
+            self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if mask is not None:
+            mask = mask[: len(self._matrix)]
+        return top_k_cosine(query, self._matrix, k, mask=mask)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            np.save(f, self._matrix)
+
+    @classmethod
+    def load(cls, path: str) -> "ExactIndex":
+        matrix = np.load(path)
+        index = cls(matrix.shape[1])
+        index._matrix = matrix
+        return index
+
+    @property
+    def rows_indexed(self) -> int:
+        return len(self._matrix)
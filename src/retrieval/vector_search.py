@@ -0,0 +1,225 @@
+import os
+import logging
+import threading
+import contextlib
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.core.config import settings
+from .embedding_store import EmbeddingStore, get_embedding_store
+from .ivf import IVFIndex
+from .similarity import rescore, top_k_cosine
+
+logger = logging.getLogger(__name__)
+
+# rows added to the index per acquisition of the search lock
+_ADD_CHUNK = 4096
+
+
+class VectorSearch:
+    """
+    Nearest-neighbour search over an ``EmbeddingStore``, approximate once the store is large.
+
+    Below ``min_rows`` rows (or with ``kind="exact"``) every query is a brute-force scan.
+    Above it, an IVF index is trained on the store, persisted next to the store files as
+    ``{name}.{gen}.ivf.npz`` and kept in step with it: rows appended by any worker are added
+    incrementally, and a compaction (new generation, renumbered rows) triggers a rebuild.
+    Training and updates run in a background thread (see ``start_sync``), never in the
+    caller of ``search``. Tombstoned rows stay in the index and are filtered by the mask.
+
+    The index holds its own compressed copy of the vectors (``codec`` "sq8" or "pq",
+    optionally after ``reduce`` to ``reduced_dim``); the best ``rerank`` candidates are
+    then re-scored against the full-precision rows of the memory-mapped store.
+    """
+
+    def __init__(
+            self,
+            store: EmbeddingStore,
+            kind: str = "ivf",
+            n_lists: int = 0,
+            nprobe: int = 16,
+            min_rows: int = 20000,
+            save_every: int = 10000,
+            codec: str = "flat",
+            pq_subspaces: int = 0,
+            reduce: Optional[str] = None,
+            reduced_dim: int = 256,
+            rerank: int = 100,
+    ) -> None:
+        if kind not in ("ivf", "exact"):
+            raise ValueError(f"Unknown vector index kind '{kind}'")
+        self.store = store
+        self.kind = kind
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.min_rows = min_rows
+        self.save_every = save_every
+        self.codec = codec
+        self.pq_subspaces = pq_subspaces
+        self.reduce = reduce or None
+        self.reduced_dim = reduced_dim
+        self.rerank = rerank
+        self._lock = threading.Lock()
+        self._index: Optional[IVFIndex] = None
+        self._generation: Optional[int] = None
+        self._saved_rows = 0
+        self._syncing = False
+
+    def _index_path(self, generation: int) -> str:
+        return os.path.join(self.store.directory, f"{self.store.name}.{generation}.ivf.npz")
+
+    def _matches_config(self, index: IVFIndex, dim: int) -> bool:
+        reduce = self.reduce if self.reduce and self.reduced_dim < dim else None
+        return index.codec.kind == self.codec and (
+            index.reducer.kind if index.reducer else None
+        ) == reduce
+
+    def _needs_sync(self, rows: int) -> bool:
+        if self.kind == "exact" or rows < self.min_rows:
+            return False
+        index = self._index
+        return (
+            index is None
+            or self._generation != self.store.generation
+            or index.rows_indexed < rows
+        )
+
+    def start_sync(self) -> bool:
+        """
+        Brings the index up to date with the store in a background thread, unless a sync is
+        already running or nothing needs doing. Returns True if a sync was started.
+        """
+        with self._lock:
+            if self._syncing or not self._needs_sync(self.store.matrix.shape[0]):
+                return False
+            self._syncing = True
+        threading.Thread(
+            target=self._sync, name=f"vector-index-{self.store.name}", daemon=True
+        ).start()
+        return True
+
+    def _sync(self) -> None:
+        """
+        Loads or trains the index for the store's current generation and adds the rows
+        appended since. Training, loading and saving run without the search lock; new rows
+        are added under it in chunks so searches never wait long.
+        """
+        try:
+            matrix = self.store.matrix
+            generation = self.store.generation
+            if self.kind == "exact" or matrix.shape[0] < self.min_rows:
+                return
+
+            with self._lock:
+                index = self._index if self._generation == generation else None
+                previous = self._generation
+            if previous is not None and previous != generation:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._index_path(previous))
+
+            path = self._index_path(generation)
+            saved_rows = self._saved_rows if index is not None else 0
+            if index is None:
+                with contextlib.suppress(FileNotFoundError, ValueError, KeyError):
+                    loaded = IVFIndex.load(path)
+                    fits = loaded.rows_indexed <= matrix.shape[0]
+                    if fits and self._matches_config(loaded, matrix.shape[1]):
+                        index, saved_rows = loaded, loaded.rows_indexed
+            if index is None:
+                index = IVFIndex.train(
+                    matrix,
+                    n_lists=self.n_lists or None,
+                    nprobe=self.nprobe,
+                    codec=self.codec,
+                    pq_subspaces=self.pq_subspaces,
+                    reduce=self.reduce,
+                    reduced_dim=self.reduced_dim,
+                )
+                index.add(np.arange(matrix.shape[0]), matrix)
+                logger.info(
+                    f"Trained IVF index ({self.codec}) for store '{self.store.name}' with "
+                    f"{index.n_lists} lists over {matrix.shape[0]} rows"
+                )
+
+            with self._lock:
+                self._index, self._generation, self._saved_rows = index, generation, saved_rows
+            end = matrix.shape[0]
+            for start in range(index.rows_indexed, end, _ADD_CHUNK):
+                stop = min(start + _ADD_CHUNK, end)
+                with self._lock:
+                    index.add(np.arange(start, stop), matrix[start:stop])
+            if end - saved_rows >= self.save_every or not saved_rows:
+                with self._lock:
+                    index.consolidate()
+                # only this thread changes the index, so writing it needs no lock
+                index.save(path)
+                with self._lock:
+                    if self._index is index:
+                        self._saved_rows = end
+        except Exception as e:
+            logger.error(f"Vector index sync for store '{self.store.name}' failed: {e}")
+        finally:
+            with self._lock:
+                self._syncing = False
+
+    def search(
+            self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Same contract as ``top_k_cosine(query, store.matrix, k, mask)``: (row numbers, scores)
+        ordered by descending score. Call ``store.refresh()`` first to see the newest rows.
+
+        Never trains or updates the index itself: a stale or missing index starts a
+        background sync, and until it finishes the search is exact, or approximate over
+        the indexed rows plus an exact scan of the rows appended since.
+        """
+        matrix = self.store.matrix
+        if mask is not None and mask.sum() < self.min_rows:
+            # a selective mask is cheaper to scan exactly than to probe around
+            rows = np.flatnonzero(mask)
+            order, scores = top_k_cosine(query, matrix[rows], k)
+            return rows[order], scores
+
+        if self._needs_sync(matrix.shape[0]):
+            self.start_sync()
+        with self._lock:
+            index = self._index if self._generation == self.store.generation else None
+            if index is None:
+                return top_k_cosine(query, matrix, k, mask=mask)
+            approximate = index.codec.kind != "flat" or index.reducer is not None
+            depth = max(k, self.rerank) if approximate and self.rerank else k
+            rows, scores = index.search(query, depth, mask=mask)
+            indexed = index.rows_indexed
+
+        if indexed < matrix.shape[0]:
+            # rows the background sync has not added yet
+            tail_mask = mask[indexed:] if mask is not None else None
+            tail_rows, tail_scores = top_k_cosine(query, matrix[indexed:], depth, mask=tail_mask)
+            rows = np.concatenate([rows, tail_rows + indexed])
+            scores = np.concatenate([scores, tail_scores])
+            if not (approximate and self.rerank):
+                order = np.argsort(scores)[::-1][:k]
+                return rows[order], scores[order]
+        if approximate and self.rerank:
+            return rescore(query, matrix, rows, k)
+        return rows, scores
+
+
+@lru_cache(maxsize=None)
+def get_vector_search(name: str) -> VectorSearch:
+    """Create (or return) the process-wide vector search over the store called ``name``."""
+    return VectorSearch(
+        get_embedding_store(name),
+        kind=settings.VECTOR_INDEX,
+        n_lists=settings.IVF_N_LISTS,
+        nprobe=settings.IVF_NPROBE,
+        min_rows=settings.VECTOR_INDEX_MIN_ROWS,
+        save_every=settings.VECTOR_INDEX_SAVE_EVERY,
+        codec=settings.VECTOR_INDEX_CODEC,
+        pq_subspaces=settings.VECTOR_INDEX_PQ_SUBSPACES,
+        reduce=settings.VECTOR_INDEX_REDUCE,
+        reduced_dim=settings.VECTOR_INDEX_REDUCED_DIM,
+        rerank=settings.VECTOR_INDEX_RERANK,
+    )
@@ -3,6 +3,7 @@ from .structured_job import StructuredJobModel
 from .resume_preview import ResumePreviewerModel
 from .structured_resume import StructuredResumeModel
 from .resume_improvement import ResumeImprovementRequest
+from .batch_get import ResumeBatchGetRequest, JobBatchGetRequest
 
 __all__ = [
     "JobUploadRequest",
@@ -10,4 +11,6 @@ __all__ = [
     "StructuredResumeModel",
     "StructuredJobModel",
     "ResumeImprovementRequest",
+    "ResumeBatchGetRequest",
+    "JobBatchGetRequest",
 ]
@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+MAX_BATCH_GET_IDS = 500
+
+
+class ResumeBatchGetRequest(BaseModel):
+    resume_ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_GET_IDS, description="Resume IDs to fetch"
+    )
+
+
+class JobBatchGetRequest(BaseModel):
+    job_ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_GET_IDS, description="Job IDs to fetch"
+    )
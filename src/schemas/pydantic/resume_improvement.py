@@ -1,7 +1,11 @@
 from uuid import UUID
+from typing import Optional
 from pydantic import BaseModel, Field
 
 
 class ResumeImprovementRequest(BaseModel):
     job_id: UUID = Field(..., description="DB UUID reference to the job")
     resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+    max_iterations: Optional[int] = Field(
+        None, ge=1, le=10, description="Maximum number of LLM rewrites (server default if unset)"
+    )
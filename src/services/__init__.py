@@ -1,6 +1,19 @@
 from .resume_service import ResumeService
 from .job_service import JobService
-from .exceptions import ResumeNotFoundError, ResumeParsingError, JobNotFoundError, JobParsingError
+from .match_service import MatchService, sync_embedding_stores, sync_keyword_index, sync_bm25_index
+from .document_converter import DocumentConverter
+from .scoring_service import ScoringService, scorer_version
+from .improvement_service import ResumeImprovementService
+from .ingestion_service import TaskService, IngestionWorker
+from .response_cache import ResponseCache, CachedResponse, get_response_cache, dump_json
+from .exceptions import (
+    ResumeNotFoundError,
+    ResumeParsingError,
+    JobNotFoundError,
+    JobParsingError,
+    EmbeddingNotFoundError,
+    TaskNotFoundError,
+)
 
 __all__ = [
     "ResumeService",
@@ -9,4 +22,20 @@ __all__ = [
     "JobService",
     "JobNotFoundError",
     "JobParsingError",
-]
\ No newline at end of file
+    "MatchService",
+    "sync_embedding_stores",
+    "sync_keyword_index",
+    "sync_bm25_index",
+    "ScoringService",
+    "ResumeImprovementService",
+    "scorer_version",
+    "DocumentConverter",
+    "TaskService",
+    "IngestionWorker",
+    "ResponseCache",
+    "CachedResponse",
+    "get_response_cache",
+    "dump_json",
+    "TaskNotFoundError",
+    "EmbeddingNotFoundError",
+]
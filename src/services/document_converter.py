@@ -0,0 +1,152 @@
+import io
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi.concurrency import run_in_threadpool
+from markitdown import MarkItDown, StreamInfo
+
+from .exceptions import ResumeParsingError
+
+logger = logging.getLogger(__name__)
+
+# one MarkItDown per process, built by the pool initializer (or lazily in-process)
+_markitdown: MarkItDown | None = None
+
+
+def _init_worker() -> None:
+    global _markitdown
+    _markitdown = MarkItDown(enable_plugins=False)
+
+
+def _warm_up() -> bool:
+    return _markitdown is not None
+
+
+def _count_pdf_pages(data: bytes) -> int:
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdftypes import resolve1
+
+    document = PDFDocument(PDFParser(io.BytesIO(data)))
+    return int(resolve1(resolve1(document.catalog["Pages"])["Count"]))
+
+
+def _convert_pdf(data: bytes, max_pages: int) -> str:
+    """
+    Runs inside a pool worker. Errors are raised as ValueError so they pickle cleanly.
+    """
+    try:
+        return _convert_pdf_text(data, max_pages)
+    except Exception as e:
+        if type(e) is ValueError:
+            raise
+        # MarkItDown and pdfminer raise their own types, not all of which pickle
+        raise ValueError(f"Unreadable PDF: {type(e).__name__}: {e}") from None
+
+
+def _convert_pdf_text(data: bytes, max_pages: int) -> str:
+    if _markitdown is None:
+        _init_worker()
+    if max_pages:
+        try:
+            pages = _count_pdf_pages(data)
+        except Exception as e:
+            raise ValueError(f"Unreadable PDF: {e}") from None
+        if pages > max_pages:
+            raise ValueError(f"PDF has {pages} pages, the limit is {max_pages}")
+    result = _markitdown.convert_stream(
+        io.BytesIO(data),
+        stream_info=StreamInfo(mimetype="application/pdf", extension=".pdf"),
+    )
+    return result.text_content
+
+
+class DocumentConverter:
+    """
+    Converts uploaded PDFs to Markdown off the event loop.
+
+    With ``max_workers > 0`` conversions run in a process pool whose workers each keep a
+    warm ``MarkItDown`` instance; with ``max_workers == 0`` they run in the threadpool of
+    the current process. A conversion exceeding ``timeout`` seconds fails, and the pool it
+    ran in is recycled so the stuck worker does not keep holding a slot; conversions killed
+    along with it are retried once on the new pool.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 30.0, max_pages: int = 20) -> None:
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+        for _ in range(self.max_workers):
+            pool.submit(_warm_up)
+        return pool
+
+    def start(self) -> None:
+        if self.max_workers > 0 and self._pool is None:
+            self._pool = self._new_pool()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _recycle_pool(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Replaces ``pool`` with a fresh one, unless another call already did.
+        """
+        if pool is not self._pool:
+            return
+        self._pool = self._new_pool()
+        # terminate the stuck worker(s); ProcessPoolExecutor has no per-task cancellation
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def convert_pdf(self, data: bytes) -> str:
+        """
+        Converts PDF bytes to Markdown text.
+
+        Raises:
+            ResumeParsingError: If the PDF is unreadable, too long, or conversion timed out.
+        """
+        if self._pool is None:
+            try:
+                return await asyncio.wait_for(
+                    run_in_threadpool(_convert_pdf, data, self.max_pages), self.timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"PDF conversion exceeded {self.timeout}s")
+                raise ResumeParsingError(
+                    message=f"PDF conversion timed out after {self.timeout} seconds."
+                )
+            except Exception as e:
+                raise ResumeParsingError(message=str(e))
+
+        # a conversion killed because another one timed out and recycled its pool gets one
+        # more try on the new pool
+        for attempt in range(2):
+            pool = self._pool
+            try:
+                loop = asyncio.get_running_loop()
+                return await asyncio.wait_for(
+                    loop.run_in_executor(pool, _convert_pdf, data, self.max_pages),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"PDF conversion exceeded {self.timeout}s")
+                self._recycle_pool(pool)
+                raise ResumeParsingError(
+                    message=f"PDF conversion timed out after {self.timeout} seconds."
+                )
+            except BrokenProcessPool:
+                if pool is not self._pool and attempt == 0:
+                    continue
+                self._recycle_pool(pool)
+                raise ResumeParsingError(message="PDF conversion worker crashed.")
+            except Exception as e:
+                raise ResumeParsingError(message=str(e))
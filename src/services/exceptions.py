@@ -55,3 +55,31 @@ class JobParsingError(Exception):
             message = "Parsed job not found."
         super().__init__(message)
         self.resume_id = job_id
+
+
+class EmbeddingNotFoundError(Exception):
+    """
+    Exception raised when a resume or job has no stored embedding to match with.
+    """
+
+    def __init__(self, item_id: Optional[str] = None, message: Optional[str] = None):
+        if item_id and not message:
+            message = f"Embedding for ID {item_id} not found."
+        elif not message:
+            message = "Embedding not found."
+        super().__init__(message)
+        self.item_id = item_id
+
+
+class TaskNotFoundError(Exception):
+    """
+    Exception raised when an ingestion task is not found in the database.
+    """
+
+    def __init__(self, task_id: Optional[str] = None, message: Optional[str] = None):
+        if task_id and not message:
+            message = f"Task with ID {task_id} not found."
+        elif not message:
+            message = "Task not found."
+        super().__init__(message)
+        self.task_id = task_id
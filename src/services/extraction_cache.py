@@ -0,0 +1,109 @@
+import copy
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.core import LRUCache, settings
+from src.core.database import insert_or_ignore
+from src.core.metrics import EXTRACTION_CACHE_LOOKUPS, register_cache
+from src.models import ExtractionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def compute_schema_version(
+        prompt_template: str, json_schema: Any, model_cls: Type[BaseModel], *extra: str
+) -> str:
+    """
+    Fingerprints everything that shapes an extraction result, so editing the prompt,
+    the JSON schema, the Pydantic model or any ``extra`` input (e.g. how the document is
+    compacted before prompting) invalidates previously cached outputs.
+    """
+    fingerprint = json.dumps(
+        [prompt_template, json_schema, model_cls.model_json_schema(), *extra], sort_keys=True
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of validated LLM extraction outputs.
+
+    Keyed by (prompt name, schema version, model, SHA-256 of the input text). Lookups hit a
+    process-wide LRU first and fall back to the ``extraction_cache`` table; writes go to both.
+    The LRU holds private copies, so callers may freely modify what they get or put.
+    """
+
+    _memory = LRUCache(max_items=settings.EXTRACTION_CACHE_SIZE)
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _key(prompt_name: str, schema_version: str, model: str, input_sha256: str) -> str:
+        return hashlib.sha256(
+            "\x1f".join([prompt_name, schema_version, model, input_sha256]).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def hash_input(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    async def get(
+            self, prompt_name: str, schema_version: str, model: str, text: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached output for this extraction, or None on a miss.
+        """
+        key = self._key(prompt_name, schema_version, model, self.hash_input(text))
+        output = self._memory.get(key)
+        if output is not None:
+            EXTRACTION_CACHE_LOOKUPS.inc(prompt=prompt_name, result="memory_hit")
+            return copy.deepcopy(output)
+
+        result = await self.db.execute(
+            select(ExtractionCacheEntry.output).where(ExtractionCacheEntry.cache_key == key)
+        )
+        output = result.scalars().first()
+        if output is not None:
+            self._memory.set(key, copy.deepcopy(output))
+            logger.info(f"Extraction cache hit for prompt '{prompt_name}'")
+        EXTRACTION_CACHE_LOOKUPS.inc(prompt=prompt_name, result="miss" if output is None else "db_hit")
+        return output
+
+    async def set(
+            self,
+            prompt_name: str,
+            schema_version: str,
+            model: str,
+            text: str,
+            output: Dict[str, Any],
+    ) -> None:
+        """
+        Stores a validated output. Persisted with the caller's transaction; an entry written
+        concurrently by another request is left as is.
+        """
+        input_sha256 = self.hash_input(text)
+        key = self._key(prompt_name, schema_version, model, input_sha256)
+        self._memory.set(key, copy.deepcopy(output))
+
+        await insert_or_ignore(
+            self.db,
+            ExtractionCacheEntry,
+            dict(
+                cache_key=key,
+                prompt_name=prompt_name,
+                schema_version=schema_version,
+                model=model,
+                input_sha256=input_sha256,
+                output=output,
+            ),
+        )
+
+
+register_cache("extraction", ExtractionCache._memory)
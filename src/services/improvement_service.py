@@ -0,0 +1,215 @@
+import time
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.core import LRUCache
+from src.core.config import settings
+from src.core.metrics import register_cache
+from src.core.tracing import traced
+from src.models import Job, ProcessedJob, Resume, ProcessedResume
+from src.prompts import prompt_factory
+from src.agent import AgentManager, EmbeddingManager, Provider, EmbeddingProvider
+from src.agent.tokens import estimate_tokens
+from src.retrieval import normalize
+from .resume_sections import split_sections
+from .exceptions import JobNotFoundError, ResumeNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _get_embedding_cache() -> LRUCache:
+    """Create (or return) the process-wide cache of job-keyword and resume-section embeddings."""
+    cache = LRUCache(max_items=settings.IMPROVEMENT_EMBEDDING_CACHE_SIZE)
+    register_cache("improvement_embeddings", cache)
+    return cache
+
+
+def _text_key(model: str, text: str) -> Tuple[str, str]:
+    return model, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _strip_markdown_fence(response: str) -> str:
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+    if text.endswith("```"):
+        text = text[: -3]
+    return text.strip()
+
+
+class ResumeImprovementService:
+    """
+    Rewrites a resume towards a job in rounds: score, ask the LLM for a revision, re-score.
+
+    The score is the cosine similarity between the resume and the job's extracted keywords.
+    The resume vector is the length-weighted mean of its section embeddings, so a round only
+    embeds the sections the rewrite changed; the job vector is cached across rounds and
+    requests.
+    """
+
+    def __init__(
+            self,
+            db: AsyncSession,
+            provider: Provider | None = None,
+            embedding_provider: EmbeddingProvider | None = None,
+    ):
+        self.db = db
+        self.agent = AgentManager(strategy="md", provider=provider)
+        self.embedder = EmbeddingManager(provider=embedding_provider)
+        self.cache = _get_embedding_cache()
+        self.embedded_sections = 0
+        self.reused_sections = 0
+
+    @traced("ResumeImprovementService.improve")
+    async def improve(
+            self,
+            resume_id: str,
+            job_id: str,
+            max_iterations: Optional[int] = None,
+            min_gain: Optional[float] = None,
+            time_budget: Optional[float] = None,
+    ) -> Dict:
+        """
+        Runs the improvement loop for a resume against a job.
+
+        The loop stops after ``max_iterations`` rewrites, when a rewrite gains less than
+        ``min_gain`` similarity (converged), or when ``time_budget`` seconds have passed.
+
+        Args:
+            resume_id: The ID of the resume to improve
+            job_id: The ID of the job to improve it towards
+            max_iterations: Maximum number of LLM rewrites
+            min_gain: Smallest similarity gain that counts as progress
+            time_budget: Seconds after which no new round is started
+
+        Returns:
+            The original and best similarity, the best resume text, one entry per round and
+            the reason the loop stopped
+
+        Raises:
+            ResumeNotFoundError: If the resume is not found
+            JobNotFoundError: If the job is not found
+        """
+        max_iterations = settings.IMPROVEMENT_MAX_ITERATIONS if max_iterations is None else max_iterations
+        min_gain = settings.IMPROVEMENT_MIN_GAIN if min_gain is None else min_gain
+        time_budget = settings.IMPROVEMENT_TIME_BUDGET if time_budget is None else time_budget
+        deadline = time.monotonic() + time_budget
+
+        resume_text, resume_keywords = await self._load_resume(resume_id)
+        job_text, job_keywords = await self._load_job(job_id)
+        job_vector = await self._job_vector(job_keywords or [], job_text)
+
+        best_text = resume_text
+        best_score = original_score = float(await self._resume_vector(resume_text) @ job_vector)
+        rounds: List[Dict] = []
+        stop_reason = "max_iterations"
+
+        for iteration in range(1, max_iterations + 1):
+            if time.monotonic() >= deadline:
+                stop_reason = "time_budget"
+                break
+            prompt = prompt_factory.get("resume_improvement").format(
+                raw_job_description=job_text,
+                extracted_job_keywords=", ".join(job_keywords or []),
+                raw_resume=best_text,
+                extracted_resume_keywords=", ".join(resume_keywords or []),
+                current_cosine_similarity=best_score,
+            )
+            try:
+                candidate = _strip_markdown_fence(await self.agent.run(prompt))
+            except Exception as e:
+                logger.error(f"Resume improvement round {iteration} failed: {e}")
+                stop_reason = "llm_error"
+                break
+            if not candidate:
+                stop_reason = "empty_rewrite"
+                break
+
+            embedded_before = self.embedded_sections
+            score = float(await self._resume_vector(candidate) @ job_vector)
+            gain = score - best_score
+            rounds.append({
+                "iteration": iteration,
+                "score": score,
+                "gain": gain,
+                "embedded_sections": self.embedded_sections - embedded_before,
+            })
+            if gain > 0:
+                best_text, best_score = candidate, score
+            if gain < min_gain:
+                stop_reason = "converged"
+                break
+
+        return {
+            "resume_id": resume_id,
+            "job_id": job_id,
+            "original_score": original_score,
+            "best_score": best_score,
+            "improved_resume": best_text,
+            "rounds": rounds,
+            "stop_reason": stop_reason,
+            "embedded_sections": self.embedded_sections,
+            "reused_sections": self.reused_sections,
+        }
+
+    async def _load_resume(self, resume_id: str) -> Tuple[str, Optional[List[str]]]:
+        row = (
+            await self.db.execute(
+                select(Resume.content, ProcessedResume.extracted_keywords)
+                .outerjoin(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+                .where(Resume.resume_id == resume_id)
+            )
+        ).one_or_none()
+        if row is None:
+            raise ResumeNotFoundError(resume_id=resume_id)
+        return row.content, row.extracted_keywords
+
+    async def _load_job(self, job_id: str) -> Tuple[str, Optional[List[str]]]:
+        row = (
+            await self.db.execute(
+                select(Job.content, ProcessedJob.extracted_keywords)
+                .outerjoin(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+                .where(Job.job_id == job_id)
+            )
+        ).one_or_none()
+        if row is None:
+            raise JobNotFoundError(job_id=job_id)
+        return row.content, row.extracted_keywords
+
+    async def _job_vector(self, job_keywords: List[str], job_text: str) -> np.ndarray:
+        """
+        Embedding of the job's keywords (its raw text if it has none), cached by content.
+        """
+        text = ", ".join(job_keywords) or job_text
+        key = _text_key(self.embedder.model, text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = normalize(await self.embedder.embed(text))
+            self.cache.set(key, vector)
+        return vector
+
+    async def _resume_vector(self, resume_text: str) -> np.ndarray:
+        """
+        Length-weighted mean of the section embeddings; only unseen sections are embedded.
+        """
+        sections = [s.text for s in split_sections(resume_text) if s.text.strip()] or [resume_text]
+        keys = [_text_key(self.embedder.model, text) for text in sections]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = await self.embedder.embed_many([sections[i] for i in missing])
+            for i, vector in zip(missing, embedded):
+                vectors[i] = normalize(vector)
+                self.cache.set(keys[i], vectors[i])
+        self.embedded_sections += len(missing)
+        self.reused_sections += len(sections) - len(missing)
+
+        weights = np.asarray([estimate_tokens(text) for text in sections], dtype=np.float32)
+        return normalize(weights @ np.vstack(vectors))
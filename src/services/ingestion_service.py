@@ -0,0 +1,356 @@
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from src.agent import Provider, EmbeddingProvider
+from src.core.tracing import record_error, start_trace
+from src.models import IngestionTask, TaskStatus, TaskKind, ProcessedResume, ProcessedJob
+from .resume_service import ResumeService
+from .job_service import JobService
+from .scoring_service import ScoringService
+from .document_converter import DocumentConverter
+from .exceptions import TaskNotFoundError, ResumeParsingError
+
+logger = logging.getLogger(__name__)
+
+
+# a newly processed resume or job is scored against the other side in a follow-up task
+_SCORE_AFTER = {
+    TaskKind.RESUME.value: TaskKind.SCORE_RESUME,
+    TaskKind.JOB.value: TaskKind.SCORE_JOB,
+}
+
+
+# where an upload task's structured output lands, to tell a finished upload from one whose
+# extraction failed
+_PROCESSED_ID_COLUMN = {
+    TaskKind.RESUME.value: ProcessedResume.resume_id,
+    TaskKind.JOB.value: ProcessedJob.job_id,
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class _ExtractionFailed(Exception):
+    """
+    An upload was stored but the LLM gave no valid structured output. Not retried: the
+    same prompt would get the same (single-flight shared or cached) answer.
+    """
+
+
+class TaskService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(
+            self, kind: TaskKind, payload: bytes, filename: Optional[str] = None
+    ) -> str:
+        """
+        Stores the raw upload as a queued ingestion task and returns its ID.
+        """
+        task_id = str(uuid.uuid4())
+        self.db.add(
+            IngestionTask(
+                task_id=task_id,
+                kind=kind.value,
+                status=TaskStatus.QUEUED.value,
+                payload=payload,
+                filename=filename,
+                attempts=0,
+                created_at=_now(),
+            )
+        )
+        await self.db.commit()
+        return task_id
+
+    async def enqueue_unique(self, kind: TaskKind, payloads: List[bytes]) -> int:
+        """
+        Enqueues one task per payload, skipping payloads already queued or running for
+        ``kind``. Returns the number of tasks enqueued.
+        """
+        pending = await self.db.execute(
+            select(IngestionTask.payload).where(
+                IngestionTask.kind == kind.value,
+                IngestionTask.status.in_([TaskStatus.QUEUED.value, TaskStatus.RUNNING.value]),
+            )
+        )
+        known = set(pending.scalars().all())
+        new = [payload for payload in dict.fromkeys(payloads) if payload not in known]
+        for payload in new:
+            self.db.add(
+                IngestionTask(
+                    task_id=str(uuid.uuid4()),
+                    kind=kind.value,
+                    status=TaskStatus.QUEUED.value,
+                    payload=payload,
+                    attempts=0,
+                    created_at=_now(),
+                )
+            )
+        await self.db.commit()
+        return len(new)
+
+    async def get_task(self, task_id: str) -> Dict:
+        """
+        Fetches the state of an ingestion task.
+
+        Raises:
+            TaskNotFoundError: If the task is not found
+        """
+        task = await self.db.get(IngestionTask, task_id)
+        if task is None:
+            raise TaskNotFoundError(task_id=task_id)
+
+        return {
+            "task_id": task.task_id,
+            "kind": task.kind,
+            "status": task.status,
+            "result_id": task.result_id,
+            "error": task.error,
+            "attempts": task.attempts,
+            "created_at": task.created_at.isoformat() if task.created_at else None,
+            "started_at": task.started_at.isoformat() if task.started_at else None,
+            "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+        }
+
+    async def claim_next(self) -> Optional[IngestionTask]:
+        """
+        Atomically moves the oldest queued task to running and returns it.
+
+        The claim is a conditional UPDATE, so concurrent workers (in any process) never
+        claim the same task; a worker that loses the race simply tries the next one.
+        """
+        for _ in range(5):
+            query = (
+                select(IngestionTask.task_id)
+                .where(IngestionTask.status == TaskStatus.QUEUED.value)
+                .order_by(IngestionTask.created_at)
+                .limit(1)
+            )
+            if self.db.bind.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            task_id = (await self.db.execute(query)).scalar()
+            if task_id is None:
+                await self.db.commit()
+                return None
+
+            result = await self.db.execute(
+                update(IngestionTask)
+                .where(
+                    IngestionTask.task_id == task_id,
+                    IngestionTask.status == TaskStatus.QUEUED.value,
+                )
+                .values(
+                    status=TaskStatus.RUNNING.value,
+                    started_at=_now(),
+                    attempts=IngestionTask.attempts + 1,
+                )
+            )
+            await self.db.commit()
+            if result.rowcount == 1:
+                return await self.db.get(IngestionTask, task_id, populate_existing=True)
+        return None
+
+    async def set_result_id(self, task_id: str, result_id: str) -> None:
+        """
+        Records the ID an upload task stores its resume or job under before it is stored,
+        so a retry of the task reuses the row instead of inserting another one.
+        """
+        await self.db.execute(
+            update(IngestionTask)
+            .where(IngestionTask.task_id == task_id)
+            .values(result_id=result_id)
+        )
+        await self.db.commit()
+
+    async def mark_done(self, task_id: str, result_id: str) -> None:
+        await self.db.execute(
+            update(IngestionTask)
+            .where(IngestionTask.task_id == task_id)
+            .values(
+                status=TaskStatus.DONE.value,
+                result_id=result_id,
+                error=None,
+                payload=None,
+                finished_at=_now(),
+            )
+        )
+        await self.db.commit()
+
+    async def mark_failed(self, task_id: str, error: str, retry: bool) -> None:
+        values = {"error": error}
+        if retry:
+            values.update(status=TaskStatus.QUEUED.value, started_at=None)
+        else:
+            values.update(status=TaskStatus.FAILED.value, finished_at=_now())
+        await self.db.execute(
+            update(IngestionTask).where(IngestionTask.task_id == task_id).values(**values)
+        )
+        await self.db.commit()
+
+    async def requeue_stale(self, older_than: timedelta) -> int:
+        """
+        Requeues tasks left running by a worker that died (e.g. across a restart).
+        """
+        result = await self.db.execute(
+            update(IngestionTask)
+            .where(
+                IngestionTask.status == TaskStatus.RUNNING.value,
+                IngestionTask.started_at < _now() - older_than,
+            )
+            .values(status=TaskStatus.QUEUED.value, started_at=None)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+
+class IngestionWorker:
+    """
+    Pool of asyncio consumers that drain the ``ingestion_tasks`` table: resume and job
+    uploads, and the scoring tasks each processed upload is followed by.
+
+    Consumers poll every ``poll_interval`` seconds and are woken immediately by ``notify``
+    when a task is enqueued in the same process.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            concurrency: int = 2,
+            poll_interval: float = 1.0,
+            max_attempts: int = 3,
+            stale_after: float = 900.0,
+            provider: Provider | None = None,
+            embedding_provider: EmbeddingProvider | None = None,
+            converter: DocumentConverter | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.stale_after = timedelta(seconds=stale_after)
+        self.provider = provider
+        self.embedding_provider = embedding_provider
+        self.converter = converter
+        self._wakeup = asyncio.Event()
+        self._consumers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        async with self.session_factory() as db:
+            requeued = await TaskService(db).requeue_stale(self.stale_after)
+        if requeued:
+            logger.info(f"Requeued {requeued} stale ingestion tasks")
+        self._consumers = [
+            asyncio.create_task(self._consume(), name=f"ingestion-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _consume(self) -> None:
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    task = await TaskService(db).claim_next()
+                if task is not None:
+                    await self._process(task)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion worker error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self, task: IngestionTask) -> None:
+        # traced under the task ID the upload returned, the request itself ended with the 202
+        with start_trace(task.task_id, f"ingestion.{task.kind}", attempt=task.attempts):
+            await self._process_task(task)
+
+    @staticmethod
+    async def _is_processed(db: AsyncSession, processed_column, item_id: str) -> bool:
+        found = await db.execute(select(processed_column).where(processed_column == item_id))
+        return found.first() is not None
+
+    async def _process_task(self, task: IngestionTask) -> None:
+        async with self.session_factory() as db:
+            processed_column = _PROCESSED_ID_COLUMN.get(task.kind)
+            result_id = task.result_id
+            if processed_column is not None and result_id is None:
+                result_id = str(uuid.uuid4())
+                await TaskService(db).set_result_id(task.task_id, result_id)
+            try:
+                if processed_column is not None and await self._is_processed(
+                        db, processed_column, result_id
+                ):
+                    logger.info(f"Ingestion task {task.task_id}: {result_id} already processed")
+                elif task.kind == TaskKind.RESUME.value:
+                    service = ResumeService(
+                        db,
+                        provider=self.provider,
+                        embedding_provider=self.embedding_provider,
+                        converter=self.converter,
+                    )
+                    await service.convert_and_store_resume(
+                        file_bytes=task.payload, resume_id=result_id
+                    )
+                elif task.kind == TaskKind.JOB.value:
+                    service = JobService(
+                        db,
+                        provider=self.provider,
+                        embedding_provider=self.embedding_provider,
+                    )
+                    await service.convert_and_store_job(
+                        task.payload.decode("utf-8"), job_id=result_id
+                    )
+                elif task.kind == TaskKind.SCORE_RESUME.value:
+                    result_id = task.payload.decode("utf-8")
+                    await ScoringService(db).score_resume(result_id)
+                else:
+                    result_id = task.payload.decode("utf-8")
+                    await ScoringService(db).score_job(result_id)
+                if processed_column is not None and not await self._is_processed(
+                        db, processed_column, result_id
+                ):
+                    raise _ExtractionFailed(
+                        f"Structured extraction of {task.kind} {result_id} failed"
+                    )
+            except Exception as e:
+                record_error(e)
+                await db.rollback()
+                retry = (
+                    task.attempts < self.max_attempts
+                    and not isinstance(e, (ResumeParsingError, AssertionError, _ExtractionFailed))
+                )
+                logger.error(
+                    f"Ingestion task {task.task_id} failed (attempt {task.attempts}): {e}"
+                )
+                await TaskService(db).mark_failed(task.task_id, str(e), retry=retry)
+                return
+
+            await TaskService(db).mark_done(task.task_id, result_id)
+            logger.info(f"Ingestion task {task.task_id} done: {task.kind} {result_id}")
+
+            score_kind = _SCORE_AFTER.get(task.kind)
+            if score_kind is not None:
+                await TaskService(db).enqueue(score_kind, result_id.encode("utf-8"))
+                self.notify()
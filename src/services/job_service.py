@@ -1,51 +1,91 @@
 import uuid
-import json
 import logging
-from typing import List, Dict, Any, Optional
+import numpy as np
+from typing import AsyncIterator, List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import contains_eager, joinedload
 from pydantic import ValidationError
 
-from src.agent import AgentManager
+from src.core.metrics import pipeline, stage
+from src.core.tracing import traced
+from src.agent import AgentManager, EmbeddingManager, Provider, EmbeddingProvider
 from src.models import Job, ProcessedJob, Resume
 from src.schemas.json import json_schema_factory
 from src.schemas.pydantic import StructuredJobModel
 from src.prompts import prompt_factory
+from src.retrieval import normalize, get_embedding_store, JOB_EMBEDDINGS
+from .extraction_cache import ExtractionCache, compute_schema_version
+from .prompt_builder import build_prompt, prompt_fingerprint
+from .rule_extraction import RULE_EXTRACTION_REVISION, pre_extract_job, merge_prefilled
+from .exceptions import JobNotFoundError
+from .response_cache import CachedResponse, get_response_cache, JOB_RESPONSES
 
 logger = logging.getLogger(__name__)
 
+_SCHEMA_VERSION = compute_schema_version(
+    prompt_factory.get("structured_job"),
+    json_schema_factory.get("structured_job"),
+    StructuredJobModel,
+    prompt_fingerprint("structured_job"),
+    f"rules:{RULE_EXTRACTION_REVISION}",
+)
+
 
 class JobService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+            self,
+            db: AsyncSession,
+            provider: Provider | None = None,
+            embedding_provider: EmbeddingProvider | None = None,
+    ):
         self.db = db
-        self.agent = AgentManager()
+        self.agent = AgentManager(provider=provider)
+        self.embedder = EmbeddingManager(provider=embedding_provider)
+        self.cache = ExtractionCache(db)
 
-    async def convert_and_store_job(self, job_description: str):
+    @traced("JobService.convert_and_store_job")
+    async def convert_and_store_job(self, job_description: str, job_id: Optional[str] = None):
         """
             Stores job data in the database and returns a list of job IDs.
+
+            A job already stored under ``job_id`` (e.g. by an earlier attempt of the same
+            upload) is reused rather than stored again.
         """
-        job_id = str(uuid.uuid4())
-        job = Job(
-            job_id=job_id,
-            content=job_description,
-        )
-        self.db.add(job)
+        with pipeline("job"), stage("total"):
+            job = None
+            if job_id is not None:
+                job = (
+                    await self.db.execute(select(Job).where(Job.job_id == job_id))
+                ).scalar()
+            if job is None:
+                job_id = job_id or str(uuid.uuid4())
+                job = Job(
+                    job_id=job_id,
+                    content=job_description,
+                )
 
-        await self._extract_and_store_structured_job(
-            job_id=job_id, job_description_text=job_description
-        )
-        logger.info(f"Job ID: {job_id}")
+            await self._extract_and_store_structured_job(
+                job=job, job_description_text=job_description
+            )
+            logger.info(f"Job ID: {job_id}")
 
-        await self.db.commit()
+            with stage("db_commit"):
+                await self.db.commit()
         return job_id
 
     async def _extract_and_store_structured_job(
-            self, job_id, job_description_text: str
+            self, job: Job, job_description_text: str
     ):
         """
         extract and store structured job data in the database
+
+        ``job`` is added to the session only after the LLM call: flushing it earlier would
+        hold a write transaction (on SQLite, the database lock) open for the whole call.
         """
+        job_id = job.job_id
         structured_job = await self._extract_structured_json(job_description_text)
+        self.db.add(job)
         if not structured_job:
             logger.info("Structured job extraction failed.")
             return None
@@ -53,67 +93,114 @@ class JobService:
         processed_job = ProcessedJob(
             job_id=job_id,
             job_title=structured_job.get("job_title"),
-            company_profile=json.dumps(structured_job.get("company_profile"))
-            if structured_job.get("company_profile")
-            else None,
-            location=json.dumps(structured_job.get("location"))
-            if structured_job.get("location")
-            else None,
+            company_profile=structured_job.get("company_profile") or None,
+            location=structured_job.get("location") or None,
             date_posted=structured_job.get("date_posted"),
             employment_type=structured_job.get("employment_type"),
             job_summary=structured_job.get("job_summary"),
-            key_responsibilities=json.dumps(
-                {"key_responsibilities": structured_job.get("key_responsibilities", [])}
-            )
-            if structured_job.get("key_responsibilities")
-            else None,
-            qualifications=json.dumps(structured_job.get("qualifications", []))
-            if structured_job.get("qualifications")
-            else None,
-            compensation_and_benfits=json.dumps(
-                structured_job.get("compensation_and_benfits", [])
-            )
-            if structured_job.get("compensation_and_benfits")
-            else None,
-            application_info=json.dumps(structured_job.get("application_info", []))
-            if structured_job.get("application_info")
-            else None,
-            extracted_keywords=json.dumps(
-                {"extracted_keywords": structured_job.get("extracted_keywords", [])}
-            )
-            if structured_job.get("extracted_keywords")
-            else None,
+            key_responsibilities=structured_job.get("key_responsibilities") or None,
+            qualifications=structured_job.get("qualifications") or None,
+            compensation_and_benfits=structured_job.get("compensation_and_benefits") or None,
+            application_info=structured_job.get("application_info") or None,
+            extracted_keywords=structured_job.get("extracted_keywords") or None,
         )
+        with stage("embedding"):
+            embedding = await self._embed_job(
+                structured_job.get("extracted_keywords") or [], job_description_text
+            )
+        if embedding is not None:
+            processed_job.embedding = embedding.tobytes()
 
         self.db.add(processed_job)
-        await self.db.flush()
-        await self.db.commit()
+        with stage("db_commit"):
+            await self.db.flush()
+            await self.db.commit()
+
+        get_response_cache(JOB_RESPONSES).invalidate(job_id)
+        if embedding is not None:
+            get_embedding_store(JOB_EMBEDDINGS).add(job_id, embedding)
 
         return job_id
 
+    async def _embed_job(
+            self, extracted_keywords: List[str], job_description_text: str
+    ) -> np.ndarray | None:
+        """
+        Embeds the job keywords (falling back to the full description) for matching.
+        """
+        text = ", ".join(extracted_keywords) or job_description_text
+        try:
+            embedding = await self.embedder.embed(text)
+        except RuntimeError as e:
+            logger.warning(f"Job embedding failed: {e}")
+            return None
+        return normalize(embedding)
+
     async def _extract_structured_json(
             self, job_description_text: str
     ) -> Dict[str, Any] | None:
         """
         Uses the AgentManager+JSONWrapper to ask the LLM to
         return the data in exact JSON schema we need.
+
+        The apply link and contact email are found by ``pre_extract_job`` instead, left out
+        of the schema the LLM fills and merged into its output before validation.
         """
-        prompt_template = prompt_factory.get("structured_job")
-        prompt = prompt_template.format(
-            json.dumps(json_schema_factory.get("structured_job"), indent=2),
-            job_description_text,
+        with stage("cache_lookup"):
+            cached_output = await self.cache.get(
+                "structured_job", _SCHEMA_VERSION, self.agent.model, job_description_text
+            )
+        if cached_output is not None:
+            return cached_output
+
+        schema = json_schema_factory.get("structured_job")
+        prefilled = pre_extract_job(job_description_text, schema)
+        with stage("prompt_build"):
+            built = build_prompt("structured_job", prefilled.schema, job_description_text, model=self.agent.model)
+        logger.debug(f"Structured Job Prompt: {built.prompt}")
+        raw_output = merge_prefilled(
+            await self.agent.run(prompt=built.prompt), prefilled.values, schema
         )
-        logger.info(f"Structured Job Prompt: {prompt}")
-        raw_output = await self.agent.run(prompt=prompt)
 
         try:
-            structured_job: StructuredJobModel = StructuredJobModel.model_validate(
-                raw_output
-            )
+            with stage("validation"):
+                structured_job: StructuredJobModel = StructuredJobModel.model_validate(
+                    raw_output
+                )
         except ValidationError as e:
             logger.info(f"Validation error: {e}")
             return None
-        return structured_job.model_dump(mode="json")
+        output = structured_job.model_dump(mode="json")
+        await self.cache.set(
+            "structured_job", _SCHEMA_VERSION, self.agent.model, job_description_text, output
+        )
+        return output
+
+    @traced("JobService.get_job_response")
+    async def get_job_response(self, job_id: str) -> CachedResponse:
+        """
+        Returns the serialized ``get_job_with_processed_data`` payload, from the response
+        cache when the stored row has not changed since it was rendered.
+
+        Raises:
+            JobNotFoundError: If the job is not found
+        """
+        result = await self.db.execute(
+            select(Job.id, ProcessedJob.processed_at)
+            .outerjoin(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+            .where(Job.job_id == job_id)
+        )
+        row = result.first()
+        if row is None:
+            raise JobNotFoundError(job_id=job_id)
+        version = row.processed_at.isoformat() if row.processed_at else "unprocessed"
+
+        cache = get_response_cache(JOB_RESPONSES)
+        cached = cache.get(job_id, version)
+        if cached is not None:
+            return cached
+        job_data = await self.get_job_with_processed_data(job_id)
+        return cache.set(job_id, version, job_data)
 
     async def get_job_with_processed_data(self, job_id: str) -> Optional[Dict]:
         """
@@ -128,46 +215,72 @@ class JobService:
         Raises:
             JobNotFoundError: If the job is not found
         """
-        job_query = select(Job).where(Job.job_id == job_id)
+        job_query = (
+            select(Job)
+            .options(joinedload(Job.raw_job_association))
+            .where(Job.job_id == job_id)
+        )
         job_result = await self.db.execute(job_query)
         job = job_result.scalars().first()
 
         if not job:
-            raise "Job not found."
+            raise JobNotFoundError(job_id=job_id)
+
+        return self.serialize_job(job)
 
-        processed_query = select(ProcessedJob).where(ProcessedJob.job_id == job_id)
-        processed_result = await self.db.execute(processed_query)
-        processed_job = processed_result.scalars().first()
+    async def stream_jobs_with_processed_data(self, job_ids: List[str]) -> AsyncIterator[Dict]:
+        """
+        Streams combined job data for many jobs, loaded with one joined query.
 
-        combined_data = {
+        Args:
+            job_ids: The IDs of the jobs to retrieve
+
+        Returns:
+            An async iterator of combined data in database order; unknown IDs are skipped
+        """
+        job_query = (
+            select(Job)
+            .outerjoin(Job.raw_job_association)
+            .options(contains_eager(Job.raw_job_association))
+            .where(Job.job_id.in_(job_ids))
+            .execution_options(yield_per=100)
+        )
+        result = await self.db.stream(job_query)
+        async for job in result.scalars():
+            yield self.serialize_job(job)
+
+    @classmethod
+    def serialize_job(cls, job: Job) -> Dict:
+        """
+        Converts a Job row, with its processed row loaded, into the API's combined dict.
+        """
+        processed_job = job.raw_job_association
+        return {
             "job_id": job.job_id,
             "raw_job": {
                 "id": job.id,
                 "content": job.content,
                 "created_at": job.created_at.isoformat() if job.created_at else None,
             },
-            "processed_job": None
+            "processed_job": cls.serialize_processed_job(processed_job) if processed_job else None,
         }
 
-        if processed_job:
-            combined_data["processed_job"] = {
-                "job_title": processed_job.job_title,
-                "company_profile": json.loads(processed_job.company_profile) if processed_job.company_profile else None,
-                "location": json.loads(processed_job.location) if processed_job.location else None,
-                "date_posted": processed_job.date_posted,
-                "employment_type": processed_job.employment_type,
-                "job_summary": processed_job.job_summary,
-                "key_responsibilities": json.loads(processed_job.key_responsibilities).get("key_responsibilities",
-                                                                                           []) if processed_job.key_responsibilities else None,
-                "qualifications": json.loads(processed_job.qualifications).get("qualifications",
-                                                                               []) if processed_job.qualifications else None,
-                "compensation_and_benfits": json.loads(processed_job.compensation_and_benfits).get(
-                    "compensation_and_benfits", []) if processed_job.compensation_and_benfits else None,
-                "application_info": json.loads(processed_job.application_info).get("application_info",
-                                                                                   []) if processed_job.application_info else None,
-                "extracted_keywords": json.loads(processed_job.extracted_keywords).get("extracted_keywords",
-                                                                                       []) if processed_job.extracted_keywords else None,
-                "processed_at": processed_job.processed_at.isoformat() if processed_job.processed_at else None,
-            }
-
-        return combined_data
+    @staticmethod
+    def serialize_processed_job(processed_job: ProcessedJob) -> Dict:
+        """
+        Converts a ProcessedJob row into the JSON-ready dict returned by the API.
+        """
+        return {
+            "job_title": processed_job.job_title,
+            "company_profile": processed_job.company_profile,
+            "location": processed_job.location,
+            "date_posted": processed_job.date_posted,
+            "employment_type": processed_job.employment_type,
+            "job_summary": processed_job.job_summary,
+            "key_responsibilities": processed_job.key_responsibilities,
+            "qualifications": processed_job.qualifications,
+            "compensation_and_benfits": processed_job.compensation_and_benfits,
+            "application_info": processed_job.application_info,
+            "extracted_keywords": processed_job.extracted_keywords,
+            "processed_at": processed_job.processed_at.isoformat() if processed_job.processed_at else None,
+        }
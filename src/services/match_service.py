@@ -0,0 +1,273 @@
+import logging
+from datetime import timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.core.tracing import traced
+from src.models import ProcessedJob, ProcessedResume, Resume
+from src.retrieval import (
+    from_embedding_bytes,
+    get_embedding_store,
+    get_vector_search,
+    get_keyword_index,
+    get_bm25_index,
+    reciprocal_rank_fusion,
+    RESUME_EMBEDDINGS,
+    JOB_EMBEDDINGS,
+)
+from .resume_service import ResumeService
+from .exceptions import JobNotFoundError, EmbeddingNotFoundError
+
+logger = logging.getLogger(__name__)
+
+_SYNC_BATCH_SIZE = 1000
+_BM25_SYNC_LOOKBACK = timedelta(seconds=60)
+# covers the gap between stamping processed_at and the commit, and clock skew between workers
+_KEYWORD_SYNC_LOOKBACK = timedelta(seconds=60)
+# fused rankings draw this many candidates from each ranker before fusing
+_FUSION_DEPTH_FACTOR = 5
+_FUSION_MIN_DEPTH = 50
+
+
+async def sync_embedding_stores(db: AsyncSession) -> None:
+    """
+    Appends embeddings stored in the database but missing from the on-disk stores,
+    e.g. on first start or after the store directory was wiped, then starts bringing the
+    resume vector index up to date in the background.
+    """
+    for model, id_column, store_name in (
+            (ProcessedResume, ProcessedResume.resume_id, RESUME_EMBEDDINGS),
+            (ProcessedJob, ProcessedJob.job_id, JOB_EMBEDDINGS),
+    ):
+        store = get_embedding_store(store_name)
+        store.refresh()
+        ids_result = await db.execute(select(id_column).where(model.embedding.is_not(None)))
+        missing = [item_id for item_id in ids_result.scalars().all() if item_id not in store]
+
+        for start in range(0, len(missing), _SYNC_BATCH_SIZE):
+            rows = (
+                await db.execute(
+                    select(id_column, model.embedding).where(
+                        id_column.in_(missing[start:start + _SYNC_BATCH_SIZE])
+                    )
+                )
+            ).all()
+            store.add_many(
+                [row[0] for row in rows],
+                np.vstack([from_embedding_bytes(row[1]) for row in rows]),
+            )
+        if missing:
+            logger.info(f"Synced {len(missing)} embeddings into store '{store_name}'")
+    get_vector_search(RESUME_EMBEDDINGS).start_sync()
+
+
+async def sync_keyword_index(db: AsyncSession) -> None:
+    """
+    Indexes processed resumes written since the last sync, by this or any other worker.
+
+    The first call loads every processed resume.
+    """
+    index = get_keyword_index()
+    query = (
+        select(
+            Resume.id,
+            ProcessedResume.resume_id,
+            ProcessedResume.extracted_keywords,
+            ProcessedResume.skills,
+            ProcessedResume.processed_at,
+        )
+        .join(Resume, Resume.resume_id == ProcessedResume.resume_id)
+        .execution_options(yield_per=_SYNC_BATCH_SIZE)
+    )
+    if index.watermark is not None:
+        # rows are stamped just before their commit, but another worker's row stamped
+        # earlier may still commit after one we have seen, so re-read a short window;
+        # re-adding an indexed resume replaces its postings
+        query = query.where(
+            ProcessedResume.processed_at >= index.watermark - _KEYWORD_SYNC_LOOKBACK
+        )
+
+    watermark = index.watermark
+    result = await db.stream(query)
+    async for row in result:
+        index.add(row.id, row.resume_id, ResumeService.index_keywords(row.extracted_keywords, row.skills))
+        if watermark is None or row.processed_at > watermark:
+            watermark = row.processed_at
+    index.watermark = watermark
+
+
+async def sync_bm25_index(db: AsyncSession) -> None:
+    """
+    Adds raw resumes stored since the last sync to the BM25 index; the first call loads all.
+    """
+    index = get_bm25_index()
+    query = (
+        select(Resume.resume_id, Resume.content, Resume.created_at)
+        .order_by(Resume.created_at)
+        .execution_options(yield_per=_SYNC_BATCH_SIZE)
+    )
+    if index.watermark is not None:
+        # rows are stamped on insert but may commit later, so re-read a short window
+        query = query.where(Resume.created_at >= index.watermark - _BM25_SYNC_LOOKBACK)
+
+    watermark = index.watermark
+    result = await db.stream(query)
+    async for row in result:
+        index.add(row.resume_id, row.content)
+        if watermark is None or row.created_at > watermark:
+            watermark = row.created_at
+    index.watermark = watermark
+
+
+class MatchService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @traced("MatchService.match_resumes_for_job")
+    async def match_resumes_for_job(
+            self,
+            job_id: str,
+            top_k: int = 10,
+            min_shared_keywords: int = 0,
+            lexical_fusion: bool = False,
+    ) -> List[Dict]:
+        """
+        Ranks processed resumes against a processed job by cosine similarity of their embeddings.
+
+        Args:
+            job_id: The ID of the job to match resumes against
+            top_k: Maximum number of resumes to return
+            min_shared_keywords: If positive, only score resumes sharing at least this many
+                keywords with the job, looked up in the keyword index
+            lexical_fusion: Fuse the cosine ranking with a BM25 ranking of the raw resumes
+                against the job title and keywords (reciprocal rank fusion)
+
+        Returns:
+            The top_k resumes, best first, each with its score and processed data; fused
+            results also carry the cosine and BM25 scores they were ranked from
+
+        Raises:
+            JobNotFoundError: If the processed job is not found
+            EmbeddingNotFoundError: If the job has no embedding
+        """
+        job_store = get_embedding_store(JOB_EMBEDDINGS)
+        job_store.refresh()
+        job_embedding = job_store.get(job_id)
+        if job_embedding is None:
+            job_exists = await self.db.execute(
+                select(ProcessedJob.job_id).where(ProcessedJob.job_id == job_id)
+            )
+            if job_exists.first() is None:
+                raise JobNotFoundError(job_id=job_id)
+            raise EmbeddingNotFoundError(
+                message=f"Job with ID {job_id} has no embedding to match against."
+            )
+
+        job_title, job_keywords = None, []
+        if min_shared_keywords > 0 or lexical_fusion:
+            job_result = await self.db.execute(
+                select(ProcessedJob.job_title, ProcessedJob.extracted_keywords).where(
+                    ProcessedJob.job_id == job_id
+                )
+            )
+            job_title, job_keywords = job_result.one_or_none() or (None, None)
+            job_keywords = job_keywords or []
+
+        resume_store = get_embedding_store(RESUME_EMBEDDINGS)
+        resume_store.refresh()
+        mask = resume_store.live_mask
+        candidates = None
+        if min_shared_keywords > 0:
+            candidates = await self._keyword_candidates(job_keywords, min_shared_keywords)
+            if not candidates:
+                return []
+            # live_mask is None when nothing is tombstoned; mask_for only selects live rows
+            mask = resume_store.mask_for(candidates)
+
+        depth = max(top_k * _FUSION_DEPTH_FACTOR, _FUSION_MIN_DEPTH) if lexical_fusion else top_k
+        indices, scores = get_vector_search(RESUME_EMBEDDINGS).search(job_embedding, depth, mask=mask)
+        cosine_scores = {
+            resume_store.row_ids[i]: float(score) for i, score in zip(indices, scores)
+        }
+
+        if lexical_fusion:
+            await sync_bm25_index(self.db)
+            lexical_query = " ".join([job_title or "", *job_keywords])
+            bm25_scores = dict(
+                get_bm25_index().search(lexical_query, depth, candidates=candidates)
+            )
+            ranked = reciprocal_rank_fusion([list(cosine_scores), list(bm25_scores)])
+        else:
+            ranked = list(cosine_scores.items())
+        if not ranked:
+            return []
+
+        # drop resumes without processed data before cutting to top_k, not after
+        processed_ids = set(
+            (
+                await self.db.execute(
+                    select(ProcessedResume.resume_id).where(
+                        ProcessedResume.resume_id.in_([resume_id for resume_id, _ in ranked])
+                    )
+                )
+            ).scalars().all()
+        )
+        ranked = [item for item in ranked if item[0] in processed_ids][:top_k]
+        if not ranked:
+            return []
+
+        ranked_ids = [resume_id for resume_id, _ in ranked]
+        processed_result = await self.db.execute(
+            select(ProcessedResume).where(ProcessedResume.resume_id.in_(ranked_ids))
+        )
+        processed_by_id = {
+            processed.resume_id: processed
+            for processed in processed_result.scalars().all()
+        }
+
+        matches = []
+        for resume_id, score in ranked:
+            if resume_id not in processed_by_id:
+                continue
+            match = {
+                "resume_id": resume_id,
+                "score": float(score),
+                "processed_resume": ResumeService.serialize_processed_resume(
+                    processed_by_id[resume_id]
+                ),
+            }
+            if lexical_fusion:
+                match["cosine_score"] = cosine_scores.get(resume_id)
+                match["bm25_score"] = bm25_scores.get(resume_id)
+            matches.append(match)
+        return matches
+
+    @traced("MatchService.lexical_search")
+    async def lexical_search(self, query: str, top_k: int = 10) -> List[Dict]:
+        """
+        Ranks raw resumes against a free-text query with BM25, without any embedding call.
+
+        Args:
+            query: The search text
+            top_k: Maximum number of resumes to return
+
+        Returns:
+            The top_k resumes, best first, each with its BM25 score
+        """
+        await sync_bm25_index(self.db)
+        return [
+            {"resume_id": resume_id, "score": score}
+            for resume_id, score in get_bm25_index().search(query, top_k)
+        ]
+
+    async def _keyword_candidates(self, keywords: List[str], min_shared_keywords: int) -> List[str]:
+        """
+        IDs of resumes sharing at least ``min_shared_keywords`` of ``keywords``.
+        """
+        await sync_keyword_index(self.db)
+        index = get_keyword_index()
+        row_ids, _ = index.at_least(keywords, min_shared_keywords)
+        return index.keys(row_ids)
@@ -0,0 +1,221 @@
+import re
+import json
+import math
+import logging
+from collections import Counter
+from typing import Any, List, NamedTuple
+
+from src.core.config import settings
+from src.prompts import prompt_factory
+from src.agent.tokens import count_tokens, get_token_ledger
+from .resume_sections import split_sections
+
+logger = logging.getLogger(__name__)
+
+# bump whenever compaction or truncation changes what the LLM sees for the same document
+PROMPT_BUILDER_REVISION = 1
+
+_ELISION = "[...]"
+_CONTROL_CHARS = re.compile("[\x00-\x08\x0b\x0e-\x1f\x7f\u200b-\u200d\ufeff]")
+_INLINE_SPACE = re.compile("[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$", re.IGNORECASE)
+# header/footer candidates are the first and last few lines of each page
+_PAGE_EDGE_LINES = 2
+
+
+class BuiltPrompt(NamedTuple):
+    prompt: str
+    prompt_tokens: int
+    document_tokens: int
+    original_document_tokens: int
+    truncated: bool
+
+
+def minify_schema(schema: Any) -> str:
+    """
+    Serializes a JSON schema without indentation or spaces after separators.
+    """
+    return json.dumps(schema, separators=(",", ":"), ensure_ascii=False)
+
+
+def token_budget(template_name: str) -> int:
+    """
+    Maximum input tokens for a prompt built from ``template_name``.
+    """
+    return settings.PROMPT_TOKEN_BUDGETS.get(template_name, settings.PROMPT_DEFAULT_TOKEN_BUDGET)
+
+
+def prompt_fingerprint(template_name: str) -> str:
+    """
+    Identifies how documents are compacted and truncated for ``template_name``; part of the
+    extraction cache's schema version.
+    """
+    return f"{PROMPT_BUILDER_REVISION}:{token_budget(template_name)}"
+
+
+def _clean_line(line: str) -> str:
+    stripped = line.lstrip(" \t\u00a0")
+    indent = min(len(line) - len(stripped), 4)
+    return " " * indent + _INLINE_SPACE.sub(" ", stripped).rstrip()
+
+
+def _edge_key(line: str) -> str:
+    # "Page 2 of 5" and "Page 3 of 5" are the same footer
+    return re.sub(r"\d+", "#", line.strip().lower())
+
+
+def _edge_indices(lines: List[str]) -> List[int]:
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(filled[:_PAGE_EDGE_LINES] + filled[-_PAGE_EDGE_LINES:]))
+
+
+def compact_markdown(text: str) -> str:
+    """
+    Strips what MarkItDown output spends tokens on without carrying content.
+
+    Control and zero-width characters are removed, runs of spaces and tabs collapse to one
+    (indentation is capped at four spaces), blank lines collapse to one, and at the edges
+    of each page (pages are separated by form feeds) page numbers are dropped, as are all
+    but the first copy of lines repeating on at least half the pages, i.e. running headers
+    and footers.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL_CHARS.sub("", text)
+    pages = [[_clean_line(line) for line in page.split("\n")] for page in text.split("\f")]
+
+    filled_pages = sum(1 for lines in pages if any(lines))
+    if filled_pages > 1:
+        seen = Counter(
+            key
+            for lines in pages
+            for key in {_edge_key(lines[i]) for i in _edge_indices(lines)}
+        )
+        threshold = max(2, math.ceil(filled_pages / 2))
+        repeated = {key for key, count in seen.items() if count >= threshold}
+        kept = set()
+        for lines in pages:
+            for i in _edge_indices(lines):
+                stripped = lines[i].strip()
+                key = _edge_key(stripped)
+                if _PAGE_NUMBER.match(stripped):
+                    lines[i] = ""
+                elif key in repeated:
+                    # the first occurrence stays, it may be the candidate's name or contact line
+                    if key in kept:
+                        lines[i] = ""
+                    kept.add(key)
+
+    text = "\n".join("\n".join(lines) for lines in pages)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def _head(text: str, max_tokens: int, model: str | None) -> str:
+    """
+    Longest prefix of ``text`` that fits ``max_tokens``, cut at a line break where possible.
+    """
+    if max_tokens <= 0:
+        return ""
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = count_tokens(line + "\n", model)
+        if used + cost > max_tokens:
+            if not kept:
+                # a single oversized line: cut it by characters
+                low, high = 0, len(line)
+                while low < high:
+                    mid = (low + high + 1) // 2
+                    if count_tokens(line[:mid], model) <= max_tokens:
+                        low = mid
+                    else:
+                        high = mid - 1
+                kept.append(line[:low])
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def fit_to_budget(text: str, max_tokens: int, model: str | None = None) -> str:
+    """
+    Shortens ``text`` to at most ``max_tokens`` tokens, keeping the start of every section.
+
+    The budget is shared between sections (see ``split_sections``) by water-filling:
+    sections smaller than an equal share are kept whole and the remainder is split evenly
+    between the larger ones, each of which keeps its heading and first lines followed by
+    an elision marker. A long experience section therefore cannot push education or
+    skills out of the prompt.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    sections = [section.text for section in split_sections(text)] or [text]
+    costs = [count_tokens(section, model) + 1 for section in sections]
+    shares = [0] * len(sections)
+    remaining = max_tokens
+    for position, i in enumerate(sorted(range(len(sections)), key=costs.__getitem__)):
+        shares[i] = min(costs[i], remaining // (len(sections) - position))
+        remaining -= shares[i]
+
+    marker_cost = count_tokens(_ELISION + "\n", model)
+    parts = []
+    for section, cost, share in zip(sections, costs, shares):
+        if share >= cost:
+            parts.append(section)
+        elif share > marker_cost:
+            parts.append(_head(section, share - marker_cost - 1, model) + "\n" + _ELISION)
+    fitted = "\n".join(part for part in parts if part)
+    # per-line counts are not exactly additive; cut whatever the estimate missed
+    return fitted if count_tokens(fitted, model) <= max_tokens else _head(fitted, max_tokens, model)
+
+
+def build_prompt(
+        template_name: str,
+        schema: Any,
+        document: str,
+        model: str | None = None,
+        max_tokens: int | None = None,
+) -> BuiltPrompt:
+    """
+    Renders an extraction prompt (``{0}`` schema, ``{1}`` document) within a token budget.
+
+    The schema is minified and the document compacted; if the prompt would still exceed
+    ``max_tokens`` (default: the template's budget from settings), the document is
+    shortened section by section. Token counts are logged and added to the token ledger
+    under ``prompt.{template_name}``.
+
+    Raises:
+        ValueError: If the template and schema alone exceed the budget
+    """
+    template = prompt_factory.get(template_name)
+    max_tokens = max_tokens or token_budget(template_name)
+    schema_text = minify_schema(schema)
+    overhead = count_tokens(template.format(schema_text, ""), model)
+    available = max_tokens - overhead
+    if available <= 0:
+        raise ValueError(
+            f"Prompt '{template_name}' needs {overhead} tokens before the document, "
+            f"the budget is {max_tokens}"
+        )
+
+    original_tokens = count_tokens(document, model)
+    document = compact_markdown(document)
+    document_tokens = count_tokens(document, model)
+    truncated = document_tokens > available
+    if truncated:
+        document = fit_to_budget(document, available, model)
+        document_tokens = count_tokens(document, model)
+
+    prompt = template.format(schema_text, document)
+    prompt_tokens = count_tokens(prompt, model)
+    get_token_ledger().record(
+        f"prompt.{template_name}",
+        prompt_tokens=prompt_tokens,
+        document_tokens=document_tokens,
+        original_document_tokens=original_tokens,
+        truncated=int(truncated),
+    )
+    logger.info(
+        f"Prompt '{template_name}': {prompt_tokens} tokens, document {original_tokens} -> "
+        f"{document_tokens} tokens{' (truncated)' if truncated else ''}"
+    )
+    return BuiltPrompt(prompt, prompt_tokens, document_tokens, original_tokens, truncated)
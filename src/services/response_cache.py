@@ -0,0 +1,106 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
+
+from src.core.config import settings
+from src.core.metrics import register_cache
+
+
+class CachedResponse(NamedTuple):
+    version: str
+    body: bytes
+    etag: str
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Serializes ``content`` exactly as FastAPI's ``JSONResponse`` would.
+    """
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU of serialized API payloads, one entry per item id.
+
+    Each entry remembers the row version it was rendered from (``processed_at`` for
+    processed rows), so a lookup with a newer version misses even when the write happened
+    in another worker; ``invalidate`` frees the entry early for writes made in this process.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, version: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, version: str, content: Any) -> CachedResponse:
+        """
+        Serializes ``content`` and caches it; returns the entry even if it is too large to keep.
+        """
+        body = dump_json(content)
+        entry = CachedResponse(
+            version=version, body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        )
+        if len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            self._discard(key)
+            self._data[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted.body)
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+RESUME_RESPONSES = "resumes"
+JOB_RESPONSES = "jobs"
+
+
+@lru_cache(maxsize=None)
+def get_response_cache(name: str) -> ResponseCache:
+    """Create (or return) the process-wide response cache for ``name`` (``resumes`` or ``jobs``)."""
+    if name not in (RESUME_RESPONSES, JOB_RESPONSES):
+        raise KeyError(f"Response cache '{name}' not found. Available: resumes, jobs")
+    cache = ResponseCache(max_bytes=settings.RESPONSE_CACHE_MAX_BYTES)
+    register_cache(f"{name}_responses", cache)
+    return cache
@@ -0,0 +1,76 @@
+import re
+from typing import List, NamedTuple
+
+# section titles resumes commonly use, matched as a whole line (an optional trailing colon)
+_KNOWN_TITLES = re.compile(
+    r"^(?:summary|profile|professional summary|about me|objective|career objective|"
+    r"experience|work experience|professional experience|employment(?: history)?|"
+    r"projects?|personal projects|education|academic background|skills|technical skills|"
+    r"core competencies|certifications?|awards?|achievements|honors(?: and awards)?|"
+    r"publications|research(?: experience)?|languages|interests|volunteer(?:ing| experience)?|"
+    r"contact|contact information|references)\s*:?$",
+    re.IGNORECASE,
+)
+_MARKDOWN_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+
+
+class Section(NamedTuple):
+    title: str
+    text: str
+
+
+def _heading_title(line: str) -> str | None:
+    stripped = line.strip().strip("*_").strip()
+    match = _MARKDOWN_HEADING.match(line)
+    if match:
+        return match.group(2).strip("*_ ").strip()
+    if _KNOWN_TITLES.match(stripped):
+        return stripped.rstrip(":").strip()
+    # MarkItDown renders PDF headings as plain lines; short all-caps lines are headings too
+    letters = [c for c in stripped if c.isalpha()]
+    if (
+            len(letters) >= 3
+            and len(stripped.split()) <= 4
+            and not any(c in stripped for c in ",|;")
+            and stripped.upper() == stripped
+    ):
+        return stripped.rstrip(":").strip()
+    return None
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """
+    Splits a resume into sections at Markdown headings, well-known section titles and short
+    all-caps lines. Text before the first heading becomes a section titled "".
+
+    Joining the section texts with newlines reproduces the input lines, so sections can be
+    edited independently and stitched back together.
+    """
+    sections: List[Section] = []
+    title, lines = "", []
+    for line in markdown.splitlines():
+        heading = _heading_title(line)
+        if heading is not None:
+            if title or any(l.strip() for l in lines):
+                sections.append(Section(title, "\n".join(lines)))
+                lines = []
+            title = heading
+        lines.append(line)
+    if title or any(l.strip() for l in lines):
+        sections.append(Section(title, "\n".join(lines)))
+    return sections
+
+
+def header_block(markdown: str) -> str:
+    """
+    The resume's opening block, up to the first section heading: the name and contact
+    details. A heading on the first non-empty line is taken as the name, not a section.
+    """
+    lines: List[str] = []
+    for line in markdown.splitlines():
+        if not line.strip():
+            continue
+        if lines and _heading_title(line) is not None:
+            break
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,73 +1,115 @@
-import os
 import uuid
-import json
-import tempfile
 import logging
-from markitdown import MarkItDown
+from datetime import datetime, timezone
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import contains_eager, joinedload
 from pydantic import ValidationError
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional
 
+from src.core.config import settings
+from src.core.database import json_array_filter
+from src.core.metrics import pipeline, stage
+from src.core.tracing import traced
 from src.models import Resume, ProcessedResume
 from src.schemas.json import json_schema_factory
 from src.schemas.pydantic import StructuredResumeModel
 from src.prompts import prompt_factory
-from src.agent import AgentManager, EmbeddingManager
+from src.agent import AgentManager, EmbeddingManager, Provider, EmbeddingProvider
+from src.retrieval import normalize, get_embedding_store, get_keyword_index, RESUME_EMBEDDINGS
+from .extraction_cache import ExtractionCache, compute_schema_version
+from .prompt_builder import build_prompt, prompt_fingerprint
+from .section_extraction import SectionExtractor
+from .rule_extraction import RULE_EXTRACTION_REVISION, pre_extract_resume, merge_prefilled
+from .document_converter import DocumentConverter
+from .exceptions import ResumeNotFoundError
+from .response_cache import CachedResponse, get_response_cache, RESUME_RESPONSES
 
 logger = logging.getLogger(__name__)
 
+_SCHEMA_VERSION = compute_schema_version(
+    prompt_factory.get("structured_resume"),
+    json_schema_factory.get("structured_resume"),
+    StructuredResumeModel,
+    prompt_fingerprint("structured_resume"),
+    f"rules:{RULE_EXTRACTION_REVISION}",
+)
+_SECTIONS_SCHEMA_VERSION = compute_schema_version(
+    prompt_factory.get("structured_resume_section"),
+    json_schema_factory.get("structured_resume"),
+    StructuredResumeModel,
+    prompt_fingerprint("structured_resume_section"),
+    f"rules:{RULE_EXTRACTION_REVISION}",
+    "sections",
+)
+
 
 class ResumeService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+            self,
+            db: AsyncSession,
+            provider: Provider | None = None,
+            embedding_provider: EmbeddingProvider | None = None,
+            converter: DocumentConverter | None = None,
+    ):
         self.db = db
-        self.md = MarkItDown(enable_plugins=False)
-        self.agent = AgentManager()
+        self.converter = converter or DocumentConverter(max_workers=0)
+        self.agent = AgentManager(provider=provider)
+        self.embedder = EmbeddingManager(provider=embedding_provider)
+        self.cache = ExtractionCache(db)
 
+    @traced("ResumeService.convert_and_store_resume")
     async def convert_and_store_resume(
-            self, file_bytes: bytes
+            self, file_bytes: bytes, resume_id: Optional[str] = None
     ):
         """
         Converts resume file (PDF) to text using MarkItDown and stores it in the database.
 
         Args:
             file_bytes: Raw bytes of the uploaded file
+            resume_id: ID to store the resume under. If a resume with this ID is already
+                stored (e.g. by an earlier attempt of the same upload), its content is
+                reused instead of converting and storing the file again.
 
         Returns:
-            None
-        """
-        with tempfile.NamedTemporaryFile(
-                delete=False, suffix=".pdf"
-        ) as temp_file:
-            temp_file.write(file_bytes)
-            temp_path = temp_file.name
+            The ID of the stored resume
 
-        try:
-            result = self.md.convert(temp_path)
-            text_content = result.text_content
-            resume_id = await self._store_resume_in_db(text_content)
+        Raises:
+            ResumeParsingError: If the PDF cannot be converted
+        """
+        with pipeline("resume"), stage("total"):
+            text_content = None
+            if resume_id is not None:
+                text_content = (
+                    await self.db.execute(
+                        select(Resume.content).where(Resume.resume_id == resume_id)
+                    )
+                ).scalar()
+            if text_content is None:
+                with stage("pdf_conversion"):
+                    text_content = await self.converter.convert_pdf(file_bytes)
+                resume_id = await self._store_resume_in_db(text_content, resume_id)
 
             await self._extract_and_store_structured_resume(
                 resume_id=resume_id, resume_text=text_content
             )
 
-            return resume_id
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        return resume_id
 
-    async def _store_resume_in_db(self, text_content: str):
+    async def _store_resume_in_db(self, text_content: str, resume_id: Optional[str] = None):
         """
         Stores the parsed resume content in the database.
         """
-        resume_id = str(uuid.uuid4())
+        resume_id = resume_id or str(uuid.uuid4())
         resume = Resume(
             resume_id=resume_id, content=text_content
         )
 
         self.db.add(resume)
-        await self.db.flush()
-        await self.db.commit()
+        with stage("db_commit"):
+            await self.db.flush()
+            await self.db.commit()
 
         return resume_id
 
@@ -84,43 +126,51 @@ class ResumeService:
 
         processed_resume = ProcessedResume(
             resume_id=resume_id,
-            personal_data=json.dumps(structured_resume.get("personal_data", {}), ensure_ascii=False)
-            if structured_resume.get("personal_data")
-            else None,
-            experiences=json.dumps(
-                {"experiences": structured_resume.get("experiences", [])},
-                ensure_ascii=False
-            )
-            if structured_resume.get("experiences")
-            else None,
-            projects=json.dumps({"projects": structured_resume.get("projects", [])}, ensure_ascii=False)
-            if structured_resume.get("projects")
-            else None,
-            skills=json.dumps({"skills": structured_resume.get("skills", [])}, ensure_ascii=False)
-            if structured_resume.get("skills")
-            else None,
-            research_work=json.dumps(
-                {"research_work": structured_resume.get("research_work", [])}, ensure_ascii=False
-            )
-            if structured_resume.get("research_work")
-            else None,
-            achievements=json.dumps(
-                {"achievements": structured_resume.get("achievements", [])}, ensure_ascii=False
-            )
-            if structured_resume.get("achievements")
-            else None,
-            education=json.dumps({"education": structured_resume.get("education", [])}, ensure_ascii=False)
-            if structured_resume.get("education")
-            else None,
-            extracted_keywords=json.dumps(
-                {"extracted_keywords": structured_resume.get("extracted_keywords", [])}, ensure_ascii=False
-                if structured_resume.get("extracted_keywords")
-                else None
-            ),
+            personal_data=structured_resume.get("personal_data") or None,
+            experiences=structured_resume.get("experiences") or None,
+            projects=structured_resume.get("projects") or None,
+            skills=structured_resume.get("skills") or None,
+            research_work=structured_resume.get("research_work") or None,
+            achievements=structured_resume.get("achievements") or None,
+            education=structured_resume.get("education") or None,
+            extracted_keywords=structured_resume.get("extracted_keywords") or None,
         )
+        with stage("embedding"):
+            embedding = await self._embed_resume(resume_text)
+        if embedding is not None:
+            processed_resume.embedding = embedding.tobytes()
 
+        # stamped here rather than by the server default: on PostgreSQL CURRENT_TIMESTAMP is
+        # the start of the transaction, which the extraction cache lookup opened before the
+        # LLM call, so the row would commit with a time far behind other workers' watermarks
+        processed_resume.processed_at = datetime.now(timezone.utc)
         self.db.add(processed_resume)
-        await self.db.commit()
+        with stage("db_commit"):
+            await self.db.commit()
+
+        get_response_cache(RESUME_RESPONSES).invalidate(resume_id)
+        resume_row_id = (
+            await self.db.execute(select(Resume.id).where(Resume.resume_id == resume_id))
+        ).scalar_one()
+        get_keyword_index().add(
+            resume_row_id,
+            resume_id,
+            self.index_keywords(processed_resume.extracted_keywords, processed_resume.skills),
+        )
+        if embedding is not None:
+            get_embedding_store(RESUME_EMBEDDINGS).add(resume_id, embedding)
+
+    async def _embed_resume(self, resume_text: str) -> np.ndarray | None:
+        """
+        Embeds the resume text for matching. A failed embedding does not fail the upload,
+        the resume is simply left out of matching results.
+        """
+        try:
+            embedding = await self.embedder.embed(resume_text)
+        except RuntimeError as e:
+            logger.warning(f"Resume embedding failed: {e}")
+            return None
+        return normalize(embedding)
 
     async def _extract_structured_json(
             self, resume_text: str
@@ -128,24 +178,111 @@ class ResumeService:
         """
         Uses the AgentManager+JSONWrapper to ask the LLM to
         return the data in exact JSON schema we need.
+
+        With ``RESUME_EXTRACTION_MODE="sections"`` the resume is extracted section by
+        section (see ``SectionExtractor``), falling back to a single prompt if that fails.
         """
-        prompt_template = prompt_factory.get("structured_resume")
-        prompt = prompt_template.format(
-            json.dumps(json_schema_factory.get("structured_resume"), indent=2),
-            resume_text,
+        by_sections = settings.RESUME_EXTRACTION_MODE == "sections"
+        schema_version = _SECTIONS_SCHEMA_VERSION if by_sections else _SCHEMA_VERSION
+        with stage("cache_lookup"):
+            cached_output = await self.cache.get(
+                "structured_resume", schema_version, self.agent.model, resume_text
+            )
+        if cached_output is not None:
+            return cached_output
+
+        output = None
+        if by_sections:
+            output = await SectionExtractor(
+                self.agent, max_attempts=settings.RESUME_SECTION_MAX_ATTEMPTS
+            ).extract(resume_text)
+            if output is None:
+                logger.info("Section extraction failed, extracting the whole resume at once.")
+        if output is None:
+            output = await self._extract_whole_resume(resume_text)
+        if output is None:
+            return None
+        await self.cache.set(
+            "structured_resume", schema_version, self.agent.model, resume_text, output
+        )
+        return output
+
+    async def _extract_whole_resume(self, resume_text: str) -> Dict | None:
+        """
+        Extracts the structured resume with a single prompt over the whole text. Contact
+        details found by ``pre_extract_resume`` are left out of the schema the LLM fills
+        and merged into its output before validation.
+        """
+        schema = json_schema_factory.get("structured_resume")
+        prefilled = pre_extract_resume(resume_text, schema)
+        with stage("prompt_build"):
+            built = build_prompt("structured_resume", prefilled.schema, resume_text, model=self.agent.model)
+        logger.debug(f"Structured Resume Prompt: {built.prompt}")
+        raw_output = merge_prefilled(
+            await self.agent.run(prompt=built.prompt), prefilled.values, schema
         )
-        logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.agent.run(prompt=prompt)
 
         try:
-            structured_resume: StructuredResumeModel = (
-                StructuredResumeModel.model_validate(raw_output)
-            )
+            with stage("validation"):
+                structured_resume: StructuredResumeModel = (
+                    StructuredResumeModel.model_validate(raw_output)
+                )
         except ValidationError as e:
             logger.info(f"Validation error: {e}")
             return None
         return structured_resume.model_dump()
 
+    @traced("ResumeService.find_resume_ids_by_keywords")
+    async def find_resume_ids_by_keywords(
+            self, keywords: List[str], match_all: bool = False, limit: int = 1000
+    ) -> List[str]:
+        """
+        Finds processed resumes whose extracted keywords include any (or all) of ``keywords``.
+
+        The filter runs in the database, on the GIN index where available.
+        """
+        query = (
+            select(ProcessedResume.resume_id)
+            .where(
+                json_array_filter(
+                    self.db.bind.dialect.name,
+                    ProcessedResume.extracted_keywords,
+                    keywords,
+                    match_all,
+                )
+            )
+            .order_by(ProcessedResume.processed_at.desc())
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars())
+
+    @traced("ResumeService.get_resume_response")
+    async def get_resume_response(self, resume_id: str) -> CachedResponse:
+        """
+        Returns the serialized ``get_resume_with_processed_data`` payload, from the response
+        cache when the stored row has not changed since it was rendered.
+
+        Raises:
+            ResumeNotFoundError: If the resume is not found
+        """
+        result = await self.db.execute(
+            select(Resume.id, ProcessedResume.processed_at)
+            .outerjoin(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+            .where(Resume.resume_id == resume_id)
+        )
+        row = result.first()
+        if row is None:
+            raise ResumeNotFoundError(resume_id=resume_id)
+        version = row.processed_at.isoformat() if row.processed_at else "unprocessed"
+
+        cache = get_response_cache(RESUME_RESPONSES)
+        cached = cache.get(resume_id, version)
+        if cached is not None:
+            return cached
+        resume_data = await self.get_resume_with_processed_data(resume_id)
+        return cache.set(resume_id, version, resume_data)
+
     async def get_resume_with_processed_data(self, resume_id: str) -> Optional[Dict]:
         """
         Fetches both resume and processed resume data from the database and combines them.
@@ -159,43 +296,86 @@ class ResumeService:
         Raises:
             ResumeNotFoundError: If the resume is not found
         """
-        resume_query = select(Resume).where(Resume.resume_id == resume_id)
+        resume_query = (
+            select(Resume)
+            .options(joinedload(Resume.raw_resume_association))
+            .where(Resume.resume_id == resume_id)
+        )
         resume_result = await self.db.execute(resume_query)
         resume = resume_result.scalars().first()
 
         if not resume:
-            raise "Resume not found."
+            raise ResumeNotFoundError(resume_id=resume_id)
+
+        return self.serialize_resume(resume)
 
-        processed_query = select(ProcessedResume).where(ProcessedResume.resume_id == resume_id)
-        processed_result = await self.db.execute(processed_query)
-        processed_resume = processed_result.scalars().first()
+    async def stream_resumes_with_processed_data(
+            self, resume_ids: List[str]
+    ) -> AsyncIterator[Dict]:
+        """
+        Streams combined resume data for many resumes, loaded with one joined query.
 
-        combined_data = {
+        Args:
+            resume_ids: The IDs of the resumes to retrieve
+
+        Returns:
+            An async iterator of combined data in database order; unknown IDs are skipped
+        """
+        resume_query = (
+            select(Resume)
+            .outerjoin(Resume.raw_resume_association)
+            .options(contains_eager(Resume.raw_resume_association))
+            .where(Resume.resume_id.in_(resume_ids))
+            .execution_options(yield_per=100)
+        )
+        result = await self.db.stream(resume_query)
+        async for resume in result.scalars():
+            yield self.serialize_resume(resume)
+
+    @staticmethod
+    def index_keywords(
+            extracted_keywords: Optional[List[str]], skills: Optional[List[Dict]]
+    ) -> List[str]:
+        """
+        Keywords a processed resume is indexed under: its extracted keywords plus skill names.
+        """
+        keywords = list(extracted_keywords or [])
+        keywords.extend(
+            skill["skill_name"] for skill in skills or [] if isinstance(skill, dict) and skill.get("skill_name")
+        )
+        return keywords
+
+    @classmethod
+    def serialize_resume(cls, resume: Resume) -> Dict:
+        """
+        Converts a Resume row, with its processed row loaded, into the API's combined dict.
+        """
+        processed_resume = resume.raw_resume_association
+        return {
             "resume_id": resume.resume_id,
             "raw_resume": {
                 "id": resume.id,
                 "content": resume.content,
                 "created_at": resume.created_at.isoformat() if resume.created_at else None,
             },
-            "processed_resume": None
+            "processed_resume": cls.serialize_processed_resume(processed_resume)
+            if processed_resume
+            else None,
+        }
+
+    @staticmethod
+    def serialize_processed_resume(processed_resume: ProcessedResume) -> Dict:
+        """
+        Converts a ProcessedResume row into the JSON-ready dict returned by the API.
+        """
+        return {
+            "personal_data": processed_resume.personal_data,
+            "experiences": processed_resume.experiences,
+            "projects": processed_resume.projects,
+            "skills": processed_resume.skills,
+            "research_work": processed_resume.research_work,
+            "achievements": processed_resume.achievements,
+            "education": processed_resume.education,
+            "extracted_keywords": processed_resume.extracted_keywords,
+            "processed_at": processed_resume.processed_at.isoformat() if processed_resume.processed_at else None,
         }
-        if processed_resume:
-            combined_data["processed_resume"] = {
-                "personal_data": json.loads(processed_resume.personal_data) if processed_resume.personal_data else None,
-                "experiences": json.loads(processed_resume.experiences).get("experiences",
-                                                                            []) if processed_resume.experiences else None,
-                "projects": json.loads(processed_resume.projects).get("projects",
-                                                                      []) if processed_resume.projects else None,
-                "skills": json.loads(processed_resume.skills).get("skills", []) if processed_resume.skills else None,
-                "research_work": json.loads(processed_resume.research_work).get("research_work",
-                                                                                []) if processed_resume.research_work else None,
-                "achievements": json.loads(processed_resume.achievements).get("achievements",
-                                                                              []) if processed_resume.achievements else None,
-                "education": json.loads(processed_resume.education).get("education",
-                                                                        []) if processed_resume.education else None,
-                "extracted_keywords": json.loads(processed_resume.extracted_keywords).get("extracted_keywords",
-                                                                                          []) if processed_resume.extracted_keywords else None,
-                "processed_at": processed_resume.processed_at.isoformat() if processed_resume.processed_at else None,
-            }
-
-        return combined_data
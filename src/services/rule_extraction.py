@@ -0,0 +1,214 @@
+import re
+import copy
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .resume_sections import header_block
+
+# bump whenever a pattern changes what is pre-filled; part of the extraction cache version
+RULE_EXTRACTION_REVISION = 2
+
+_EMAIL = re.compile(r"(?<![\w.+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b")
+_PHONE = re.compile(r"(?<![\w+(])\(?\+?(?:\(?\d{1,4}\)?[\s.\-/]{0,2}){2,6}\d{2,4}(?!\w)")
+_PHONE_LABEL = re.compile(r"\b(?:phone|tel|telephone|mobile|mob|cell|contact)\b|\u260e|\U0001f4de", re.IGNORECASE)
+_YEAR_RANGE = re.compile(r"^(?:19|20)\d{2}\s*[-/\u2013]\s*(?:19|20)\d{2}$")
+_DATE = re.compile(r"^\d{1,4}[-./]\d{1,2}[-./]\d{1,4}$")
+# "2019 2023 2024": nothing but years
+_YEARS = re.compile(r"^(?:(?:19|20)\d{2}[\s.\-/\u2013]*)+$")
+# an unbroken run opening with a YYYYMMDD date, e.g. a student or registration number
+_DATE_RUN = re.compile(r"^(?:19|20)\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])\d*$")
+_ID_LABEL = re.compile(
+    r"\b(?:id|student|roll|registration|reg|matriculation|passport|licen[cs]e|account|gpa)\b",
+    re.IGNORECASE,
+)
+_PORTFOLIO_LABEL = re.compile(r"\b(?:portfolio|website|web|site|homepage|home page|blog)\b", re.IGNORECASE)
+_LINKEDIN = re.compile(
+    r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/(?:in|pub)/[A-Za-z0-9_%\-]+/?", re.IGNORECASE
+)
+_GITHUB = re.compile(
+    r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9](?:[A-Za-z0-9\-]*[A-Za-z0-9])?(?![\w\-])/?(?!\w)",
+    re.IGNORECASE,
+)
+_URL = re.compile(r"(?:https?://|www\.)[^\s<>()\[\]{}\"'|,]+", re.IGNORECASE)
+_SOCIAL_HOSTS = re.compile(
+    r"linkedin\.com|github\.com|facebook\.com|twitter\.com|x\.com/|instagram\.com|mailto:",
+    re.IGNORECASE,
+)
+_APPLY_WORDS = re.compile(r"\bapply\b|\bapplication\b|\bapplicants?\b", re.IGNORECASE)
+_APPLY_HOSTS = re.compile(
+    r"greenhouse\.io|lever\.co|myworkdayjobs\.com|workday\.com|smartrecruiters\.com|ashbyhq\.com|"
+    r"bamboohr\.com|workable\.com|recruitee\.com|jobvite\.com|icims\.com|/careers?\b|/jobs?\b|/apply\b",
+    re.IGNORECASE,
+)
+# contact details sit in the first lines of a resume; later URLs are usually project links
+_HEADER_LINES = 20
+_MIN_PHONE_DIGITS = 9
+_MIN_LABELLED_PHONE_DIGITS = 7
+
+
+class PreExtraction(NamedTuple):
+    # values found by the rules, nested like the JSON schema
+    values: Dict[str, Any]
+    # the JSON schema without the fields in ``values``, for the LLM to fill
+    schema: Dict[str, Any]
+
+
+def _clean_url(url: str) -> str:
+    url = url.rstrip(".,;:!?*_`")
+    return url if re.match(r"https?://", url, re.IGNORECASE) else f"https://{url}"
+
+
+def _header(text: str) -> str:
+    return "\n".join(header_block(text).splitlines()[:_HEADER_LINES])
+
+
+def find_emails(text: str) -> List[str]:
+    return list(dict.fromkeys(match.group(0) for match in _EMAIL.finditer(text)))
+
+
+def find_phone(text: str, labelled_only: bool = False) -> Optional[str]:
+    """
+    First phone number in ``text``; on a line labelled phone/mobile/tel a shorter number
+    is accepted. Dates, years, year ranges and numbers on ID-like lines are skipped. With
+    ``labelled_only`` only numbers on labelled lines are returned.
+    """
+    for line in text.splitlines():
+        labelled = bool(_PHONE_LABEL.search(line))
+        if not labelled and (labelled_only or _ID_LABEL.search(line)):
+            continue
+        # emails and URLs contain digit runs that are not phone numbers
+        line = _URL.sub(" ", _EMAIL.sub(" ", line))
+        for match in _PHONE.finditer(line):
+            candidate = match.group(0).strip(" .-/")
+            digits = sum(c.isdigit() for c in candidate)
+            if (
+                    digits > 15
+                    or _YEAR_RANGE.match(candidate)
+                    or _DATE.match(candidate)
+                    or _YEARS.match(candidate)
+                    or _DATE_RUN.match(candidate)
+            ):
+                continue
+            if digits >= (_MIN_LABELLED_PHONE_DIGITS if labelled else _MIN_PHONE_DIGITS):
+                return candidate
+    return None
+
+
+def find_linkedin(text: str) -> Optional[str]:
+    match = _LINKEDIN.search(text)
+    return _clean_url(match.group(0)) if match else None
+
+
+def find_github(text: str) -> Optional[str]:
+    match = _GITHUB.search(text)
+    return _clean_url(match.group(0)) if match else None
+
+
+def find_urls(text: str) -> List[str]:
+    return list(dict.fromkeys(_clean_url(match.group(0)) for match in _URL.finditer(text)))
+
+
+def find_portfolio(text: str) -> Optional[str]:
+    """
+    A non-social URL on a line labelled portfolio/website/homepage/blog.
+    """
+    for line in text.splitlines():
+        if _PORTFOLIO_LABEL.search(line):
+            url = next((url for url in find_urls(line) if not _SOCIAL_HOSTS.search(url)), None)
+            if url:
+                return url
+    return None
+
+
+def find_apply_link(text: str) -> Optional[str]:
+    """
+    A URL on a line that talks about applying, else the first URL of a known applicant
+    tracking system or careers page.
+    """
+    for line in text.splitlines():
+        if _APPLY_WORDS.search(line):
+            urls = find_urls(line)
+            if urls:
+                return urls[0]
+    for url in find_urls(text):
+        if _APPLY_HOSTS.search(url):
+            return url
+    return None
+
+
+def reduce_schema(schema: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of ``schema`` without the leaves present in ``values``.
+    """
+    reduced = copy.deepcopy(schema)
+
+    def _drop(node: Dict[str, Any], filled: Dict[str, Any]) -> None:
+        for key, value in filled.items():
+            if isinstance(value, dict) and isinstance(node.get(key), dict):
+                _drop(node[key], value)
+            else:
+                node.pop(key, None)
+
+    _drop(reduced, values)
+    return reduced
+
+
+def merge_prefilled(output: Any, values: Dict[str, Any], schema: Dict[str, Any]) -> Any:
+    """
+    Writes the rule-extracted ``values`` into the LLM ``output`` before validation; rule
+    values win. An object the LLM left out or returned as null is created with the other
+    keys of its ``schema`` node set to null.
+    """
+    if not isinstance(output, dict):
+        return output
+    merged = dict(output)
+    for key, value in values.items():
+        node = schema.get(key)
+        if isinstance(value, dict) and isinstance(node, dict):
+            current = merged.get(key)
+            if not isinstance(current, dict):
+                current = {child: None for child in node}
+            merged[key] = merge_prefilled(current, value, node)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _drop_empty(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in values.items() if value}
+
+
+def pre_extract_resume(text: str, schema: Dict[str, Any]) -> PreExtraction:
+    """
+    Finds the resume's email, phone, LinkedIn and portfolio (a labelled personal site in
+    the header, else the GitHub profile) without the LLM.
+
+    Only the header block before the first section heading is searched for the phone and
+    portfolio, and only labelled matches are pre-filled: an unlabelled number or a bare
+    personal URL stays in the schema for the LLM to judge.
+    """
+    header = _header(text)
+    emails = find_emails(header) or find_emails(text)
+    portfolio = find_portfolio(header)
+    if portfolio is None and not any(not _SOCIAL_HOSTS.search(url) for url in find_urls(header)):
+        portfolio = find_github(text)
+    personal = _drop_empty({
+        "email": emails[0] if emails else None,
+        "phone": find_phone(header, labelled_only=True),
+        "linkedin": find_linkedin(text),
+        "portfolio": portfolio,
+    })
+    values = {"Personal Data": personal} if personal else {}
+    return PreExtraction(values, reduce_schema(schema, values))
+
+
+def pre_extract_job(text: str, schema: Dict[str, Any]) -> PreExtraction:
+    """
+    Finds the job posting's apply link and contact email without the LLM.
+    """
+    emails = find_emails(text)
+    application = _drop_empty({
+        "applyLink": find_apply_link(text),
+        "contactEmail": emails[0] if emails else None,
+    })
+    values = {"applicationInfo": application} if application else {}
+    return PreExtraction(values, reduce_schema(schema, values))
@@ -0,0 +1,270 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import distinct, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.core.config import settings
+from src.core.database import upsert_many
+from src.core.tracing import traced
+from src.models import ProcessedJob, ProcessedResume, job_resume_association
+from src.retrieval import (
+    get_embedding_store,
+    get_keyword_index,
+    normalize_keyword,
+    RESUME_EMBEDDINGS,
+    JOB_EMBEDDINGS,
+)
+from .match_service import sync_keyword_index
+from .resume_service import ResumeService
+from .exceptions import JobNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the scoring logic changes; stored rows from other versions get rescored
+_SCORER_REVISION = 1
+_UPSERT_BATCH_SIZE = 1000
+_SCORE_COLUMNS = ["score", "components", "scorer_version", "scored_at"]
+
+
+def scorer_version() -> str:
+    """
+    Identifies the scoring logic and weights that produced a stored score.
+    """
+    return (
+        f"{_SCORER_REVISION}:cosine={settings.MATCH_SCORE_COSINE_WEIGHT:g}"
+        f":keywords={settings.MATCH_SCORE_KEYWORD_WEIGHT:g}"
+    )
+
+
+def combine_scores(cosine: np.ndarray, keyword_overlap: np.ndarray) -> np.ndarray:
+    """
+    Weighted sum of the embedding similarity and the share of job keywords a resume carries.
+    """
+    return (
+        settings.MATCH_SCORE_COSINE_WEIGHT * cosine
+        + settings.MATCH_SCORE_KEYWORD_WEIGHT * keyword_overlap
+    )
+
+
+def _live_rows(store) -> np.ndarray:
+    mask = store.live_mask
+    return np.arange(len(store.row_ids)) if mask is None else np.flatnonzero(mask)
+
+
+class ScoringService:
+    """
+    Maintains the persisted match scores in ``job_resume``.
+
+    Each (job, resume) pair stores its combined score, the components it was combined from
+    and the scorer version, so the best candidates for a job are an indexed
+    ``ORDER BY score`` read instead of an on-demand ranking.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @traced("ScoringService.score_resume")
+    async def score_resume(self, resume_id: str) -> int:
+        """
+        Scores a processed resume against every job with an embedding.
+
+        Returns:
+            The number of pairs written; 0 if the resume has no embedding yet
+        """
+        resume_store = get_embedding_store(RESUME_EMBEDDINGS)
+        resume_store.refresh()
+        embedding = resume_store.get(resume_id)
+        if embedding is None:
+            logger.info(f"Resume {resume_id} has no embedding, skipping scoring")
+            return 0
+
+        processed = (
+            await self.db.execute(
+                select(ProcessedResume.extracted_keywords, ProcessedResume.skills).where(
+                    ProcessedResume.resume_id == resume_id
+                )
+            )
+        ).one_or_none()
+        resume_terms: Set[str] = set()
+        if processed is not None:
+            resume_terms = {
+                normalize_keyword(keyword)
+                for keyword in ResumeService.index_keywords(processed.extracted_keywords, processed.skills)
+                if keyword and keyword.strip()
+            }
+
+        job_store = get_embedding_store(JOB_EMBEDDINGS)
+        job_store.refresh()
+        rows = _live_rows(job_store)
+        if not len(rows):
+            return 0
+        job_ids = [job_store.row_ids[row] for row in rows]
+        cosine = np.asarray(job_store.matrix[rows]) @ embedding
+
+        job_terms: Dict[str, Set[str]] = {}
+        result = await self.db.stream(
+            select(ProcessedJob.job_id, ProcessedJob.extracted_keywords).execution_options(
+                yield_per=_UPSERT_BATCH_SIZE
+            )
+        )
+        async for job_id, keywords in result:
+            job_terms[job_id] = {normalize_keyword(k) for k in keywords or [] if k and k.strip()}
+        overlap = np.asarray(
+            [
+                len(job_terms[job_id] & resume_terms) / len(job_terms[job_id])
+                if job_terms.get(job_id) else 0.0
+                for job_id in job_ids
+            ],
+            dtype=np.float32,
+        )
+
+        keep = np.asarray([job_id in job_terms for job_id in job_ids], dtype=bool)
+        return await self._store(
+            [job_ids[i] for i in np.flatnonzero(keep)],
+            [resume_id] * int(keep.sum()),
+            cosine[keep],
+            overlap[keep],
+        )
+
+    @traced("ScoringService.score_job")
+    async def score_job(self, job_id: str) -> int:
+        """
+        Scores a processed job against every resume with an embedding.
+
+        Returns:
+            The number of pairs written; 0 if the job has no embedding yet
+        """
+        job_store = get_embedding_store(JOB_EMBEDDINGS)
+        job_store.refresh()
+        embedding = job_store.get(job_id)
+        if embedding is None:
+            logger.info(f"Job {job_id} has no embedding, skipping scoring")
+            return 0
+
+        keywords = (
+            await self.db.execute(
+                select(ProcessedJob.extracted_keywords).where(ProcessedJob.job_id == job_id)
+            )
+        ).scalar()
+        job_terms = {normalize_keyword(k) for k in keywords or [] if k and k.strip()}
+
+        resume_store = get_embedding_store(RESUME_EMBEDDINGS)
+        resume_store.refresh()
+        rows = _live_rows(resume_store)
+        if not len(rows):
+            return 0
+        resume_ids = [resume_store.row_ids[row] for row in rows]
+        cosine = np.asarray(resume_store.matrix[rows]) @ embedding
+
+        overlap = np.zeros(len(rows), dtype=np.float32)
+        if job_terms:
+            await sync_keyword_index(self.db)
+            index = get_keyword_index()
+            row_ids, counts = index.at_least(job_terms, 1)
+            shared = dict(zip(index.keys(row_ids), counts.tolist()))
+            overlap = np.asarray(
+                [shared.get(resume_id, 0) / len(job_terms) for resume_id in resume_ids],
+                dtype=np.float32,
+            )
+
+        return await self._store([job_id] * len(resume_ids), resume_ids, cosine, overlap)
+
+    async def _store(
+            self,
+            job_ids: List[str],
+            resume_ids: List[str],
+            cosine: np.ndarray,
+            overlap: np.ndarray,
+    ) -> int:
+        version = scorer_version()
+        scored_at = datetime.now(timezone.utc)
+        scores = combine_scores(cosine, overlap)
+        rows = [
+            {
+                "processed_job_id": job_id,
+                "processed_resume_id": resume_id,
+                "score": float(score),
+                "components": {"cosine": float(c), "keyword_overlap": float(o)},
+                "scorer_version": version,
+                "scored_at": scored_at,
+            }
+            for job_id, resume_id, score, c, o in zip(job_ids, resume_ids, scores, cosine, overlap)
+        ]
+        for start in range(0, len(rows), _UPSERT_BATCH_SIZE):
+            await upsert_many(
+                self.db,
+                job_resume_association,
+                rows[start:start + _UPSERT_BATCH_SIZE],
+                _SCORE_COLUMNS,
+            )
+        await self.db.commit()
+        return len(rows)
+
+    @traced("ScoringService.top_resumes_for_job")
+    async def top_resumes_for_job(
+            self, job_id: str, limit: int = 10, offset: int = 0, min_score: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Reads the best persisted scores for a job, best first.
+
+        Scores written by an older scorer version are returned (with their version) until
+        the background rescore replaces them.
+
+        Raises:
+            JobNotFoundError: If the processed job is not found
+        """
+        table = job_resume_association
+        query = (
+            select(
+                table.c.processed_resume_id,
+                table.c.score,
+                table.c.components,
+                table.c.scorer_version,
+                table.c.scored_at,
+            )
+            .where(table.c.processed_job_id == job_id)
+            .order_by(table.c.score.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        if min_score is not None:
+            query = query.where(table.c.score >= min_score)
+        rows = (await self.db.execute(query)).all()
+        if not rows:
+            job_exists = await self.db.execute(
+                select(ProcessedJob.job_id).where(ProcessedJob.job_id == job_id)
+            )
+            if job_exists.first() is None:
+                raise JobNotFoundError(job_id=job_id)
+        return [
+            {
+                "resume_id": row.processed_resume_id,
+                "score": row.score,
+                "components": row.components,
+                "scorer_version": row.scorer_version,
+                "scored_at": row.scored_at.isoformat() if row.scored_at else None,
+            }
+            for row in rows
+        ]
+
+    async def jobs_needing_rescore(self) -> List[str]:
+        """
+        IDs of jobs with scores from another scorer version, or with an embedding but no
+        scores at all (e.g. processed before scores were persisted).
+        """
+        table = job_resume_association
+        version = scorer_version()
+        stale = await self.db.execute(
+            select(distinct(table.c.processed_job_id)).where(table.c.scorer_version != version)
+        )
+        unscored = await self.db.execute(
+            select(ProcessedJob.job_id).where(
+                ProcessedJob.embedding.is_not(None),
+                ~exists().where(table.c.processed_job_id == ProcessedJob.job_id),
+            )
+        )
+        return list(dict.fromkeys([*stale.scalars().all(), *unscored.scalars().all()]))
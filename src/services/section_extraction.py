@@ -0,0 +1,196 @@
+import re
+import asyncio
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.agent import AgentManager
+from src.core.metrics import stage
+from src.schemas.json import json_schema_factory
+from src.schemas.pydantic import StructuredResumeModel
+from .prompt_builder import build_prompt, compact_markdown
+from .resume_sections import split_sections
+from .rule_extraction import PreExtraction, pre_extract_resume, merge_prefilled
+
+logger = logging.getLogger(__name__)
+
+PERSONAL_DATA = "Personal Data"
+KEYWORDS = "Extracted Keywords"
+_RETRY_TEMPERATURE = 0.3
+# keys filled from sections whose title says nothing about their content
+_OTHER_KEYS = ("Experiences", "Projects", "Research Work", "Achievements")
+# first match wins, so "Research Experience" is research work, not an experience
+_TITLE_KEYS = [
+    (re.compile(r"publication|research", re.IGNORECASE), "Research Work"),
+    (re.compile(r"experience|employment|work history|career", re.IGNORECASE), "Experiences"),
+    (re.compile(r"project", re.IGNORECASE), "Projects"),
+    (re.compile(r"education|academic|qualification", re.IGNORECASE), "Education"),
+    (re.compile(r"skill|competenc|technolog|tools|languages", re.IGNORECASE), "Skills"),
+    (re.compile(r"award|achievement|honou?r|certification|accomplishment", re.IGNORECASE), "Achievements"),
+    (re.compile(r"summary|profile|about|objective|contact|personal", re.IGNORECASE), PERSONAL_DATA),
+]
+
+
+class SectionTask(NamedTuple):
+    keys: tuple
+    text: str
+    # position of the task's first section in the resume, the merge order
+    position: int
+
+
+def _adapters() -> Dict[str, TypeAdapter]:
+    return {
+        field.alias or name: TypeAdapter(field.annotation)
+        for name, field in StructuredResumeModel.model_fields.items()
+    }
+
+
+def _section_key(title: str) -> Optional[str]:
+    for pattern, key in _TITLE_KEYS:
+        if pattern.search(title):
+            return key
+    return None
+
+
+def plan_section_tasks(resume_text: str) -> List[SectionTask]:
+    """
+    Groups the resume's sections by the schema key they fill, one extraction task per key.
+
+    Untitled or unrecognised sections before the first recognised one (the header with the
+    name and contact details) go to Personal Data, later ones to a task covering every
+    list key they could belong to. Keywords are extracted from the whole resume.
+    """
+    grouped: Dict[tuple, List[str]] = {}
+    positions: Dict[tuple, int] = {}
+    seen_known = False
+    sections = split_sections(resume_text)
+    for position, section in enumerate(sections):
+        key = _section_key(section.title)
+        if key is not None:
+            seen_known = True
+            keys = (key,)
+        else:
+            keys = _OTHER_KEYS if seen_known else (PERSONAL_DATA,)
+        grouped.setdefault(keys, []).append(section.text)
+        positions.setdefault(keys, position)
+
+    if (PERSONAL_DATA,) not in grouped:
+        # no recognisable header; the opening lines usually carry the contact details
+        grouped[(PERSONAL_DATA,)] = ["\n".join(resume_text.splitlines()[:15])]
+        positions[(PERSONAL_DATA,)] = -1
+    tasks = [SectionTask(keys, "\n".join(texts), positions[keys]) for keys, texts in grouped.items()]
+    tasks.append(SectionTask((KEYWORDS,), resume_text, len(sections)))
+    return sorted(tasks, key=lambda task: task.position)
+
+
+def merge_section_results(results: List[tuple]) -> Dict[str, Any]:
+    """
+    Merges (task, output) pairs into one resume document in the tasks' resume order, so the
+    result does not depend on which call finished first. List keys are concatenated,
+    keywords de-duplicated, and Personal Data taken from the first task that returned it.
+    """
+    schema = json_schema_factory.get("structured_resume")
+    merged: Dict[str, Any] = {
+        key: [] for key, value in schema.items() if isinstance(value, list)
+    }
+    for task, output in sorted(results, key=lambda pair: pair[0].position):
+        for key in task.keys:
+            value = output.get(key)
+            if value is None:
+                continue
+            if key == PERSONAL_DATA:
+                merged.setdefault(PERSONAL_DATA, value)
+            else:
+                merged[key].extend(value)
+    merged[KEYWORDS] = list(dict.fromkeys(k for k in merged[KEYWORDS] if isinstance(k, str)))
+    return merged
+
+
+class SectionExtractor:
+    """
+    Extracts a structured resume as several small concurrent LLM calls, one per group of
+    sections, each given only its slice of the schema.
+
+    Each call's output is validated on its own, so a malformed field costs a retry of
+    that call rather than of the whole resume; the wall-clock time is that of the slowest
+    call.
+    """
+
+    def __init__(self, agent: AgentManager, max_attempts: int = 2):
+        self.agent = agent
+        self.max_attempts = max_attempts
+        self._adapters = _adapters()
+        self._schema = json_schema_factory.get("structured_resume")
+
+    async def _extract(
+            self, task: SectionTask, prefilled: PreExtraction, attempt: int = 1
+    ) -> Optional[Dict[str, Any]]:
+        with stage("prompt_build"):
+            built = build_prompt(
+                "structured_resume_section",
+                {key: prefilled.schema[key] for key in task.keys if key in prefilled.schema},
+                task.text,
+                model=self.agent.model,
+            )
+        try:
+            # a retry samples with some temperature: at 0 it would likely repeat the failure
+            # (and a fresh result within the single-flight window would be reused)
+            generation_args = {"temperature": _RETRY_TEMPERATURE} if attempt > 1 else {}
+            raw_output = await self.agent.run(prompt=built.prompt, **generation_args)
+        except RuntimeError as e:
+            logger.warning(f"Section extraction of {list(task.keys)} failed: {e}")
+            return None
+        if not isinstance(raw_output, dict):
+            logger.warning(f"Section extraction of {list(task.keys)} returned {type(raw_output).__name__}")
+            return None
+
+        raw_output = merge_prefilled(
+            raw_output,
+            {key: value for key, value in prefilled.values.items() if key in task.keys},
+            self._schema,
+        )
+        output = {}
+        try:
+            with stage("validation"):
+                for key in task.keys:
+                    value = raw_output.get(key, [] if key != PERSONAL_DATA else None)
+                    self._adapters[key].validate_python(value)
+                    output[key] = value
+        except ValidationError as e:
+            logger.warning(f"Section extraction of {list(task.keys)} is invalid: {e}")
+            return None
+        return output
+
+    async def extract(self, resume_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Runs the section tasks concurrently, retrying only the failed ones. Contact details
+        found by ``pre_extract_resume`` are merged into the Personal Data task's output.
+
+        Returns:
+            The merged, validated resume (as ``StructuredResumeModel.model_dump``), or None
+            if a task still fails after ``max_attempts`` or the merged result is invalid
+        """
+        prefilled = pre_extract_resume(resume_text, self._schema)
+        pending = plan_section_tasks(compact_markdown(resume_text))
+        results: List[tuple] = []
+        for attempt in range(1, self.max_attempts + 1):
+            outputs = await asyncio.gather(
+                *(self._extract(task, prefilled, attempt) for task in pending)
+            )
+            results.extend((task, output) for task, output in zip(pending, outputs) if output is not None)
+            pending = [task for task, output in zip(pending, outputs) if output is None]
+            if not pending or attempt == self.max_attempts:
+                break
+            logger.info(f"Retrying {len(pending)} failed resume section(s), attempt {attempt + 1}")
+        if pending:
+            logger.warning(f"Resume sections {[list(task.keys) for task in pending]} could not be extracted")
+            return None
+
+        try:
+            with stage("validation"):
+                structured_resume = StructuredResumeModel.model_validate(merge_section_results(results))
+        except ValidationError as e:
+            logger.info(f"Validation error: {e}")
+            return None
+        return structured_resume.model_dump()
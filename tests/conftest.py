@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+# ``src.core.config.settings`` is built at import time and requires these
+os.environ.setdefault("SYNC_DATABASE_URL", "sqlite://")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SESSION_SECRET_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_MODEL", "test")
+os.environ.setdefault("OPENAI_EMBEDDING_MODEL", "test")
+os.environ.setdefault("EMBEDDING_STORE_DIR", tempfile.mkdtemp(prefix="embeddings-"))
+
+from src.retrieval.similarity import normalize  # noqa: E402
+
+
+@pytest.fixture
+def unit_vectors():
+    """
+    Factory for seeded random unit vectors: ``unit_vectors(count, dim=32, seed=0)``.
+    """
+    def make(count: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+        return normalize(np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32))
+
+    return make
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.retrieval.bm25 import BM25Index, tokenize
+
+_WORDS = (
+    "python django flask react vue node.js c++ aws gcp kubernetes docker sql postgres "
+    "kafka spark airflow terraform java kotlin swift go rust ci/cd"
+).split()
+_QUERIES = ["python django", "react vue node.js", "aws kubernetes terraform", "c++ rust", "ci/cd"]
+
+
+def _documents(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [
+        (f"doc-{i}", " ".join(rng.choice(_WORDS, size=int(rng.integers(3, 30)))))
+        for i in range(count)
+    ]
+
+
+def _build(merge_threshold: int, documents) -> BM25Index:
+    index = BM25Index(merge_threshold=merge_threshold)
+    for key, text in documents:
+        index.add(key, text)
+    return index
+
+
+def _assert_same_ranking(expected, actual):
+    assert [key for key, _ in actual] == [key for key, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+@pytest.mark.parametrize("merge_threshold", [1, 7, 64])
+def test_merged_and_delta_segments_score_the_same(merge_threshold):
+    documents = _documents(150)
+    # never merges: everything is scanned from the delta segment
+    reference = _build(10_000, documents)
+    index = _build(merge_threshold, documents)
+    for query in _QUERIES:
+        _assert_same_ranking(reference.search(query, top_k=20), index.search(query, top_k=20))
+
+
+def test_candidates_restrict_results_in_both_segments():
+    documents = _documents(40)
+    candidates = {f"doc-{i}" for i in range(0, 40, 3)}
+    index = _build(16, documents)
+    results = index.search("python aws", top_k=40, candidates=candidates)
+    assert results and {key for key, _ in results} <= candidates
+    _assert_same_ranking(
+        _build(10_000, documents).search("python aws", top_k=40, candidates=candidates), results
+    )
+
+
+def test_known_keys_are_skipped():
+    index = BM25Index()
+    assert index.add("a", "python developer")
+    assert not index.add("a", "rust developer")
+    assert index.search("rust") == []
+
+
+def test_tokenize_splits_slash_joined_terms():
+    assert tokenize("Python/Django and React.js/Vue, CI/CD") == [
+        "python/django", "python", "django", "react.js/vue", "react.js", "vue", "ci/cd", "ci", "cd",
+    ]
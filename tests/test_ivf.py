@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+
+from src.retrieval.embedding_store import EmbeddingStore
+from src.retrieval.ivf import IVFIndex
+from src.retrieval.similarity import top_k_cosine
+from src.retrieval.vector_search import VectorSearch
+
+
+def _assert_exact(index: IVFIndex, matrix: np.ndarray, queries: np.ndarray, k: int = 10):
+    for query in queries:
+        rows, scores = index.search(query, k, nprobe=index.n_lists)
+        expected_rows, expected_scores = top_k_cosine(query, matrix, k)
+        assert rows.tolist() == expected_rows.tolist()
+        np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+
+
+def test_add_consolidate_save_load_round_trip(tmp_path, unit_vectors):
+    matrix = unit_vectors(3000)
+    queries = unit_vectors(5, seed=1)
+    index = IVFIndex.train(matrix[:2000], n_lists=16, nprobe=4)
+    index.add(np.arange(2000), matrix[:2000])
+    # a small second batch stays in the pending segment
+    index.add(np.arange(2000, 2500), matrix[2000:2500])
+    index.add(np.arange(2500, 3000), matrix[2500:3000])
+    assert len(index) == index.rows_indexed == 3000
+    _assert_exact(index, matrix, queries)
+
+    index.consolidate()
+    _assert_exact(index, matrix, queries)
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = IVFIndex.load(path)
+    assert loaded.rows_indexed == 3000 and loaded.n_lists == 16 and loaded.nprobe == 4
+    _assert_exact(loaded, matrix, queries)
+    for query in queries:
+        rows, scores = index.search(query, 10)
+        loaded_rows, loaded_scores = loaded.search(query, 10)
+        assert loaded_rows.tolist() == rows.tolist()
+        np.testing.assert_allclose(loaded_scores, scores)
+
+
+def test_search_applies_the_mask(unit_vectors):
+    matrix = unit_vectors(500)
+    index = IVFIndex.train(matrix, n_lists=8)
+    index.add(np.arange(500), matrix)
+    mask = np.zeros(500, dtype=bool)
+    mask[::7] = True
+    rows, _ = index.search(matrix[14], 20, mask=mask, nprobe=8)
+    assert rows[0] == 14 and mask[rows].all()
+
+
+def test_vector_search_is_exact_until_the_background_sync_lands(tmp_path, unit_vectors):
+    store = EmbeddingStore(str(tmp_path), "vectors")
+    matrix = unit_vectors(1200)
+    store.add_many([f"id-{i}" for i in range(1200)], matrix)
+    search = VectorSearch(store, min_rows=1000, n_lists=8, nprobe=8)
+
+    rows, _ = search.search(matrix[3], 5)
+    assert rows[0] == 3
+    deadline = time.monotonic() + 30
+    while (search._syncing or search._index is None) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert search._index is not None and search._index.rows_indexed == 1200
+
+    # rows appended after the sync are found by the exact scan of the un-indexed tail
+    extra = unit_vectors(10, seed=2)
+    store.add_many([f"extra-{i}" for i in range(10)], extra)
+    store.refresh()
+    rows, _ = search.search(extra[4], 3)
+    assert rows[0] == 1204
@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.retrieval.keyword_index import KeywordIndex
+
+
+def _index() -> KeywordIndex:
+    index = KeywordIndex()
+    index.add(1, "a", ["Python", "Django", "AWS"])
+    index.add(2, "b", ["python", "React"])
+    index.add(3, "c", ["C++", "AWS", "  Python "])
+    index.add(4, "d", ["Go"])
+    return index
+
+
+def test_any_of_is_a_union():
+    index = _index()
+    assert index.any_of(["django", "react"]).tolist() == [1, 2]
+    assert index.any_of(["rust"]).tolist() == []
+
+
+def test_all_of_is_an_intersection():
+    index = _index()
+    assert index.all_of(["python", "aws"]).tolist() == [1, 3]
+    assert index.all_of(["PYTHON", "aws", "django"]).tolist() == [1]
+    assert index.all_of(["python", "rust"]).tolist() == []
+
+
+def test_at_least_counts_shared_keywords_most_first():
+    index = _index()
+    rows, counts = index.at_least(["python", "aws", "django", "react"], 2)
+    assert rows.tolist() == [1, 2, 3]
+    assert counts.tolist() == [3, 2, 2]
+    rows, counts = index.at_least(["python", "aws", "django"], 3)
+    assert rows.tolist() == [1] and counts.tolist() == [3]
+    assert index.keys(rows) == ["a"]
+
+
+def test_reindex_and_remove_update_postings():
+    index = _index()
+    index.add(2, "b", ["Go"])
+    assert index.postings("python").tolist() == [1, 3]
+    assert index.postings("go").tolist() == [2, 4]
+    index.remove(4)
+    assert index.any_of(["go"]).tolist() == [2]
+    assert 4 not in index and len(index) == 3
+    assert index.postings("go").dtype == np.int32
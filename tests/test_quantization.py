@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.retrieval.quantization import ProductQuantizer, ScalarQuantizer, make_codec
+
+
+def test_sq8_score_is_the_inner_product_with_the_decoded_vector(unit_vectors):
+    vectors = unit_vectors(1000)
+    codec = ScalarQuantizer(32)
+    codec.train(vectors)
+    codes = codec.encode(vectors)
+    assert codes.dtype == np.uint8 and codes.shape == (1000, 32)
+
+    query = unit_vectors(1, seed=1)[0]
+    decoded = codec.low + codec.scale * codes.astype(np.float32)
+    scores = codec.score(codec.prepare(query), codes)
+    np.testing.assert_allclose(scores, decoded @ query, atol=1e-5)
+    # 8 bits per dimension keeps unit-vector inner products within a few hundredths
+    assert np.abs(scores - vectors @ query).max() < 0.05
+
+
+def test_sq8_state_round_trip(unit_vectors):
+    vectors = unit_vectors(200)
+    codec = ScalarQuantizer(32)
+    codec.train(vectors)
+    restored = make_codec("sq8", 32)
+    restored.load_state(codec.state())
+    assert np.array_equal(restored.encode(vectors), codec.encode(vectors))
+
+
+def test_pq_score_is_the_inner_product_with_the_reconstruction(unit_vectors):
+    vectors = unit_vectors(2000)
+    codec = ProductQuantizer(32, n_subspaces=4, iterations=5)
+    codec.train(vectors)
+    codes = codec.encode(vectors)
+    assert codes.dtype == np.uint8 and codes.shape == (2000, 4)
+
+    query = unit_vectors(1, seed=1)[0]
+    reconstructed = np.concatenate([codec.codebooks[m, codes[:, m]] for m in range(4)], axis=1)
+    np.testing.assert_allclose(
+        codec.score(codec.prepare(query), codes), reconstructed @ query, atol=1e-5
+    )
+
+
+def test_pq_reproduces_up_to_256_training_vectors_exactly(unit_vectors):
+    vectors = unit_vectors(200)
+    codec = make_codec("pq", 32, n_subspaces=8)
+    codec.train(vectors)
+    query = unit_vectors(1, seed=1)[0]
+    np.testing.assert_allclose(
+        codec.score(codec.prepare(query), codec.encode(vectors)), vectors @ query, atol=1e-5
+    )
+
+    restored = make_codec("pq", 32)
+    restored.load_state(codec.state())
+    assert restored.code_size == 8
+    assert np.array_equal(restored.encode(vectors), codec.encode(vectors))
+
+
+def test_invalid_codecs_are_rejected():
+    with pytest.raises(ValueError):
+        ProductQuantizer(30, n_subspaces=4)
+    with pytest.raises(ValueError):
+        make_codec("int4", 32)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agent.fake_provider import FakeProvider, LatencyModel
+from src.agent.rate_limiter import AdaptiveRateLimiter
+from src.agent.resilience import HedgePolicy, ResilientProvider, RetryPolicy, TransientProviderError
+
+
+class _RecordingRetry(RetryPolicy):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.delays = []
+
+    def backoff(self, attempt, error=None):
+        delay = super().backoff(attempt, error)
+        self.delays.append(delay)
+        return delay
+
+
+def _limiter() -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter("test", requests_per_minute=1e6, tokens_per_minute=1e9, max_concurrency=64)
+
+
+def _provider(**kwargs) -> FakeProvider:
+    return FakeProvider(limiter=_limiter(), respond=lambda prompt: "ok", **kwargs)
+
+
+def test_retries_up_to_max_retries():
+    provider = _provider(error_rate=1.0, seed=0)
+    retry = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01)
+
+    with pytest.raises(TransientProviderError):
+        asyncio.run(ResilientProvider(provider, retry=retry)("prompt"))
+
+    assert provider.calls == 4
+    assert retry.retries == 3
+
+
+def test_non_retryable_errors_are_not_retried():
+    def respond(prompt):
+        raise ValueError("bad prompt")
+
+    provider = FakeProvider(limiter=_limiter(), respond=respond)
+    retry = RetryPolicy(max_retries=3, base_delay=0.001)
+
+    with pytest.raises(ValueError):
+        asyncio.run(ResilientProvider(provider, retry=retry)("prompt"))
+
+    assert provider.calls == 1
+    assert retry.retries == 0
+
+
+def test_retry_after_is_honoured():
+    provider = _provider(rate_limit_rate=1.0, retry_after=0.2, seed=0)
+    retry = _RecordingRetry(max_retries=2, base_delay=0.001, max_delay=5.0)
+
+    started = time.monotonic()
+    with pytest.raises(TransientProviderError):
+        asyncio.run(ResilientProvider(provider, retry=retry)("prompt"))
+
+    assert retry.delays and all(delay >= 0.2 for delay in retry.delays)
+    assert time.monotonic() - started >= 0.4
+
+
+def test_retry_after_is_capped_by_max_delay():
+    retry = RetryPolicy(base_delay=0.001, max_delay=0.05)
+
+    assert retry.backoff(0, TransientProviderError("rate limited", retry_after=30.0)) == 0.05
+
+
+def test_hedge_wins_on_slow_primary():
+    # seed 1 draws a tail latency for the primary and a fast one for the hedge
+    provider = _provider(latency=LatencyModel("tail", mean=0.01, tail=2.0, tail_probability=0.5), seed=1)
+    hedge = HedgePolicy(percentile=95.0, max_ratio=1.0, min_samples=20)
+    for _ in range(20):
+        hedge.latencies.record(0.01)
+
+    started = time.monotonic()
+    assert asyncio.run(ResilientProvider(provider, hedge=hedge)("prompt")) == "ok"
+
+    assert time.monotonic() - started < 1.0
+    assert hedge.hedges == 1
+    assert hedge.hedge_wins == 1
+    assert provider.calls == 2
+
+
+def test_hedges_are_capped_at_max_ratio():
+    provider = _provider(latency=LatencyModel("tail", mean=0.001, tail=0.02, tail_probability=0.5), seed=0)
+    hedge = HedgePolicy(percentile=50.0, max_ratio=0.1, min_samples=10)
+    resilient = ResilientProvider(provider, hedge=hedge)
+
+    async def run():
+        for _ in range(200):
+            await resilient("prompt")
+
+    asyncio.run(run())
+
+    assert hedge.requests == 200
+    assert 0 < hedge.hedges <= hedge.max_ratio * hedge.requests
+    assert provider.calls == hedge.requests + hedge.hedges